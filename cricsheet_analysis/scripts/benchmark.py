@@ -0,0 +1,273 @@
+import os
+import argparse
+import json
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import multiprocessing
+from datetime import datetime, timezone
+import synthetic
+from instrument import peak_rss_mb
+
+FORMATS = ["odi", "t20", "test", "ipl"]
+
+# ----------------------
+# Stages
+# ----------------------
+# Each stage runs in a fresh process (see run_stage) with the data folder,
+# database and parsed-match cache pointed at the benchmark's own paths.
+# A stage gets the loaded modules and returns the number of calls it timed
+# when that is more telling than match throughput, else None.
+
+def _load_json_files(m, ctx):
+    for fmt in FORMATS:
+        m["transform"].load_json_files(fmt)
+
+def _parser(name):
+    def stage(m, ctx):
+        for fmt in FORMATS:
+            getattr(m["transform"], name)(fmt)
+    return stage
+
+def _parse_all(m, ctx):
+    for fmt in FORMATS:
+        m["transform"].parse_all(fmt, workers=ctx["workers"])
+
+def _parse_all_cached(m, ctx):
+    # Warm the parsed-match cache untimed, then time a cache-hit parse.
+    for fmt in FORMATS:
+        m["transform"].parse_all(fmt)
+    start = time.perf_counter()
+    _parse_all(m, ctx)
+    return None, time.perf_counter() - start
+
+def _save_to_db(m, ctx):
+    parsed = {fmt: m["transform"].parse_all(fmt, workers=ctx["workers"]) for fmt in FORMATS}
+    m["database"].DB_PATH = ctx["scratch_db"]
+    start = time.perf_counter()
+    for fmt, frames in parsed.items():
+        for key in ("matches", "batting", "bowling", "team_results"):
+            m["database"].save_to_db(frames[key], f"bench_{key}_{fmt}")
+    return None, time.perf_counter() - start
+
+def _run_etl(full):
+    def stage(m, ctx):
+        for fmt in FORMATS:
+            m["database"].run_etl(fmt, workers=ctx["workers"], full=full)
+    return stage
+
+def _dashboard_queries(m, ctx):
+    # The loaders behind main.py's tabs, as called on a rerun without filters.
+    dq, profiles = m["databasequeries"], m["profiles"]
+    calls = 0
+    for fmt in FORMATS:
+        if not dq.table_exists(f"{fmt}_matches"):
+            continue
+        years = dq.year_bounds(fmt)
+        teams = dq.team_names(fmt)
+        for name, args, kwargs in [
+            ("match_counts", (fmt, years), {}),
+            ("matches_per_year", (fmt, years), {}),
+            ("top_venues", (fmt, years), {"limit": 10}),
+            ("toss_outcomes", (fmt, years), {}),
+            ("top_winners", (fmt, years), {"limit": 10}),
+            ("toss_winner_crosstab", (fmt, years), {}),
+            ("wins_by_year", (fmt, tuple(teams[:2]), years), {}),
+            ("match_counts", (fmt, years), {"team_filter": teams[:1]}),
+            ("leaderboard", ("batting_stats", fmt, "runs"), {"min_balls": 300}),
+            ("leaderboard", ("bowling_stats", fmt, "wicket"), {"min_balls": 300}),
+            ("top_teams", (fmt,), {}),
+            ("over_stats", (fmt, "team", tuple(teams[:2])), {}),
+            ("phase_stats", (fmt, "team", tuple(teams[:2])), {}),
+            ("top_matchups", (fmt,), {"min_balls": 6}),
+        ]:
+            getattr(dq, name)(*args, **kwargs)
+            calls += 1
+        top = dq.leaderboard("batting_stats", fmt, "runs", limit=1)
+        if not top.empty:
+            profiles.player_profile(fmt, top.iloc[0]["batter"])
+            calls += 2
+    return calls
+
+# name -> stage function, in run order; later stages rely on run_etl_full's database.
+STAGES = {
+    "load_json_files": _load_json_files,
+    "parse_matches": _parser("parse_matches"),
+    "parse_batting": _parser("parse_batting"),
+    "parse_bowling": _parser("parse_bowling"),
+    "build_team_results": _parser("build_team_results"),
+    "parse_all": _parse_all,
+    "parse_all_cached": _parse_all_cached,
+    "save_to_db": _save_to_db,
+    "run_etl_full": _run_etl(full=True),
+    "run_etl_noop": _run_etl(full=False),
+    "dashboard_queries": _dashboard_queries,
+}
+
+def _stage_process(name, ctx, results):
+    # Modules read their paths from the environment at import time.
+    os.environ["CRICSHEET_DB"] = ctx["db"]
+    os.environ["CRICSHEET_CACHE_DIR"] = ctx["cache_dir"] if name == "parse_all_cached" else ctx["cold_cache_dir"]
+    import transform, database, databasequeries, profiles
+    transform.BASE_DATA_DIR = ctx["data_dir"]
+    database.DB_PATH = ctx["db"]
+    modules = {"transform": transform, "database": database,
+               "databasequeries": databasequeries, "profiles": profiles}
+
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    outcome = STAGES[name](modules, ctx)
+    seconds = time.perf_counter() - start
+    if isinstance(outcome, tuple):
+        outcome, seconds = outcome
+    results.put({"calls": outcome, "seconds": seconds,
+                 "rss_before_mb": rss_before, "peak_rss_mb": peak_rss_mb()})
+
+def run_stage(name: str, ctx: dict) -> dict:
+    """
+    Time one stage in a fresh process, so its peak RSS is its own.
+
+    Returns:
+        dict: name, seconds, matches_per_sec, deliveries_per_sec (or
+        calls and ms_per_call for query stages), rss_before_mb (after
+        imports) and peak_rss_mb.
+    """
+    # Per-stage cold cache; parse_all_cached keeps one shared cache.
+    ctx = dict(ctx, cold_cache_dir=tempfile.mkdtemp(dir=ctx["work_dir"]))
+    # Fork where available: a spawned stage would make parse_all's own worker
+    # pool spawn too, timing interpreter start-up instead of parsing. The
+    # parent never imports the ETL modules, so the child starts out small.
+    methods = multiprocessing.get_all_start_methods()
+    mp = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+    results = mp.Queue()
+    process = mp.Process(target=_stage_process, args=(name, ctx, results))
+    process.start()
+    process.join()
+    if process.exitcode != 0:
+        raise RuntimeError(f"Benchmark stage {name} failed with exit code {process.exitcode}")
+    shutil.rmtree(ctx["cold_cache_dir"], ignore_errors=True)
+
+    measured = results.get()
+    seconds = measured["seconds"]
+    row = {"name": name, "seconds": round(seconds, 4)}
+    if measured["calls"]:
+        row["calls"] = measured["calls"]
+        row["ms_per_call"] = round(seconds * 1000 / measured["calls"], 3)
+    else:
+        row["matches_per_sec"] = round(ctx["matches"] / seconds, 1) if seconds else None
+        row["deliveries_per_sec"] = round(ctx["deliveries"] / seconds, 1) if seconds else None
+    row["rss_before_mb"] = measured["rss_before_mb"]
+    row["peak_rss_mb"] = measured["peak_rss_mb"]
+    return row
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def run_benchmark(data_dir: str, stages=None, workers: int = 1, work_dir: str = None) -> dict:
+    """
+    Run benchmark stages against a synthetic data folder.
+
+    Args:
+        data_dir (str): Folder written by synthetic.generate_archive().
+        stages (list): Stage names; None for all of STAGES, in order.
+        workers (int): Worker processes for parse_all and run_etl.
+        work_dir (str): Scratch folder for the databases and caches.
+
+    Returns:
+        dict: "meta" (commit, platform, scale) and "stages" (one row per stage).
+    """
+    summary = synthetic.load_summary(data_dir)
+    if summary is None:
+        raise ValueError(f"{data_dir} has no synthetic.json; generate it with synthetic.py")
+    work_dir = work_dir or tempfile.mkdtemp(prefix="cricsheet-bench-")
+    os.makedirs(work_dir, exist_ok=True)
+    ctx = {
+        "data_dir": data_dir,
+        "work_dir": work_dir,
+        "db": os.path.join(work_dir, "bench.db"),
+        "scratch_db": os.path.join(work_dir, "scratch.db"),
+        "cache_dir": os.path.join(work_dir, "cache"),
+        "workers": workers,
+        "matches": sum(summary["matches"].values()),
+        "deliveries": sum(summary["deliveries"].values()),
+    }
+    for path in (ctx["db"], ctx["scratch_db"]):
+        if os.path.exists(path):
+            os.remove(path)
+
+    rows = []
+    for name in stages or STAGES:
+        print(f"Running {name}...")
+        rows.append(run_stage(name, ctx))
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "workers": workers,
+            "seed": summary["seed"],
+            "zip": summary["zip"],
+            "matches": ctx["matches"],
+            "deliveries": ctx["deliveries"],
+        },
+        "stages": rows,
+    }
+
+def print_report(report: dict, baseline: dict = None):
+    """Print a stage table, with the speedup against a baseline report if given."""
+    before = {row["name"]: row for row in (baseline or {}).get("stages", [])}
+    meta = report["meta"]
+    print(f"\n{meta['matches']} matches, {meta['deliveries']} deliveries, workers={meta['workers']}")
+    print(f"{'stage':<20}{'seconds':>10}{'matches/s':>12}{'deliv/s':>12}{'ms/call':>10}{'peak MiB':>10}"
+          + (f"{'speedup':>9}" if before else ""))
+    for row in report["stages"]:
+        line = (f"{row['name']:<20}{row['seconds']:>10.3f}"
+                f"{row.get('matches_per_sec') or '':>12}{row.get('deliveries_per_sec') or '':>12}"
+                f"{row.get('ms_per_call') or '':>10}{row['peak_rss_mb'] or '':>10}")
+        old = before.get(row["name"])
+        if old and row["seconds"]:
+            line += f"{old['seconds'] / row['seconds']:>8.2f}x"
+        print(line)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the ETL and dashboard queries on synthetic data.")
+    parser.add_argument("--matches", type=int, default=1000,
+                        help="matches to generate when --data has none (default: 1000)")
+    parser.add_argument("--data", help="synthetic data folder (default: a temporary one)")
+    parser.add_argument("--seed", type=int, default=0, help="generator seed (default: 0)")
+    parser.add_argument("--zip", action="store_true", help="generate <format>.zip archives")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes for parse_all and run_etl (default: 1)")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), help="stages to run (default: all)")
+    parser.add_argument("--output", default="benchmark.json", help="JSON report path (default: benchmark.json)")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    parser.add_argument("--keep", action="store_true", help="keep the generated data and databases")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="cricsheet-bench-")
+    data_dir = args.data or os.path.join(work_dir, "data")
+    try:
+        if synthetic.load_summary(data_dir) is None:
+            print(f"Generating {args.matches} synthetic matches...")
+            synthetic.generate_archive(data_dir, args.matches, args.seed, args.zip, max(1, args.workers))
+        report = run_benchmark(data_dir, args.stages, args.workers, work_dir)
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"✅ Saved benchmark report to: {args.output}")
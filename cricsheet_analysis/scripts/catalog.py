@@ -0,0 +1,92 @@
+import os
+import threading
+from connections import DB_PATH, read_connection
+
+# path -> {"stat", "schema_version", "tables": {name: [columns]}, "counts": {name: rows}}
+_catalogs = {}
+_lock = threading.Lock()
+
+def _stat(path: str):
+    # The ETL writes in WAL mode, so commits touch the -wal file, not the database file.
+    stat = []
+    for name in (path, f"{path}-wal"):
+        try:
+            st = os.stat(name)
+            stat.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            stat.append(None)
+    return tuple(stat)
+
+def _load_schema(path: str) -> dict:
+    conn = read_connection(path)
+    names = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type IN ('table', 'view') ORDER BY name"
+    )]
+    return {
+        name: [row[1] for row in conn.execute(f'PRAGMA table_info("{name}")')]
+        for name in names
+    }
+
+def _catalog(path: str) -> dict:
+    """
+    Current catalog of a database, re-read only when the file changed.
+
+    A change of the database or -wal file's mtime/size drops the cached row
+    counts; the table and column lists are only re-read when PRAGMA
+    schema_version moved as well.
+    """
+    stat = _stat(path)
+    with _lock:
+        catalog = _catalogs.get(path)
+        if catalog is not None and catalog["stat"] == stat:
+            return catalog
+
+        if stat[0] is None:
+            catalog = {"stat": stat, "schema_version": None, "tables": {}, "counts": {}}
+        else:
+            schema_version = read_connection(path).execute("PRAGMA schema_version").fetchone()[0]
+            if catalog is not None and catalog["schema_version"] == schema_version:
+                tables = catalog["tables"]
+            else:
+                tables = _load_schema(path)
+            catalog = {"stat": stat, "schema_version": schema_version, "tables": tables, "counts": {}}
+        _catalogs[path] = catalog
+        return catalog
+
+def version(path: str = DB_PATH) -> tuple:
+    """Token that changes whenever the database does, for keying result caches."""
+    catalog = _catalog(path)
+    return catalog["stat"], catalog["schema_version"]
+
+def tables(path: str = DB_PATH) -> list:
+    """Sorted table and view names; empty if the database does not exist."""
+    return list(_catalog(path)["tables"])
+
+def has_table(table_name: str, path: str = DB_PATH) -> bool:
+    return table_name in _catalog(path)["tables"]
+
+def columns(table_name: str, path: str = DB_PATH) -> list:
+    """Column names of a table, or an empty list if it does not exist."""
+    return list(_catalog(path)["tables"].get(table_name, []))
+
+def row_count(table_name: str, path: str = DB_PATH) -> int:
+    """
+    Number of rows in a table, counted once per database change.
+
+    Returns:
+        int: Row count, or 0 if the table does not exist.
+    """
+    catalog = _catalog(path)
+    if table_name not in catalog["tables"]:
+        return 0
+    counts = catalog["counts"]
+    if table_name not in counts:
+        counts[table_name] = read_connection(path).execute(
+            f'SELECT COUNT(*) FROM "{table_name}"'
+        ).fetchone()[0]
+    return counts[table_name]
+
+def formats(candidates, path: str = DB_PATH) -> list:
+    """The candidate formats that have a {fmt}_matches table, in the given order."""
+    known = _catalog(path)["tables"]
+    return [fmt for fmt in candidates if f"{fmt}_matches" in known]
@@ -0,0 +1,75 @@
+from array import array
+import numpy as np
+import pandas as pd
+
+class ColumnBuffer:
+    """
+    Append-only columnar record builder backed by typed arrays.
+
+    Integer columns are stored in array("q") buffers. String columns (player
+    and team names) are interned into a shared label table and stored as
+    array("i") codes, with -1 marking a missing value. to_frame() wraps the
+    buffers as NumPy arrays and Categorical columns, so no per-row dicts or
+    Python objects are created along the way.
+
+    Example:
+        buf = ColumnBuffer(strings=["batter", "team"], ints=["runs", "ball"])
+        buf.extend(["V Kohli", "India"], batter=[0], team=[1], runs=[4], ball=[1])
+        df = buf.to_frame()
+    """
+
+    def __init__(self, strings, ints):
+        self.string_columns = list(strings)
+        self.int_columns = list(ints)
+        self.codes = {name: array("i") for name in self.string_columns}
+        self.values = {name: array("q") for name in self.int_columns}
+        self.labels = []
+        self.label_codes = {}
+
+    def intern(self, label) -> int:
+        """Return the code of a string label, adding it on first sight."""
+        if label is None:
+            return -1
+        code = self.label_codes.get(label)
+        if code is None:
+            code = len(self.labels)
+            self.labels.append(label)
+            self.label_codes[label] = code
+        return code
+
+    def extend(self, labels, **columns):
+        """
+        Append whole columns at once.
+
+        String columns are given as integer codes into labels (-1 for a
+        missing value); integer columns as any array-like of values.
+        """
+        remap = np.array([self.intern(label) for label in labels] + [-1], dtype=np.int32)
+        for name in self.string_columns:
+            self.codes[name].frombytes(remap[np.asarray(columns[name])].tobytes())
+        for name in self.int_columns:
+            self.values[name].frombytes(np.asarray(columns[name], dtype=np.int64).tobytes())
+
+    def __len__(self):
+        column = self.string_columns[0] if self.string_columns else self.int_columns[0]
+        buffers = self.codes if self.string_columns else self.values
+        return len(buffers[column])
+
+    def to_frame(self) -> pd.DataFrame:
+        """Build a DataFrame with Categorical string columns and int64 value columns."""
+        categories = pd.Index(self.labels, dtype=object)
+        data = {}
+        for name in self.string_columns:
+            codes = np.frombuffer(self.codes[name], dtype=np.int32) if self.codes[name] else np.empty(0, np.int32)
+            data[name] = pd.Categorical.from_codes(codes, categories=categories)
+        for name in self.int_columns:
+            values = np.frombuffer(self.values[name], dtype=np.int64) if self.values[name] else np.empty(0, np.int64)
+            data[name] = values
+        return pd.DataFrame(data, copy=True)
+
+    def clear(self):
+        """Drop buffered records; interned labels are kept for the next chunk."""
+        for name in self.string_columns:
+            self.codes[name] = array("i")
+        for name in self.int_columns:
+            self.values[name] = array("q")
@@ -0,0 +1,64 @@
+import os
+import sqlite3
+import threading
+from urllib.request import pathname2url
+
+DB_PATH = os.environ.get("CRICSHEET_DB", os.path.join(os.path.dirname(__file__), "cricket.db"))
+
+MMAP_SIZE = 256 * 1024 * 1024  # bytes of the database file memory-mapped per connection
+CACHE_SIZE_KIB = 64 * 1024     # page cache per connection
+CACHED_STATEMENTS = 256        # prepared statements kept per connection
+
+_local = threading.local()
+
+def _tune(conn):
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB}")
+
+def read_connection(path: str = DB_PATH) -> sqlite3.Connection:
+    """
+    Read-only connection to the database, reused by the calling thread.
+
+    Connections are opened once per thread and path with mode=ro, so
+    dashboard reruns and ad-hoc queries skip the connect cost, keep a warm
+    page cache and reuse prepared statements. SQLite objects cannot be
+    shared between threads, hence one connection per thread.
+
+    Args:
+        path (str): Database file.
+
+    Returns:
+        sqlite3.Connection: Connection that rejects writes.
+    """
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(path)
+    if conn is None:
+        uri = f"file:{pathname2url(os.path.abspath(path))}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, cached_statements=CACHED_STATEMENTS)
+        _tune(conn)
+        conn.execute("PRAGMA query_only = ON")
+        connections[path] = conn
+    return conn
+
+def write_connection(path: str = DB_PATH, **kwargs) -> sqlite3.Connection:
+    """
+    New read-write connection with WAL journaling.
+
+    WAL lets dashboard readers keep querying while the ETL writes. The
+    caller owns the connection and must close it.
+
+    Args:
+        path (str): Database file, created if missing.
+        **kwargs: Passed to sqlite3.connect, e.g. isolation_level=None.
+
+    Returns:
+        sqlite3.Connection: Tuned read-write connection.
+    """
+    conn = sqlite3.connect(path, cached_statements=CACHED_STATEMENTS, **kwargs)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    _tune(conn)
+    return conn
@@ -1,33 +1,900 @@
-import os
-import sqlite3
+import argparse
+import hashlib
+from datetime import datetime, timezone
 import pandas as pd
-from transform import parse_matches  # re-use parser from transform.py
-from transform import parse_batting
-from transform import parse_bowling
-from transform import build_team_results
+from transform import parse_all  # single-pass parser from transform.py
+from transform import list_json_files, match_key, read_source, source_name, source_stat
+from transform import merge_summaries
+from transform import BATTING_KEYS, BATTING_SUMS, BOWLING_KEYS, BOWLING_SUMS
+from connections import DB_PATH, write_connection
+from databasequeries import BATTING_COUNTS, BOWLING_COUNTS, count_columns
+from databasequeries import ROLLUPS, ROLLUP_KEYS, rollup_table
+from databasequeries import INNINGS, innings_table, phase_case
+from databasequeries import OVER_STATS, OVER_STATS_KEYS, analytics_table, phase_select, with_metrics
+from databasequeries import MATCHUPS, MATCHUPS_SCHEMA, matchups_table
+from metrics import OVER_METRICS, PHASES
+import instrument
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "cricket.db")
+FORMATS = ["odi", "t20", "test", "ipl"]
+MANIFEST_TABLE = "ingest_manifest"
 
 def save_to_db(df: pd.DataFrame, table_name: str):
     if df.empty:
         print(f"⚠️ Skipping {table_name}, no data.")
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = write_connection(DB_PATH)
     df.to_sql(table_name, conn, if_exists="replace", index=False)
     conn.close()
+    instrument.add(rows_written=len(df))
     print(f"✅ Saved {len(df)} rows to table: {table_name}")
 
+def file_hash(path: str) -> str:
+    """Return the SHA-256 hex digest of a match file's (or zip member's) contents."""
+    data = read_source(path)
+    instrument.add(bytes_read=len(data))
+    return hashlib.sha256(data).hexdigest()
+
+def ensure_manifest(conn):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE} (
+            format TEXT NOT NULL,
+            file_name TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            ingested_at TEXT NOT NULL,
+            PRIMARY KEY (format, file_name)
+        )
+    """)
+
+def load_manifest(conn, fmt: str) -> dict:
+    """
+    Read the manifest entries recorded for a format.
+
+    Returns:
+        dict: file_name -> (size, mtime_ns, sha256).
+    """
+    rows = conn.execute(
+        f"SELECT file_name, size, mtime_ns, sha256 FROM {MANIFEST_TABLE} WHERE format = ?",
+        (fmt,)
+    ).fetchall()
+    return {name: (size, mtime_ns, sha) for name, size, mtime_ns, sha in rows}
+
+def scan_changes(fmt: str, manifest: dict) -> dict:
+    """
+    Compare a format's match files on disk against its manifest.
+
+    Files whose size and mtime match the manifest are assumed unchanged and are
+    not hashed. Anything else is hashed, so a file that was only touched is
+    not treated as changed.
+
+    Args:
+        fmt (str): Format folder name, e.g. "odi".
+        manifest (dict): Entries from load_manifest().
+
+    Returns:
+        dict: "new", "changed" and "unchanged" path lists, "removed" file names
+        and "entries", the manifest rows to record for every file on disk.
+    """
+    result = {"new": [], "changed": [], "unchanged": [], "removed": [], "entries": []}
+    seen = set()
+
+    for path in list_json_files(fmt):
+        name = source_name(path)
+        seen.add(name)
+        size, mtime_ns = source_stat(path)
+        known = manifest.get(name)
+
+        if known and known[0] == size and known[1] == mtime_ns:
+            sha = known[2]
+            result["unchanged"].append(path)
+        else:
+            sha = file_hash(path)
+            if known is None:
+                result["new"].append(path)
+            elif known[2] == sha:
+                result["unchanged"].append(path)
+            else:
+                result["changed"].append(path)
+        result["entries"].append((fmt, name, size, mtime_ns, sha))
+
+    result["removed"] = [name for name in manifest if name not in seen]
+    return result
+
+def table_exists(conn, table_name: str) -> bool:
+    return conn.execute(
+        "SELECT count(*) FROM sqlite_master WHERE type='table' AND name=?",
+        (table_name,)
+    ).fetchone()[0] > 0
+
+def object_type(conn, name: str):
+    """Return "table" or "view" for an existing schema object, else None."""
+    row = conn.execute(
+        "SELECT type FROM sqlite_master WHERE type IN ('table', 'view') AND name=?", (name,)
+    ).fetchone()
+    return row[0] if row else None
+
+def table_columns(conn, table_name: str) -> list:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table_name})")]
+
+def primary_key(conn, table_name: str) -> list:
+    rows = sorted((row[5], row[1]) for row in conn.execute(f"PRAGMA table_info({table_name})"))
+    return [name for position, name in rows if position > 0]
+
+def read_table(conn, table_name: str) -> pd.DataFrame:
+    if object_type(conn, table_name) is None:
+        return pd.DataFrame()
+    return pd.read_sql(f"SELECT * FROM {table_name}", conn)
+
+def stage_frame(conn, table_name: str, df: pd.DataFrame, schema: str = None):
+    """
+    Write a DataFrame to a staging table for publish().
+
+    Args:
+        conn: Open SQLite connection.
+        table_name (str): Table the staged rows are meant for.
+        df (pd.DataFrame): Rows to stage.
+        schema (str): CREATE TABLE statement with a {table} placeholder, for
+            tables that need keys or constraints; otherwise to_sql infers one.
+
+    Returns:
+        tuple | None: (staging table name, row count), or None if df is empty.
+    """
+    if df.empty:
+        print(f"⚠️ Skipping {table_name}, no data.")
+        return None
+    staging = f"_staging_{table_name}"
+    if schema is None:
+        df.to_sql(staging, conn, if_exists="replace", index=False)
+    else:
+        conn.execute(f"DROP TABLE IF EXISTS {staging}")
+        conn.execute(schema.format(table=staging))
+        df.to_sql(staging, conn, if_exists="append", index=False)
+    instrument.add(rows_written=len(df))
+    return staging, len(df)
+
+def match_tables(fmt: str) -> list:
+    """Tables holding rows keyed by match_id, replaced match by match on upsert."""
+    return [f"{fmt}_matches", f"match_teams_{fmt}", f"deliveries_{fmt}"]
+
+def stage_match_ids(conn, match_ids):
+    """Load match ids into the temp table _stale_matches for joins and deletes."""
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS _stale_matches (match_id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM _stale_matches")
+    conn.executemany("INSERT OR IGNORE INTO _stale_matches VALUES (?)", [(i,) for i in match_ids])
+
+def match_contributions(conn, fmt: str, match_ids) -> dict:
+    """
+    Batting, bowling and team-result counts that some loaded matches added.
+
+    Computed from deliveries_{fmt} and match_teams_{fmt} with the shared
+    BATTING_COUNTS and BOWLING_COUNTS, which match transform's builders, so
+    merge_summaries() can take the matches back out of the summary tables.
+
+    Returns:
+        dict: Count DataFrames keyed by "batting", "bowling" and "team_results".
+    """
+    stage_match_ids(conn, match_ids)
+    batting = pd.read_sql(f"""
+        SELECT p.name AS batter, t.name AS team, {count_columns(BATTING_COUNTS)}
+        FROM deliveries_{fmt} d
+        JOIN _stale_matches s ON s.match_id = d.match_id
+        JOIN players p ON p.player_id = d.batter_id
+        JOIN teams t ON t.team_id = d.team_id
+        GROUP BY p.name, t.name
+    """, conn)
+    bowling = pd.read_sql(f"""
+        SELECT p.name AS bowler, t.name AS against_team, {count_columns(BOWLING_COUNTS)}
+        FROM deliveries_{fmt} d
+        JOIN _stale_matches s ON s.match_id = d.match_id
+        JOIN players p ON p.player_id = d.bowler_id
+        JOIN teams t ON t.team_id = d.team_id
+        GROUP BY p.name, t.name
+    """, conn)
+    team_results = pd.read_sql(f"""
+        SELECT t.name AS team,
+               COUNT(*) AS matches,
+               SUM(CASE WHEN t.name = m.match_winner THEN 1 ELSE 0 END) AS wins,
+               SUM(CASE WHEN t.name = m.match_winner THEN 0 ELSE 1 END) AS losses
+        FROM match_teams_{fmt} mt
+        JOIN _stale_matches s ON s.match_id = mt.match_id
+        JOIN teams t ON t.team_id = mt.team_id
+        JOIN {fmt}_matches m ON m.match_id = mt.match_id
+        GROUP BY t.name
+    """, conn)
+    return {"batting": batting, "bowling": bowling, "team_results": team_results}
+
+def publish(conn, fmt: str, replace: dict, append: dict, entries: list, stale_ids=()):
+    """
+    Publish staged tables and a format's manifest entries atomically.
+
+    Staged tables are swapped in (replace) or copied over (append) together
+    with the manifest update in a single transaction, so an interrupted run
+    never leaves the manifest ahead of the data it describes. Rows of
+    stale_ids are deleted from the match-keyed tables first, which turns the
+    append of a changed file's rows into an upsert. On such an upsert the
+    innings, over, phase, matchup and rollup tables are updated for the
+    affected matches only (see build_innings and update_counts).
+
+    Args:
+        conn: Open SQLite connection in autocommit mode.
+        fmt (str): Format the manifest entries belong to.
+        replace (dict): table_name -> staged result that replaces the table.
+        append (dict): table_name -> staged result whose rows are appended.
+        entries (list): Manifest rows for every file of the format.
+        stale_ids (list): Keys of changed or removed matches.
+    """
+    replace = {name: staged for name, staged in replace.items() if staged}
+    append = {name: staged for name, staged in append.items() if staged}
+    # Innings rows follow the deliveries: all of them on a rebuild, else
+    # those of the changed, removed and new matches.
+    innings_ids = None
+    if f"deliveries_{fmt}" not in replace:
+        innings_ids = list(stale_ids)
+        if f"{fmt}_matches" in append:
+            staging = append[f"{fmt}_matches"][0]
+            innings_ids += [row[0] for row in conn.execute(f"SELECT match_id FROM {staging}")]
+    # The count tables take the same path when they exist: the old counts of
+    # stale matches are subtracted before their rows go, the counts of the
+    # rebuilt and new matches added after. Otherwise they are rebuilt.
+    incremental = (
+        innings_ids is not None and f"{fmt}_matches" not in replace
+        and all(table_exists(conn, name) for name in count_tables(fmt))
+    )
+    deltas = {}
+
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    conn.execute("BEGIN")
+    try:
+        # Views over replaced tables would block ALTER TABLE ... RENAME.
+        for key in SUMMARY_VIEWS:
+            drop_object(conn, summary_view(key, fmt))
+        if incremental:
+            count_deltas(conn, fmt, stale_ids, -1, deltas)
+        if stale_ids:
+            stage_match_ids(conn, stale_ids)
+            for table_name in match_tables(fmt):
+                conn.execute(
+                    f"DELETE FROM {table_name} WHERE match_id IN (SELECT match_id FROM _stale_matches)"
+                )
+        for table_name, (staging, _) in replace.items():
+            conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+            conn.execute(f"ALTER TABLE {staging} RENAME TO {table_name}")
+        for table_name, (staging, _) in append.items():
+            conn.execute(f"INSERT INTO {table_name} SELECT * FROM {staging}")
+            conn.execute(f"DROP TABLE {staging}")
+        create_views(conn, fmt)
+        with instrument.stage("derived", fmt):
+            build_innings(conn, fmt, innings_ids)
+            if incremental:
+                count_deltas(conn, fmt, innings_ids, 1, deltas)
+                update_counts(conn, fmt, deltas)
+            else:
+                build_over_stats(conn, fmt)
+                build_matchups(conn, fmt)
+                build_rollups(conn, fmt)
+            create_indexes(conn, fmt)
+        conn.execute(f"DELETE FROM {MANIFEST_TABLE} WHERE format = ?", (fmt,))
+        conn.executemany(
+            f"INSERT INTO {MANIFEST_TABLE} VALUES (?, ?, ?, ?, ?, '{now}')", entries
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    if stale_ids:
+        print(f"✅ Replaced {len(stale_ids)} changed or removed matches in: {', '.join(match_tables(fmt))}")
+    for table_name, (_, n_rows) in replace.items():
+        print(f"✅ Saved {n_rows} rows to table: {table_name}")
+    for table_name, (_, n_rows) in append.items():
+        print(f"✅ Appended {n_rows} rows to table: {table_name}")
+
+# Indexes behind the dashboard's filtered queries (see databasequeries.py).
+# Replacing a table drops its indexes, so publish() recreates them.
+INDEXES = {
+    "{fmt}_matches": ["date", "venue", "match_winner"],
+    "batting_summary_{fmt}": ["ball", "runs", "strike_rate"],
+    "bowling_summary_{fmt}": ["ball", "wicket", "economy"],
+    "match_teams_{fmt}": [("team_id", "match_id")],
+    "deliveries_{fmt}": ["match_id"],
+    "batting_innings_{fmt}": [("batter_id", "match_id"), "match_id"],
+    "bowling_innings_{fmt}": [("bowler_id", "match_id"), "match_id"],
+    # Keys of the analytics and rollup tables, also used by update_counts() on upserts.
+    "rollup_year_{fmt}": ["year"],
+    "rollup_venue_year_{fmt}": [("venue", "year")],
+    "rollup_team_year_{fmt}": [("team", "year")],
+    "rollup_toss_{fmt}": [("toss_winner", "match_winner", "year")],
+    "over_stats_team_{fmt}": [("team_id", "over")],
+    "over_stats_batter_{fmt}": [("batter_id", "over")],
+    "over_stats_bowler_{fmt}": [("bowler_id", "over")],
+    "over_stats_venue_{fmt}": [("venue", "over")],
+    "phase_stats_team_{fmt}": [("team_id", "phase")],
+    "phase_stats_batter_{fmt}": [("batter_id", "phase")],
+    "phase_stats_bowler_{fmt}": [("bowler_id", "phase")],
+    "phase_stats_venue_{fmt}": [("venue", "phase")],
+    "matchups_{fmt}": [("bowler_id", "batter_id"), "runs", "dismissals"],
+}
+
+def create_indexes(conn, fmt: str):
+    for template, columns in INDEXES.items():
+        table_name = template.format(fmt=fmt)
+        if not table_exists(conn, table_name):
+            continue
+        for column in columns:
+            column = column if isinstance(column, tuple) else (column,)
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table_name}_{'_'.join(column)} "
+                f"ON {table_name} ({', '.join(column)})"
+            )
+
+# Summary tables store integer dimension keys instead of repeating names.
+# Each gets a view under its original name that joins the names back in, so
+# the dashboard, exports and ad-hoc SQL keep reading batting_stats_{fmt} etc.
+SUMMARY_KEYS = {
+    "batting": {"batter": ("players", "player_id"), "team": ("teams", "team_id")},
+    "bowling": {"bowler": ("players", "player_id"), "against_team": ("teams", "team_id")},
+    "team_results": {"team": ("teams", "team_id")},
+}
+SUMMARY_VIEWS = {
+    "batting": "batting_stats_{fmt}",
+    "bowling": "bowling_stats_{fmt}",
+    "team_results": "team_results_{fmt}",
+}
+
+def summary_table(key: str, fmt: str) -> str:
+    return f"{key}_summary_{fmt}"
+
+def summary_view(key: str, fmt: str) -> str:
+    return SUMMARY_VIEWS[key].format(fmt=fmt)
+
+def encode_summary(conn, key: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replace the name columns of a summary frame with dimension codes.
+
+    Args:
+        conn: Open SQLite connection.
+        key (str): "batting", "bowling" or "team_results".
+        df (pd.DataFrame): Summary with name columns, as built by transform.
+
+    Returns:
+        pd.DataFrame: The same rows with e.g. batter -> batter_id, team -> team_id.
+    """
+    if df.empty:
+        return df
+    out = {}
+    for column in df.columns:
+        if column in SUMMARY_KEYS[key]:
+            dimension = Dimension(conn, *SUMMARY_KEYS[key][column])
+            codes = {name: dimension.code(name) for name in pd.unique(df[column])}
+            out[f"{column}_id"] = df[column].astype(object).map(codes).astype("int64")
+        else:
+            out[column] = df[column]
+    return pd.DataFrame(out)
+
+def drop_object(conn, name: str):
+    kind = object_type(conn, name)
+    if kind is not None:
+        conn.execute(f"DROP {kind.upper()} {name}")
+
+def create_views(conn, fmt: str):
+    """(Re)create the name views over a format's summary tables."""
+    for key, columns in SUMMARY_KEYS.items():
+        table_name = summary_table(key, fmt)
+        view = summary_view(key, fmt)
+        # Databases from before the summary tables held the names in a table of this name.
+        drop_object(conn, view)
+        if not table_exists(conn, table_name):
+            continue
+
+        select, joins = [], []
+        for i, column in enumerate(table_columns(conn, table_name)):
+            name = column[:-3] if column.endswith("_id") else None
+            if name in columns:
+                dim_table, id_col = columns[name]
+                joins.append(f"JOIN {dim_table} d{i} ON d{i}.{id_col} = s.{column}")
+                select.append(f"d{i}.name AS {name}")
+            else:
+                select.append(f"s.{column}")
+        conn.execute(
+            f"CREATE VIEW {view} AS SELECT {', '.join(select)} FROM {table_name} s {' '.join(joins)}"
+        )
+
+def register_people(conn, people: pd.DataFrame):
+    """
+    Record Cricsheet registry ids on the players dimension.
+
+    Players are still identified by name; person_key keeps the registry id
+    the first time a name is seen with one, for joining with other
+    Cricsheet data.
+
+    Args:
+        conn: Open SQLite connection in autocommit mode.
+        people (pd.DataFrame): name, person_key pairs from parse_all.
+    """
+    Dimension(conn, "players", "player_id")
+    if "person_key" not in table_columns(conn, "players"):
+        conn.execute("ALTER TABLE players ADD COLUMN person_key TEXT")
+    conn.execute("BEGIN")
+    conn.executemany(
+        "UPDATE players SET person_key = ? WHERE name = ? AND person_key IS NULL",
+        list(zip(people["person_key"], people["name"])),
+    )
+    conn.execute("COMMIT")
+
+def rollup_tables(fmt: str) -> list:
+    return [rollup_table(name, fmt) for name in ROLLUPS]
+
+def build_rollups(conn, fmt: str):
+    """Recreate every rollup table of a format (see databasequeries.ROLLUPS)."""
+    if not table_exists(conn, f"{fmt}_matches"):
+        return
+    for name, select in ROLLUPS.items():
+        table_name = rollup_table(name, fmt)
+        conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+        conn.execute(f"CREATE TABLE {table_name} AS {select.format(matches=f'{fmt}_matches')}")
+
+def innings_tables(fmt: str) -> list:
+    return [innings_table(key, fmt) for key in INNINGS]
+
+def build_innings(conn, fmt: str, match_ids=None):
+    """
+    Refresh the per-innings player tables of a format (see databasequeries.INNINGS).
+
+    Args:
+        conn: Open SQLite connection.
+        fmt (str): Format suffix, e.g. "odi".
+        match_ids (list): Matches whose rows are deleted and rebuilt from
+            deliveries_{fmt}; None rebuilds the tables from scratch.
+    """
+    deliveries = f"deliveries_{fmt}"
+    if not table_exists(conn, deliveries):
+        return
+    for key, select in INNINGS.items():
+        table_name = innings_table(key, fmt)
+        if match_ids is None or not table_exists(conn, table_name):
+            conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+            sql = select.format(deliveries=deliveries, phase=phase_case(fmt), where="")
+            conn.execute(f"CREATE TABLE {table_name} AS {sql}")
+            continue
+        if not match_ids:
+            continue
+        stage_match_ids(conn, match_ids)
+        conn.execute(
+            f"DELETE FROM {table_name} WHERE match_id IN (SELECT match_id FROM _stale_matches)"
+        )
+        where = "AND d.match_id IN (SELECT match_id FROM _stale_matches)"
+        sql = select.format(deliveries=deliveries, phase=phase_case(fmt), where=where)
+        conn.execute(f"INSERT INTO {table_name} {sql}")
+
+def over_stats_tables(fmt: str) -> list:
+    return [analytics_table(grain, dimension, fmt)
+            for dimension in OVER_STATS for grain in ("over", "phase")]
+
+def build_over_stats(conn, fmt: str):
+    """
+    Recreate the over and phase analytics tables of a format (see databasequeries.OVER_STATS).
+
+    Each dimension takes one GROUP BY pass over deliveries_{fmt}; the phase
+    tables are regrouped from the much smaller over tables.
+    """
+    deliveries = f"deliveries_{fmt}"
+    if not table_exists(conn, deliveries):
+        return
+    for dimension, select in OVER_STATS.items():
+        over_table = analytics_table("over", dimension, fmt)
+        phase_table = analytics_table("phase", dimension, fmt)
+        conn.execute(f"DROP TABLE IF EXISTS {over_table}")
+        conn.execute(f"DROP TABLE IF EXISTS {phase_table}")
+        sql = select.format(deliveries=deliveries, matches=f"{fmt}_matches", where="")
+        conn.execute(f"CREATE TABLE {over_table} AS {with_metrics(sql)}")
+        conn.execute(f"CREATE TABLE {phase_table} AS {with_metrics(phase_select(dimension, fmt))}")
+
+def build_matchups(conn, fmt: str):
+    """
+    Recreate matchups_{fmt}, the sparse batter x bowler matrix (see databasequeries.MATCHUPS).
+
+    Only pairs that met get a row. The (batter_id, bowler_id) primary key
+    of the WITHOUT ROWID table serves pair and batter lookups directly; a
+    (bowler_id, batter_id) index from create_indexes() serves bowlers.
+    """
+    deliveries = f"deliveries_{fmt}"
+    if not table_exists(conn, deliveries):
+        return
+    table_name = matchups_table(fmt)
+    conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+    conn.execute(MATCHUPS_SCHEMA.format(table=table_name))
+    conn.execute(f"INSERT INTO {table_name} {MATCHUPS.format(deliveries=deliveries, where='')}")
+
+def count_tables(fmt: str) -> dict:
+    """
+    Count tables of a format that an incremental publish updates in place:
+    the over, matchup and rollup tables.
+
+    Returns:
+        dict: table_name -> (key columns, SELECT of the summed counts per key
+        with a {where} placeholder, metric specs recomputed from the counts).
+    """
+    deliveries = f"deliveries_{fmt}"
+    tables = {}
+    for dimension, select in OVER_STATS.items():
+        sql = select.format(deliveries=deliveries, matches=f"{fmt}_matches", where="{where}")
+        tables[analytics_table("over", dimension, fmt)] = (
+            [OVER_STATS_KEYS[dimension][0], "over"], sql, OVER_METRICS
+        )
+    tables[matchups_table(fmt)] = (
+        ["batter_id", "bowler_id"], MATCHUPS.format(deliveries=deliveries, where="{where}"), {}
+    )
+    # Rollups count matches, not deliveries: {where} filters the matches.
+    matches = f"(SELECT * FROM {fmt}_matches d WHERE d.match_id IS NOT NULL {{where}})"
+    for name, select in ROLLUPS.items():
+        tables[rollup_table(name, fmt)] = (ROLLUP_KEYS[name], select.format(matches=matches), {})
+    return tables
+
+def count_deltas(conn, fmt: str, match_ids, sign: int, deltas: dict):
+    """
+    Add the counts some matches contribute to the count tables to deltas.
+
+    Called with sign -1 for the old rows of changed and removed matches
+    before they are deleted, and with +1 for the rows of changed and new
+    matches once they are in, so deltas ends up holding the net change.
+
+    Args:
+        conn: Open SQLite connection.
+        fmt (str): Format suffix, e.g. "odi".
+        match_ids (list): Matches whose rows are counted.
+        sign (int): -1 to subtract their counts, 1 to add them.
+        deltas (dict): table_name -> (columns, {key: counts}), updated in place.
+    """
+    if not match_ids:
+        return
+    stage_match_ids(conn, match_ids)
+    where = "AND d.match_id IN (SELECT match_id FROM _stale_matches)"
+    for table_name, (keys, select, _) in count_tables(fmt).items():
+        cursor = conn.execute(select.format(where=where))
+        columns = [column[0] for column in cursor.description]
+        groups = deltas.setdefault(table_name, (columns, {}))[1]
+        for row in cursor:
+            counts = groups.setdefault(row[:len(keys)], [0] * (len(columns) - len(keys)))
+            for i, value in enumerate(row[len(keys):]):
+                counts[i] += sign * (value or 0)
+
+def apply_deltas(conn, table_name: str, keys: list, columns: list, groups: dict, specs: dict):
+    """
+    Add net count changes to a count table, one key at a time.
+
+    Keys without a row get one; rows whose counts all drop to 0 (their
+    matches are gone) are deleted; the metric columns of every touched row
+    are recomputed from its new counts.
+    """
+    counts = columns[len(keys):]
+    match = " AND ".join(f"{key} IS ?" for key in keys)  # rollup years may be NULL
+    update = f"UPDATE {table_name} SET {', '.join(f'{c} = {c} + ?' for c in counts)} WHERE {match}"
+    insert = (f"INSERT INTO {table_name} ({', '.join(columns)}) "
+              f"VALUES ({', '.join('?' for _ in columns)})")
+    delete = f"DELETE FROM {table_name} WHERE {match} AND {' AND '.join(f'{c} = 0' for c in counts)}"
+    touched = []
+    for key, delta in groups.items():
+        if not any(delta):
+            continue
+        if conn.execute(update, (*delta, *key)).rowcount == 0:
+            conn.execute(insert, (*key, *delta))
+        touched.append(key)
+    conn.executemany(delete, touched)
+    if specs:
+        metrics = ", ".join(
+            f"{name} = ROUND({num} * {scale}.0 / NULLIF({den}, 0), 2)"
+            for name, (num, den, scale) in specs.items()
+        )
+        conn.executemany(f"UPDATE {table_name} SET {metrics} WHERE {match}", touched)
+
+def phase_of(fmt: str, over: int):
+    """metrics.PHASES phase of an over, like phase_case() in SQL; None outside any phase."""
+    for name, first, last in PHASES.get(fmt, []):
+        if first <= over <= last:
+            return name
+    return None
+
+def update_counts(conn, fmt: str, deltas: dict):
+    """
+    Apply count_deltas() to the over, phase, matchup and rollup tables of a format.
+
+    Touches only the keys of the changed matches, so the cost follows the
+    size of the update rather than of deliveries_{fmt}. Phase deltas are
+    the over deltas regrouped by phase.
+    """
+    for table_name, (keys, _, specs) in count_tables(fmt).items():
+        columns, groups = deltas.get(table_name, (None, {}))
+        if groups:
+            apply_deltas(conn, table_name, keys, columns, groups, specs)
+    for dimension in OVER_STATS:
+        columns, groups = deltas.get(analytics_table("over", dimension, fmt), (None, {}))
+        phases = {}
+        for (key, over), delta in groups.items():
+            phase = phase_of(fmt, over)
+            if phase is None:
+                continue
+            summed = phases.setdefault((key, phase), [0] * len(delta))
+            for i, value in enumerate(delta):
+                summed[i] += value
+        if phases:
+            key_columns = [columns[0], "phase"]
+            apply_deltas(conn, analytics_table("phase", dimension, fmt), key_columns,
+                         key_columns + columns[2:], phases, OVER_METRICS)
+
+class Dimension:
+    """
+    Integer codes for a name column, backed by an (id, name) lookup table.
+
+    Codes are assigned on first sight and never change, so every format's
+    fact tables can share them.
+    """
+
+    def __init__(self, conn, table: str, id_col: str):
+        self.conn = conn
+        self.table = table
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                {id_col} INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+        """)
+        self.codes = dict(conn.execute(f"SELECT name, {id_col} FROM {table}"))
+
+    def code(self, name):
+        if name is None:
+            return None
+        code = self.codes.get(name)
+        if code is None:
+            code = self.conn.execute(
+                f"INSERT INTO {self.table} (name) VALUES (?)", (name,)
+            ).lastrowid
+            self.codes[name] = code
+        return code
+
+MATCHES_SCHEMA = """
+    CREATE TABLE {table} (
+        match_id INTEGER PRIMARY KEY,
+        format TEXT,
+        teams TEXT,
+        venue TEXT,
+        date TEXT,
+        toss_winner TEXT,
+        match_winner TEXT
+    )
+"""
+
+MATCH_TEAMS_SCHEMA = """
+    CREATE TABLE {table} (
+        match_id INTEGER NOT NULL,
+        team_id INTEGER NOT NULL,
+        side INTEGER NOT NULL,
+        PRIMARY KEY (match_id, side)
+    ) WITHOUT ROWID
+"""
+
+DELIVERIES_SCHEMA = """
+    CREATE TABLE {table} (
+        match_id INTEGER NOT NULL,
+        innings INTEGER NOT NULL,
+        over INTEGER NOT NULL,
+        ball INTEGER NOT NULL,
+        team_id INTEGER,
+        batter_id INTEGER,
+        bowler_id INTEGER,
+        runs_batter INTEGER NOT NULL,
+        extras INTEGER NOT NULL,
+        is_wide INTEGER NOT NULL,
+        wicket_kind_id INTEGER NOT NULL,
+        player_out_id INTEGER
+    )
+"""
+
+def match_teams_frame(conn, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replace team names in a transform.MATCH_TEAM_FIELDS frame with teams codes.
+
+    Returns:
+        pd.DataFrame: Columns match_id, team_id, side.
+    """
+    teams = Dimension(conn, "teams", "team_id")
+    return pd.DataFrame({
+        "match_id": df["match_id"],
+        "team_id": [teams.code(team) for team in df["team"]],
+        "side": df["side"],
+    })
+
+def deliveries_stager(conn, fmt: str):
+    """
+    Create a staging table for deliveries_{fmt} and return a chunk writer for it.
+
+    The writer takes lists of transform.DELIVERY_FIELDS tuples. It replaces
+    team, player and wicket-kind names with integer codes from the teams,
+    players and wicket_kinds tables (wicket kind 0 means no wicket), then
+    bulk-inserts the chunk with executemany in one transaction.
+
+    Returns:
+        tuple: (write function, function returning the staged result for publish()).
+    """
+    staging = f"_staging_deliveries_{fmt}"
+    conn.execute(f"DROP TABLE IF EXISTS {staging}")
+    conn.execute(DELIVERIES_SCHEMA.format(table=staging))
+    teams = Dimension(conn, "teams", "team_id")
+    players = Dimension(conn, "players", "player_id")
+    kinds = Dimension(conn, "wicket_kinds", "wicket_kind_id")
+    written = [0]
+
+    def write(records):
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                f"INSERT INTO {staging} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (match_id, innings, over, ball, teams.code(team),
+                     players.code(batter), players.code(bowler),
+                     runs_batter, extras, is_wide, kinds.code(kind) or 0,
+                     players.code(player_out))
+                    for (match_id, innings, over, ball, team, batter, bowler,
+                         runs_batter, extras, is_wide, kind, player_out) in records
+                ]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        written[0] += len(records)
+        instrument.add(rows_written=len(records))
+
+    def staged():
+        return (staging, written[0]) if written[0] else None
+
+    return write, staged
+
+def run_etl(fmt: str, workers: int = 1, full: bool = False):
+    """
+    Load one format into the database, parsing only new and changed files when possible.
+
+    New and changed match files are parsed on their own. Rows of changed or
+    removed files are deleted from the match-keyed tables by match_id and
+    the new rows appended; their old counts are read back from
+    deliveries_{fmt} and subtracted from the summary tables before the new
+    counts are merged in. A missing manifest, table, column or primary key
+    triggers a full rebuild of the format instead.
+
+    Args:
+        fmt (str): Format folder name, e.g. "odi".
+        workers (int): Worker processes passed through to parse_all.
+        full (bool): Always rebuild the format from scratch.
+
+    Each step is timed as an instrument stage (scan, parse, stage, publish
+    and derived) and the run is recorded in instrument.RUNS_TABLE.
+    """
+    with instrument.run("etl", fmt, DB_PATH):
+        _run_etl(fmt, workers, full)
+
+def _run_etl(fmt: str, workers: int, full: bool):
+    tables = {
+        "matches": f"{fmt}_matches",
+        "batting": summary_table("batting", fmt),
+        "bowling": summary_table("bowling", fmt),
+        "team_results": summary_table("team_results", fmt),
+        "deliveries": f"deliveries_{fmt}",
+        "match_teams": f"match_teams_{fmt}",
+    }
+    schemas = {"matches": MATCHES_SCHEMA, "match_teams": MATCH_TEAMS_SCHEMA}
+
+    conn = write_connection(DB_PATH, isolation_level=None)
+    try:
+        ensure_manifest(conn)
+        manifest = load_manifest(conn, fmt)
+        with instrument.stage("scan", fmt):
+            changes = scan_changes(fmt, manifest)
+
+        if not full and manifest and not all(table_exists(conn, name) for name in tables.values()):
+            print(f"⚠️ {fmt.upper()}: tables missing, rebuilding.")
+            full = True
+        required = {
+            tables["batting"]: [f"{key}_id" for key in BATTING_KEYS] + BATTING_SUMS,
+            tables["bowling"]: [f"{key}_id" for key in BOWLING_KEYS] + BOWLING_SUMS,
+            tables["deliveries"]: ["player_out_id"],
+        }
+        if not full and manifest and (
+            any(not set(columns) <= set(table_columns(conn, name)) for name, columns in required.items())
+            or primary_key(conn, tables["matches"]) != ["match_id"]
+        ):
+            print(f"⚠️ {fmt.upper()}: tables predate the current schema, rebuilding.")
+            full = True
+        full = full or not manifest
+
+        stale = changes["changed"] + changes["removed"]
+        if not full and not changes["new"] and not stale:
+            derived = (rollup_tables(fmt) + innings_tables(fmt) + over_stats_tables(fmt)
+                       + [matchups_table(fmt)])
+            if not all(table_exists(conn, name) for name in derived):
+                with instrument.stage("derived", fmt):
+                    conn.execute("BEGIN")
+                    build_innings(conn, fmt)
+                    build_over_stats(conn, fmt)
+                    build_matchups(conn, fmt)
+                    build_rollups(conn, fmt)
+                    create_indexes(conn, fmt)
+                    conn.execute("COMMIT")
+                print(f"✅ {fmt.upper()}: built rollup, innings, analytics and matchup tables.")
+            print(f"✅ {fmt.upper()}: no new match files.")
+            return
+
+        write_deliveries, staged_deliveries = deliveries_stager(conn, fmt)
+        if full:
+            with instrument.stage("parse", fmt):
+                parsed = parse_all(fmt, workers=workers, on_deliveries=write_deliveries)
+            with instrument.stage("stage", fmt):
+                register_people(conn, parsed.pop("people"))
+                parsed["match_teams"] = match_teams_frame(conn, parsed["match_teams"])
+                for key in SUMMARY_KEYS:
+                    parsed[key] = encode_summary(conn, key, parsed[key])
+                replace = {tables[key]: stage_frame(conn, tables[key], df, schemas.get(key))
+                           for key, df in parsed.items()}
+                replace[tables["deliveries"]] = staged_deliveries()
+            with instrument.stage("publish", fmt):
+                publish(conn, fmt, replace, {}, changes["entries"])
+            return
+
+        print(f"{fmt.upper()}: parsing {len(changes['new'])} new and {len(changes['changed'])} "
+              f"changed match files, dropping {len(changes['removed'])} removed.")
+        stale_ids = [match_key(path) for path in stale]
+        removed = match_contributions(conn, fmt, stale_ids) if stale_ids else None
+        with instrument.stage("parse", fmt):
+            parsed = parse_all(fmt, workers=workers, paths=changes["new"] + changes["changed"],
+                               on_deliveries=write_deliveries)
+        with instrument.stage("stage", fmt):
+            register_people(conn, parsed["people"])
+            existing = {key: read_table(conn, summary_view(key, fmt)) for key in SUMMARY_KEYS}
+            merged = merge_summaries(existing, parsed, removed)
+            replace = {tables[key]: stage_frame(conn, tables[key], encode_summary(conn, key, merged[key]))
+                       for key in SUMMARY_KEYS}
+            append = {
+                tables["matches"]: stage_frame(conn, tables["matches"], parsed["matches"], MATCHES_SCHEMA),
+                tables["deliveries"]: staged_deliveries(),
+                tables["match_teams"]: stage_frame(
+                    conn, tables["match_teams"], match_teams_frame(conn, parsed["match_teams"]),
+                    MATCH_TEAMS_SCHEMA,
+                ),
+            }
+        with instrument.stage("publish", fmt):
+            publish(conn, fmt, replace, append, changes["entries"], stale_ids)
+    finally:
+        conn.close()
+
 if __name__ == "__main__":
-    for fmt in ["odi", "t20", "test", "ipl"]:
-        df = parse_matches(fmt)
-        save_to_db(df, f"{fmt}_matches")
-          
-        df_batting = parse_batting(fmt)
-        save_to_db(df_batting, f"batting_stats_{fmt}")
-
-        df_bowling = parse_bowling(fmt)
-        save_to_db(df_bowling, f"bowling_stats_{fmt}")
-
-        df_team = build_team_results(fmt)
-        save_to_db(df_team, f"team_results_{fmt}")
+    parser = argparse.ArgumentParser(description="Load Cricsheet JSON into SQLite.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes used to parse each format (default: 1)")
+    parser.add_argument("--full", action="store_true",
+                        help="ignore the manifest and rebuild every table")
+    parser.add_argument("--fetch", action="store_true",
+                        help="download fresh archives first and only load formats that changed")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=FORMATS,
+                        help="formats to load (default: all)")
+    parser.add_argument("--log", default=instrument.LOG_PATH,
+                        help="JSON-lines log of stage timings, '-' for stderr (default: ../logs/etl.jsonl)")
+    parser.add_argument("--profile", nargs="+", choices=instrument.PROFILE_MODES, default=[],
+                        help="profile every stage: cpu (cProfile) and/or memory (tracemalloc)")
+    parser.add_argument("--profile-dir", default=instrument.PROFILE_DIR,
+                        help="folder for profile output (default: ../profiles)")
+    args = parser.parse_args()
+
+    instrument.configure_logging(args.log)
+    if args.profile:
+        instrument.configure(args.profile, args.profile_dir)
+
+    # One run covers the download and every format.
+    with instrument.run("etl", db_path=DB_PATH):
+        formats = args.formats
+        if args.fetch:
+            from scraper import ZIP_LINKS, download_and_extract
+            changed = download_and_extract({fmt: ZIP_LINKS[fmt] for fmt in formats})
+            formats = [fmt for fmt in formats if fmt in changed]
+
+        for fmt in formats:
+            run_etl(fmt, workers=args.workers, full=args.full)
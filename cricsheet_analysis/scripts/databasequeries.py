@@ -1,26 +1,710 @@
-import sqlite3
+import time
 import pandas as pd
-import os
+from connections import DB_PATH, read_connection, write_connection
+import catalog
+from metrics import MATCHUP_METRICS, OVER_METRICS, PHASES
+import telemetry
+from instrument import RUNS_TABLE
+
+# Per-delivery counts over deliveries_{fmt} d, defined once for every table
+# that sums them: the batting and bowling summaries, the innings, over and
+# matchup tables, and database.match_contributions(). Batting counts are
+# runs off the bat and every ball faced; bowling counts charge all runs and
+# legal balls only.
+BATTING_COUNTS = {
+    "runs": "d.runs_batter",
+    "ball": "1",
+    "four": "CASE WHEN d.runs_batter = 4 THEN 1 ELSE 0 END",
+    "six": "CASE WHEN d.runs_batter = 6 THEN 1 ELSE 0 END",
+    "dot": "CASE WHEN d.runs_batter = 0 THEN 1 ELSE 0 END",
+}
+BOWLING_COUNTS = {
+    "runs_conceded": "d.runs_batter + d.extras",
+    "ball": "1 - d.is_wide",
+    "wicket": "CASE WHEN d.wicket_kind_id > 0 THEN 1 ELSE 0 END",
+    "dot": "CASE WHEN d.runs_batter + d.extras = 0 THEN 1 ELSE 0 END",
+}
+
+def count_columns(counts: dict, names=None, summed: bool = True, rename: dict = None) -> str:
+    """
+    SELECT list of count expressions, e.g. "SUM(d.runs_batter) AS runs, ...".
+
+    Args:
+        counts (dict): BATTING_COUNTS or BOWLING_COUNTS.
+        names (list): Counts to select, in this order; None for all of them.
+        summed (bool): Wrap each expression in SUM() for a GROUP BY; False
+            gives the per-delivery values.
+        rename (dict): Count name -> column alias, where they differ.
+    """
+    rename = rename or {}
+    return ", ".join(
+        f"{f'SUM({counts[name]})' if summed else counts[name]} AS {rename.get(name, name)}"
+        for name in (names or counts)
+    )
 
 def build_batting_summary(fmt: str):
-    conn = sqlite3.connect("cricket.db")
-    query = f"""
-    CREATE TABLE IF NOT EXISTS batting_stats_{fmt} AS
-    SELECT 
-        batsman AS batter,
-        SUM(runs_batsman) AS runs,
-        COUNT(*) AS balls,
-        SUM(CASE WHEN runs_batsman = 4 THEN 1 ELSE 0 END) AS fours,
-        SUM(CASE WHEN runs_batsman = 6 THEN 1 ELSE 0 END) AS sixes,
-        ROUND(CAST(SUM(runs_batsman) AS FLOAT) / COUNT(*) * 100, 2) AS strike_rate
-    FROM deliveries_{fmt}
-    GROUP BY batsman;
-    """
-    conn.execute(query)
+    """
+    Rebuild batting_summary_{fmt} from the deliveries_{fmt} fact table.
+
+    Grouping is done on the integer player and team keys; the
+    batting_stats_{fmt} view created by database.py adds the names.
+
+    Args:
+        fmt (str): Format suffix, e.g. "odi".
+    """
+    conn = write_connection(DB_PATH)
+    conn.executescript(f"""
+    DROP TABLE IF EXISTS batting_summary_{fmt};
+    CREATE TABLE batting_summary_{fmt} AS
+    SELECT
+        batter_id, team_id, runs, ball, four, six, dot,
+        ROUND(runs * 100.0 / ball, 2) AS strike_rate,
+        ROUND(dot * 100.0 / ball, 2) AS dot_pct,
+        ROUND((four + six) * 100.0 / ball, 2) AS boundary_pct
+    FROM (
+        SELECT d.batter_id, d.team_id, {count_columns(BATTING_COUNTS)}
+        FROM deliveries_{fmt} d
+        WHERE d.batter_id IS NOT NULL AND d.team_id IS NOT NULL
+        GROUP BY d.batter_id, d.team_id
+    )
+    ORDER BY batter_id, team_id;
+    """)
+    conn.commit()
+    conn.close()
+
+def build_bowling_summary(fmt: str):
+    """
+    Rebuild bowling_summary_{fmt} from the deliveries_{fmt} fact table.
+
+    Grouping is done on the integer player and team keys; the
+    bowling_stats_{fmt} view created by database.py adds the names.
+
+    Args:
+        fmt (str): Format suffix, e.g. "odi".
+    """
+    conn = write_connection(DB_PATH)
+    conn.executescript(f"""
+    DROP TABLE IF EXISTS bowling_summary_{fmt};
+    CREATE TABLE bowling_summary_{fmt} AS
+    SELECT
+        bowler_id, against_team_id, runs_conceded, ball, wicket, dot,
+        ball / 6 + (ball % 6) / 10.0 AS overs,
+        ROUND(runs_conceded * 6.0 / ball, 2) AS economy,
+        ROUND(CAST(ball AS FLOAT) / wicket, 2) AS strike_rate,
+        ROUND(CAST(runs_conceded AS FLOAT) / wicket, 2) AS avg,
+        ROUND(dot * 100.0 / ball, 2) AS dot_pct
+    FROM (
+        SELECT d.bowler_id, d.team_id AS against_team_id, {count_columns(BOWLING_COUNTS)}
+        FROM deliveries_{fmt} d
+        WHERE d.bowler_id IS NOT NULL AND d.team_id IS NOT NULL
+        GROUP BY d.bowler_id, d.team_id
+    )
+    ORDER BY bowler_id, against_team_id;
+    """)
     conn.commit()
     conn.close()
 
-DB_PATH = os.environ.get("CRICSHEET_DB", "scripts/cricket.db")
+def read_query(sql: str, params=()) -> pd.DataFrame:
+    """
+    Run a parameterised SELECT against the database.
+
+    The time and row count are recorded in telemetry as an "sql" sample,
+    named after the innermost open telemetry timer (the loader calling it).
+
+    Args:
+        sql (str): Query text with ? placeholders.
+        params (tuple): Values bound to the placeholders.
+
+    Returns:
+        pd.DataFrame: Query result.
+    """
+    start = time.perf_counter()
+    df = pd.read_sql(sql, read_connection(DB_PATH), params=params)
+    caller = telemetry.current()
+    telemetry.record(caller.name if caller else "read_query", "sql",
+                     time.perf_counter() - start, len(df))
+    return df
+
+def read_table(table_name: str) -> pd.DataFrame:
+    """
+    Read a whole table or view, e.g. for exports.
+
+    Args:
+        table_name (str): Table or view name.
+
+    Returns:
+        pd.DataFrame: Every row of the table.
+    """
+    return read_query(f"SELECT * FROM {table_name}")
+
+def year_filter(years=None, column: str = "date"):
+    """
+    WHERE clause restricting an ISO date column to a range of years.
+
+    The bounds are compared as strings ("2019" <= "2019-05-01" < "2021"),
+    so the condition can use an index on the date column.
+
+    Args:
+        years (tuple): Inclusive (first, last) year, or None for all years.
+        column (str): Date column to filter.
+
+    Returns:
+        tuple: (sql, params), where sql is "" when years is None.
+    """
+    if not years:
+        return "", ()
+    first, last = years
+    return f"WHERE {column} >= ? AND {column} < ?", (f"{int(first):04d}", f"{int(last) + 1:04d}")
+
+def _and(where: str, condition: str) -> str:
+    return f"{where} AND {condition}" if where else f"WHERE {condition}"
+
+# Chart-ready aggregates of a format's matches, materialised by database.py
+# as rollup_<name>_{fmt} whenever the matches change, so dashboard queries
+# never scan raw match rows. {matches} is the matches table, or a team
+# filtered subquery of it (see rollup_source). year is the first four
+# characters of the ISO date (NULL for undated matches).
+ROLLUPS = {
+    "year": """
+        SELECT SUBSTR(date, 1, 4) AS year,
+               COUNT(*) AS matches,
+               SUM(CASE WHEN toss_winner = match_winner THEN 1 ELSE 0 END) AS toss_winner_won
+        FROM {matches}
+        GROUP BY year
+    """,
+    "venue_year": """
+        SELECT venue, SUBSTR(date, 1, 4) AS year, COUNT(*) AS matches
+        FROM {matches}
+        WHERE venue IS NOT NULL
+        GROUP BY venue, year
+    """,
+    "team_year": """
+        SELECT match_winner AS team, SUBSTR(date, 1, 4) AS year, COUNT(*) AS wins
+        FROM {matches}
+        WHERE match_winner IS NOT NULL
+        GROUP BY team, year
+    """,
+    "toss": """
+        SELECT toss_winner, match_winner, SUBSTR(date, 1, 4) AS year, COUNT(*) AS matches
+        FROM {matches}
+        WHERE toss_winner IS NOT NULL AND match_winner IS NOT NULL
+        GROUP BY toss_winner, match_winner, year
+    """,
+}
+
+# Group columns of each rollup, the keys incremental loads update by.
+ROLLUP_KEYS = {
+    "year": ["year"],
+    "venue_year": ["venue", "year"],
+    "team_year": ["team", "year"],
+    "toss": ["toss_winner", "match_winner", "year"],
+}
+
+def rollup_table(name: str, fmt: str) -> str:
+    return f"rollup_{name}_{fmt}"
+
+# Per-innings player summaries, materialised by database.py as
+# {key}_innings_{fmt} for player profiles. One row per player, innings and
+# phase, so innings totals and phase splits come from the same table.
+# {phase} is phase_case(fmt); {where} optionally limits the matches rebuilt.
+# A batter's dismissals are counted through player_out_id, which also
+# catches run outs at the non-striker's end; retirements are not outs.
+INNINGS = {
+    "batting": f"""
+        SELECT match_id, innings, batter_id, team_id, phase,
+               SUM(runs) AS runs, SUM(ball) AS ball, SUM(four) AS four,
+               SUM(six) AS six, SUM(dot) AS dot, SUM(out) AS out
+        FROM (
+            SELECT d.match_id, d.innings, d.batter_id, d.team_id, {{phase}} AS phase,
+                   {count_columns(BATTING_COUNTS, summed=False)}, 0 AS out
+            FROM {{deliveries}} d
+            WHERE d.batter_id IS NOT NULL AND d.team_id IS NOT NULL {{where}}
+            UNION ALL
+            SELECT d.match_id, d.innings, d.player_out_id, d.team_id, {{phase}},
+                   0, 0, 0, 0, 0, 1
+            FROM {{deliveries}} d
+            JOIN wicket_kinds w ON w.wicket_kind_id = d.wicket_kind_id
+            WHERE d.player_out_id IS NOT NULL AND d.team_id IS NOT NULL
+              AND w.name NOT IN ('retired hurt', 'retired not out') {{where}}
+        )
+        GROUP BY match_id, innings, batter_id, team_id, phase
+    """,
+    "bowling": f"""
+        SELECT d.match_id, d.innings, d.bowler_id, d.team_id AS against_team_id,
+               {{phase}} AS phase, {count_columns(BOWLING_COUNTS)}
+        FROM {{deliveries}} d
+        WHERE d.bowler_id IS NOT NULL AND d.team_id IS NOT NULL {{where}}
+        GROUP BY d.match_id, d.innings, d.bowler_id, d.team_id, phase
+    """,
+}
+
+def innings_table(key: str, fmt: str) -> str:
+    return f"{key}_innings_{fmt}"
+
+def phase_case(fmt: str, column: str = "d.over") -> str:
+    """SQL expression naming the metrics.PHASES phase of an over (NULL outside any phase)."""
+    phases = PHASES.get(fmt)
+    if not phases:
+        return "NULL"
+    whens = " ".join(
+        f"WHEN {column} BETWEEN {first} AND {last} THEN '{name}'" for name, first, last in phases
+    )
+    return f"CASE {whens} END"
+
+# Over-by-over analytics, materialised by database.py as
+# over_stats_{dimension}_{fmt} (one row per key and over number) and, for
+# formats with phases, phase_stats_{dimension}_{fmt} regrouped from those.
+# Team, bowler and venue rows count from the bowling side like the bowling
+# summary: all runs, legal balls and every dismissal. Batter rows count
+# runs off the bat, balls faced and the batter's own dismissals. {where}
+# optionally limits the deliveries counted, like INNINGS.
+_BALL_COUNTS = count_columns(BOWLING_COUNTS, rename={"runs_conceded": "runs"})
+OVER_STATS = {
+    "team": f"""
+        SELECT d.team_id, d.over, {_BALL_COUNTS}
+        FROM {{deliveries}} d
+        WHERE d.team_id IS NOT NULL {{where}}
+        GROUP BY d.team_id, d.over
+    """,
+    "batter": f"""
+        SELECT batter_id, over, SUM(runs) AS runs, SUM(ball) AS ball,
+               SUM(out) AS wicket, SUM(dot) AS dot
+        FROM (
+            SELECT d.batter_id, d.over,
+                   {count_columns(BATTING_COUNTS, ["runs", "ball", "dot"], summed=False)}, 0 AS out
+            FROM {{deliveries}} d
+            WHERE d.batter_id IS NOT NULL {{where}}
+            UNION ALL
+            SELECT d.player_out_id, d.over, 0, 0, 0, 1
+            FROM {{deliveries}} d
+            JOIN wicket_kinds w ON w.wicket_kind_id = d.wicket_kind_id
+            WHERE d.player_out_id IS NOT NULL
+              AND w.name NOT IN ('retired hurt', 'retired not out') {{where}}
+        )
+        GROUP BY batter_id, over
+    """,
+    "bowler": f"""
+        SELECT d.bowler_id, d.over, {_BALL_COUNTS}
+        FROM {{deliveries}} d
+        WHERE d.bowler_id IS NOT NULL {{where}}
+        GROUP BY d.bowler_id, d.over
+    """,
+    "venue": f"""
+        SELECT m.venue, d.over, {_BALL_COUNTS}
+        FROM {{deliveries}} d
+        JOIN {{matches}} m ON m.match_id = d.match_id
+        WHERE m.venue IS NOT NULL {{where}}
+        GROUP BY m.venue, d.over
+    """,
+}
+# dimension -> (key column, (name table, its id column) joined by readers, or None)
+OVER_STATS_KEYS = {
+    "team": ("team_id", ("teams", "team_id")),
+    "batter": ("batter_id", ("players", "player_id")),
+    "bowler": ("bowler_id", ("players", "player_id")),
+    "venue": ("venue", None),
+}
+
+def analytics_table(grain: str, dimension: str, fmt: str) -> str:
+    """Name of an analytics table, grain "over" or "phase", e.g. phase_stats_team_t20."""
+    return f"{grain}_stats_{dimension}_{fmt}"
+
+def metric_columns(specs: dict = OVER_METRICS) -> str:
+    """SELECT list computing metrics specs in SQL, NULL where the denominator is 0."""
+    return ", ".join(
+        f"ROUND({num} * {scale}.0 / NULLIF({den}, 0), 2) AS {name}"
+        for name, (num, den, scale) in specs.items()
+    )
+
+def with_metrics(select: str, specs: dict = OVER_METRICS) -> str:
+    """Wrap a SELECT of summed counts so it also returns the specs' ratio columns."""
+    return f"SELECT *, {metric_columns(specs)} FROM ({select})"
+
+def phase_select(dimension: str, fmt: str) -> str:
+    """Regroup over_stats_{dimension}_{fmt} by phase (see metrics.PHASES)."""
+    key = OVER_STATS_KEYS[dimension][0]
+    return f"""
+        SELECT {key}, phase, SUM(runs) AS runs, SUM(ball) AS ball,
+               SUM(wicket) AS wicket, SUM(dot) AS dot
+        FROM (
+            SELECT *, {phase_case(fmt, "over")} AS phase
+            FROM {analytics_table("over", dimension, fmt)}
+        )
+        WHERE phase IS NOT NULL
+        GROUP BY {key}, phase
+    """
+
+def _analytics(grain: str, dimension: str, fmt: str, names=None, min_balls: int = 0) -> pd.DataFrame:
+    key, names_table = OVER_STATS_KEYS[dimension]
+    order = "s.over"
+    if grain == "phase":
+        whens = " ".join(f"WHEN '{phase}' THEN {i}" for i, (phase, _, _) in enumerate(PHASES.get(fmt, [])))
+        order = f"CASE s.phase {whens} END" if whens else "s.phase"
+    if names_table is None:
+        select, join, name = "s.*", "", f"s.{key}"
+    else:
+        dim_table, id_col = names_table
+        select = f"d.name AS {dimension}, s.*"
+        join = f"JOIN {dim_table} d ON d.{id_col} = s.{key}"
+        name = "d.name"
+    where, params = "WHERE s.ball >= ?", (min_balls,)
+    if names:
+        where += f" AND {name} IN ({', '.join('?' * len(names))})"
+        params += tuple(names)
+    return read_query(f"""
+        SELECT {select} FROM {analytics_table(grain, dimension, fmt)} s {join}
+        {where}
+        ORDER BY {name}, {order}
+    """, params)
+
+def over_stats(fmt: str, dimension: str, names=None, min_balls: int = 0) -> pd.DataFrame:
+    """
+    Per-over runs, balls, wickets and dots with run_rate, wicket_rate and
+    dot_pct, read from over_stats_{dimension}_{fmt}.
+
+    Args:
+        fmt (str): Format suffix, e.g. "t20".
+        dimension (str): "team", "batter", "bowler" or "venue".
+        names (tuple): Only these teams, players or venues; None for all.
+        min_balls (int): Only rows with at least this many balls.
+
+    Returns:
+        pd.DataFrame: One row per name and over (0-based), with the name column first.
+    """
+    return _analytics("over", dimension, fmt, names, min_balls)
+
+def phase_stats(fmt: str, dimension: str, names=None, min_balls: int = 0) -> pd.DataFrame:
+    """Same as over_stats(), per powerplay / middle / death phase instead of per over."""
+    return _analytics("phase", dimension, fmt, names, min_balls)
+
+# Batter x bowler head-to-head counts, stored sparsely by database.py as
+# matchups_{fmt}: one row per pair that actually met, keyed on
+# (batter_id, bowler_id). Dismissals are those credited to the bowler.
+# {where} optionally limits the deliveries counted.
+MATCHUPS_SCHEMA = """
+    CREATE TABLE {table} (
+        batter_id INTEGER NOT NULL,
+        bowler_id INTEGER NOT NULL,
+        ball INTEGER NOT NULL,
+        runs INTEGER NOT NULL,
+        dot INTEGER NOT NULL,
+        four INTEGER NOT NULL,
+        six INTEGER NOT NULL,
+        dismissals INTEGER NOT NULL,
+        PRIMARY KEY (batter_id, bowler_id)
+    ) WITHOUT ROWID
+"""
+MATCHUPS = f"""
+    SELECT d.batter_id, d.bowler_id,
+           {count_columns(BATTING_COUNTS, ["ball", "runs", "dot", "four", "six"])},
+           SUM(CASE WHEN d.player_out_id = d.batter_id AND w.name NOT IN (
+                   'run out', 'retired hurt', 'retired not out', 'obstructing the field'
+               ) THEN 1 ELSE 0 END) AS dismissals
+    FROM {{deliveries}} d
+    LEFT JOIN wicket_kinds w ON w.wicket_kind_id = d.wicket_kind_id
+    WHERE d.batter_id IS NOT NULL AND d.bowler_id IS NOT NULL {{where}}
+    GROUP BY d.batter_id, d.bowler_id
+"""
+
+def matchups_table(fmt: str) -> str:
+    return f"matchups_{fmt}"
+
+def team_matches(fmt: str, team_filter):
+    """
+    Subquery of the matches in which any of the given teams played.
+
+    Uses the match_teams_{fmt} association table and its team_id index
+    instead of matching names inside the teams text column.
+
+    Returns:
+        tuple: (sql, params)
+    """
+    placeholders = ", ".join("?" * len(team_filter))
+    sql = f"""(
+        SELECT * FROM {fmt}_matches WHERE match_id IN (
+            SELECT mt.match_id
+            FROM match_teams_{fmt} mt
+            JOIN teams t ON t.team_id = mt.team_id
+            WHERE t.name IN ({placeholders})
+        )
+    )"""
+    return sql, tuple(team_filter)
+
+def rollup_source(name: str, fmt: str, team_filter=None):
+    """
+    FROM target for a rollup: the materialised table, or with a team filter
+    the same aggregate computed over that team's matches only.
+
+    A database not yet rebuilt by database.py has no rollup tables; the
+    aggregate is then computed over {fmt}_matches with the same SQL.
+
+    Returns:
+        tuple: (sql, params)
+    """
+    if team_filter:
+        matches, params = team_matches(fmt, team_filter)
+        return f"({ROLLUPS[name].format(matches=matches)})", params
+    if catalog.has_table(rollup_table(name, fmt), DB_PATH):
+        return rollup_table(name, fmt), ()
+    return f"({ROLLUPS[name].format(matches=f'{fmt}_matches')})", ()
+
+def year_bounds(fmt: str):
+    """
+    First and last year with matches in a format.
+
+    Returns:
+        tuple | None: (first, last) as ints, or None if there are no dated matches.
+    """
+    source, params = rollup_source("year", fmt)
+    row = read_query(
+        f"SELECT MIN(year) AS first, MAX(year) AS last FROM {source} WHERE year IS NOT NULL", params
+    ).iloc[0]
+    if row["first"] is None:
+        return None
+    return int(str(row["first"])[:4]), int(str(row["last"])[:4])
+
+def match_counts(fmt: str, years=None, team_filter=None) -> dict:
+    """
+    Headline counts for the overview tab.
+
+    Returns:
+        dict: matches, venues and winners (distinct match winners).
+    """
+    where, params = year_filter(years, "year")
+    sources = [rollup_source(name, fmt, team_filter) for name in ("year", "venue_year", "team_year")]
+    (year, year_params), (venue, venue_params), (team, team_params) = sources
+    row = read_query(f"""
+        SELECT (SELECT COALESCE(SUM(matches), 0) FROM {year} {where}) AS matches,
+               (SELECT COUNT(DISTINCT venue) FROM {venue} {where}) AS venues,
+               (SELECT COUNT(DISTINCT team) FROM {team} {where}) AS winners
+    """, year_params + params + venue_params + params + team_params + params).iloc[0]
+    return {key: int(value) for key, value in row.items()}
+
+def matches_per_year(fmt: str, years=None, team_filter=None) -> pd.DataFrame:
+    """Columns: year, matches."""
+    source, source_params = rollup_source("year", fmt, team_filter)
+    where, params = year_filter(years, "year")
+    return read_query(f"""
+        SELECT year, matches
+        FROM {source} {_and(where, "year IS NOT NULL")}
+        ORDER BY year
+    """, source_params + params)
+
+def top_venues(fmt: str, years=None, limit: int = 10, team_filter=None) -> pd.DataFrame:
+    """Columns: venue, matches; busiest venues first."""
+    source, source_params = rollup_source("venue_year", fmt, team_filter)
+    where, params = year_filter(years, "year")
+    return read_query(f"""
+        SELECT venue, SUM(matches) AS matches
+        FROM {source} {where}
+        GROUP BY venue ORDER BY matches DESC, venue LIMIT ?
+    """, source_params + params + (limit,))
+
+def toss_outcomes(fmt: str, years=None, team_filter=None) -> pd.DataFrame:
+    """Columns: Outcome, Count; how often the toss winner also won the match."""
+    source, source_params = rollup_source("year", fmt, team_filter)
+    where, params = year_filter(years, "year")
+    row = read_query(f"""
+        SELECT COALESCE(SUM(toss_winner_won), 0) AS won, COALESCE(SUM(matches), 0) AS matches
+        FROM {source} {where}
+    """, source_params + params).iloc[0]
+    counts = pd.DataFrame({
+        "Outcome": ["Toss = Match Winner", "Toss ≠ Match Winner"],
+        "Count": [int(row["won"]), int(row["matches"] - row["won"])],
+    })
+    counts = counts[counts["Count"] > 0]
+    return counts.sort_values("Count", ascending=False, kind="stable").reset_index(drop=True)
+
+def top_winners(fmt: str, years=None, limit: int = 10, team_filter=None) -> pd.DataFrame:
+    """Columns: team, wins; most match wins first."""
+    source, source_params = rollup_source("team_year", fmt, team_filter)
+    where, params = year_filter(years, "year")
+    return read_query(f"""
+        SELECT team, SUM(wins) AS wins
+        FROM {source} {where}
+        GROUP BY team ORDER BY wins DESC, team LIMIT ?
+    """, source_params + params + (limit,))
+
+def toss_winner_crosstab(fmt: str, years=None, team_filter=None) -> pd.DataFrame:
+    """Match counts with toss winners as rows and match winners as columns."""
+    source, source_params = rollup_source("toss", fmt, team_filter)
+    where, params = year_filter(years, "year")
+    counts = read_query(f"""
+        SELECT toss_winner, match_winner, SUM(matches) AS matches
+        FROM {source} {where}
+        GROUP BY toss_winner, match_winner
+    """, source_params + params)
+    return counts.pivot(index="toss_winner", columns="match_winner", values="matches").fillna(0).astype(int)
+
+def wins_by_year(fmt: str, teams, years=None, team_filter=None) -> pd.DataFrame:
+    """Columns: year, match_winner, wins; restricted to the given teams."""
+    if not teams:
+        return pd.DataFrame(columns=["year", "match_winner", "wins"])
+    source, source_params = rollup_source("team_year", fmt, team_filter)
+    where, params = year_filter(years, "year")
+    placeholders = ", ".join("?" * len(teams))
+    return read_query(f"""
+        SELECT year, team AS match_winner, wins
+        FROM {source} {_and(where, f"team IN ({placeholders}) AND year IS NOT NULL")}
+        ORDER BY year, team
+    """, source_params + params + tuple(teams))
+
+def filtered_matches(fmt: str, years=None, team_filter=None) -> pd.DataFrame:
+    """All match rows within the year range (and of the given teams), for exports."""
+    source, source_params = team_matches(fmt, team_filter) if team_filter else (f"{fmt}_matches", ())
+    where, params = year_filter(years)
+    return read_query(f"SELECT * FROM {source} {where}", source_params + params)
+
+def match_deliveries(fmt: str, match_id: int) -> pd.DataFrame:
+    """
+    Ball-by-ball rows of one match with player and team names, for drill-downs.
+
+    Looks the match up through the match_id index of deliveries_{fmt}.
+    """
+    return read_query(f"""
+        SELECT d.innings, d.over, d.ball, t.name AS team,
+               b.name AS batter, p.name AS bowler,
+               d.runs_batter, d.extras, d.is_wide, w.name AS wicket_kind,
+               o.name AS player_out
+        FROM deliveries_{fmt} d
+        LEFT JOIN teams t ON t.team_id = d.team_id
+        LEFT JOIN players b ON b.player_id = d.batter_id
+        LEFT JOIN players p ON p.player_id = d.bowler_id
+        LEFT JOIN wicket_kinds w ON w.wicket_kind_id = d.wicket_kind_id
+        LEFT JOIN players o ON o.player_id = d.player_out_id
+        WHERE d.match_id = ?
+        ORDER BY d.innings, d.over, d.ball
+    """, (match_id,))
+
+# Columns a leaderboard may be ordered by; ORDER BY cannot be a bound parameter.
+LEADERBOARD_COLUMNS = {
+    "batting_stats": {"runs", "ball", "four", "six", "strike_rate", "dot_pct", "boundary_pct"},
+    "bowling_stats": {"wicket", "ball", "runs_conceded", "economy", "strike_rate", "avg", "dot_pct"},
+}
+
+def leaderboard(table: str, fmt: str, order_by: str, min_balls: int = 0,
+                limit: int = 15, ascending: bool = False) -> pd.DataFrame:
+    """
+    Top rows of a batting or bowling summary table.
+
+    Args:
+        table (str): "batting_stats" or "bowling_stats".
+        fmt (str): Format suffix, e.g. "odi".
+        order_by (str): Column to rank by, one of LEADERBOARD_COLUMNS[table].
+        min_balls (int): Only rows with at least this many balls.
+        limit (int): Number of rows returned.
+        ascending (bool): Rank lowest first, e.g. for economy.
+
+    Returns:
+        pd.DataFrame: At most limit rows of the summary table.
+    """
+    if order_by not in LEADERBOARD_COLUMNS[table]:
+        raise ValueError(f"Cannot rank {table} by {order_by!r}")
+    direction = "ASC" if ascending else "DESC"
+    return read_query(f"""
+        SELECT * FROM {table}_{fmt}
+        WHERE ball >= ? AND {order_by} IS NOT NULL
+        ORDER BY {order_by} {direction} LIMIT ?
+    """, (min_balls, limit))
+
+def max_balls(table: str, fmt: str) -> int:
+    """Largest ball count in a batting or bowling summary table (slider bound)."""
+    value = read_query(f"SELECT MAX(ball) AS ball FROM {table}_{fmt}").iloc[0]["ball"]
+    return int(value) if value is not None and not pd.isna(value) else 0
+
+def top_teams(fmt: str, limit: int = 15) -> pd.DataFrame:
+    """Rows of team_results_{fmt} with the most wins."""
+    return read_query(f"SELECT * FROM team_results_{fmt} ORDER BY wins DESC LIMIT ?", (limit,))
+
+def team_names(fmt: str) -> list:
+    """Sorted names of every team that played a match in the format."""
+    return read_query(f"""
+        SELECT name FROM teams
+        WHERE team_id IN (SELECT team_id FROM match_teams_{fmt})
+        ORDER BY name
+    """)["name"].tolist()
+
+def player_names(fmt: str) -> list:
+    """Sorted names of every player who batted or bowled in the format."""
+    return read_query(f"""
+        SELECT name FROM players
+        WHERE player_id IN (SELECT batter_id FROM batting_summary_{fmt})
+           OR player_id IN (SELECT bowler_id FROM bowling_summary_{fmt})
+        ORDER BY name
+    """)["name"].tolist()
+
+# Columns top_matchups() may rank by.
+MATCHUP_COLUMNS = {"ball", "runs", "dot", "four", "six", "dismissals"} | set(MATCHUP_METRICS)
+
+def _matchups(fmt: str, where: str = "", params=(), order: str = "", limit: int = -1) -> pd.DataFrame:
+    return read_query(f"""
+        SELECT b.name AS batter, p.name AS bowler, m.*, {metric_columns(MATCHUP_METRICS)}
+        FROM {matchups_table(fmt)} m
+        JOIN players b ON b.player_id = m.batter_id
+        JOIN players p ON p.player_id = m.bowler_id
+        {where} {order} LIMIT ?
+    """, tuple(params) + (limit,))
+
+def matchup(fmt: str, batter: str, bowler: str) -> pd.DataFrame:
+    """
+    Head-to-head numbers of one batter against one bowler.
+
+    Resolves both names through the players name index and reads the pair
+    by its (batter_id, bowler_id) primary key.
+
+    Returns:
+        pd.DataFrame: One row, or none if the two never met.
+    """
+    return _matchups(fmt, "WHERE b.name = ? AND p.name = ?", (batter, bowler))
+
+def batter_matchups(fmt: str, batter: str, min_balls: int = 0) -> pd.DataFrame:
+    """Every bowler a batter faced (the batter's row of the matrix), most balls first."""
+    return _matchups(fmt, "WHERE b.name = ? AND m.ball >= ?", (batter, min_balls),
+                     "ORDER BY m.ball DESC")
+
+def bowler_matchups(fmt: str, bowler: str, min_balls: int = 0) -> pd.DataFrame:
+    """Every batter a bowler bowled to (the bowler's column of the matrix), most balls first."""
+    return _matchups(fmt, "WHERE p.name = ? AND m.ball >= ?", (bowler, min_balls),
+                     "ORDER BY m.ball DESC")
+
+def top_matchups(fmt: str, order_by: str = "dismissals", min_balls: int = 0,
+                 limit: int = 10, ascending: bool = False) -> pd.DataFrame:
+    """
+    Top-N batter/bowler pairs of a format.
+
+    Args:
+        fmt (str): Format suffix, e.g. "t20".
+        order_by (str): Column to rank by, one of MATCHUP_COLUMNS.
+        min_balls (int): Only pairs with at least this many balls.
+        limit (int): Number of pairs returned.
+        ascending (bool): Rank lowest first, e.g. for strike_rate.
+
+    Returns:
+        pd.DataFrame: At most limit pairs with names, counts and MATCHUP_METRICS.
+    """
+    if order_by not in MATCHUP_COLUMNS:
+        raise ValueError(f"Cannot rank matchups by {order_by!r}")
+    direction = "ASC" if ascending else "DESC"
+    return _matchups(fmt, f"WHERE m.ball >= ? AND {order_by} IS NOT NULL", (min_balls,),
+                     f"ORDER BY {order_by} {direction}", limit)
+
+# Columns of instrument.RUNS_TABLE shown on the dashboard.
+RUN_COLUMNS = """run_id, stage, format, started_at, seconds, status, files, deliveries,
+                 rows_written, files_per_sec, deliveries_per_sec, peak_rss_mb"""
+
+def etl_runs(limit: int = 20) -> pd.DataFrame:
+    """Whole-run rows of the latest ETL runs (the last row of each run), newest first."""
+    return read_query(f"""
+        SELECT {RUN_COLUMNS} FROM {RUNS_TABLE}
+        WHERE rowid IN (SELECT MAX(rowid) FROM {RUNS_TABLE} GROUP BY run_id)
+        ORDER BY rowid DESC
+        LIMIT ?
+    """, (limit,))
+
+def etl_run_stages(run_id: str) -> pd.DataFrame:
+    """Stage rows of one ETL run, in the order they finished."""
+    return read_query(f"SELECT {RUN_COLUMNS} FROM {RUNS_TABLE} WHERE run_id = ? ORDER BY rowid",
+                      (run_id,))
 
 def get_tables():
     """
@@ -30,12 +714,9 @@ def get_tables():
         list: Sorted list of table names.
     """
     print(f"DB path - {DB_PATH}")
-    with sqlite3.connect(DB_PATH) as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [row[0] for row in cursor.fetchall()]
-        print(f"⚠️ Tables found: {tables}")
-        return sorted(tables)
+    tables = catalog.tables(DB_PATH)
+    print(f"⚠️ Tables found: {tables}")
+    return tables
 
 def table_exists(table_name):
     """
@@ -47,13 +728,7 @@ def table_exists(table_name):
     Returns:
         bool: True if the table exists, False otherwise.
     """
-    with sqlite3.connect(DB_PATH) as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT count(*) FROM sqlite_master WHERE type='table' AND name=?",
-            (table_name,)
-        )
-        return cursor.fetchone()[0] > 0
+    return catalog.has_table(table_name, DB_PATH)
 
 if __name__ == "__main__":
    get_tables()
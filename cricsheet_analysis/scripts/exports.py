@@ -0,0 +1,214 @@
+import os
+import argparse
+import gzip
+import importlib.util
+import pandas as pd
+import databasequeries as dq
+from connections import DB_PATH, read_connection
+
+EXPORT_DIR = os.path.join(os.path.dirname(__file__), "../exports")
+EXPORT_CHUNK_ROWS = 100_000  # rows read from SQLite and written per chunk
+
+# File type -> extension. Parquet and Arrow need pyarrow, which is optional.
+FILE_TYPES = {
+    "csv.gz": "csv.gz",
+    "csv": "csv",
+    "parquet": "parquet",
+    "arrow": "arrow",
+}
+ARROW_TYPES = ("parquet", "arrow")
+
+def _matches_source(fmt, years=None, team_filter=None):
+    source, params = dq.team_matches(fmt, team_filter) if team_filter else (f"{fmt}_matches", ())
+    where, year_params = dq.year_filter(years)
+    return f"(SELECT * FROM {source} {where})", params + year_params
+
+def _matches_sql(fmt, years=None, team_filter=None):
+    source, params = _matches_source(fmt, years, team_filter)
+    return f"SELECT * FROM {source}", params
+
+def _batting_sql(fmt, years=None, team_filter=None):
+    return f"SELECT * FROM batting_stats_{fmt}", ()
+
+def _bowling_sql(fmt, years=None, team_filter=None):
+    return f"SELECT * FROM bowling_stats_{fmt}", ()
+
+def _deliveries_sql(fmt, years=None, team_filter=None):
+    # No ORDER BY: rows stream in storage order (match by match) without a sort.
+    source, params = _matches_source(fmt, years, team_filter)
+    return f"""
+        SELECT d.match_id, m.date, m.venue, d.innings, d.over, d.ball,
+               t.name AS team, b.name AS batter, p.name AS bowler,
+               d.runs_batter, d.extras, d.is_wide,
+               w.name AS wicket_kind, o.name AS player_out
+        FROM deliveries_{fmt} d
+        JOIN {source} m ON m.match_id = d.match_id
+        LEFT JOIN teams t ON t.team_id = d.team_id
+        LEFT JOIN players b ON b.player_id = d.batter_id
+        LEFT JOIN players p ON p.player_id = d.bowler_id
+        LEFT JOIN wicket_kinds w ON w.wicket_kind_id = d.wicket_kind_id
+        LEFT JOIN players o ON o.player_id = d.player_out_id
+    """, params
+
+# Export name -> (table it needs, SQL builder(fmt, years, team_filter) -> (sql, params)).
+# Summaries are all-time; matches and deliveries honour the year and team filters.
+EXPORTS = {
+    "matches": ("{fmt}_matches", _matches_sql),
+    "batting_stats": ("batting_stats_{fmt}", _batting_sql),
+    "bowling_stats": ("bowling_stats_{fmt}", _bowling_sql),
+    "deliveries": ("deliveries_{fmt}", _deliveries_sql),
+}
+
+def file_types() -> list:
+    """File types usable here; parquet and arrow only when pyarrow is installed."""
+    has_arrow = importlib.util.find_spec("pyarrow") is not None
+    return [name for name in FILE_TYPES if has_arrow or name not in ARROW_TYPES]
+
+def iter_chunks(sql: str, params=(), chunksize: int = EXPORT_CHUNK_ROWS):
+    """
+    Yield a query's result as DataFrames of at most chunksize rows.
+
+    An empty result still yields one empty frame with the query's columns,
+    so writers always produce a file (CSV header only, or a schema-only
+    Parquet/Arrow file).
+    """
+    conn = read_connection(DB_PATH)
+    empty = True
+    for chunk in pd.read_sql(sql, conn, params=params, chunksize=chunksize):
+        empty = False
+        yield chunk
+    if empty:
+        columns = [column[0] for column in conn.execute(sql, params).description]
+        yield pd.DataFrame(columns=columns)
+
+def _write_csv(chunks, path, compress):
+    opener = gzip.open if compress else open
+    rows = 0
+    with opener(path, "wt", newline="", encoding="utf-8") as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, index=False, header=i == 0)
+            rows += len(chunk)
+    return rows
+
+def _arrow_schema(pa, chunk):
+    # A column that is all NULL in the first chunk would be inferred as the
+    # null type and reject later values; treat it as text instead.
+    schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+    return pa.schema([
+        pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field
+        for field in schema
+    ])
+
+def _write_arrow(chunks, path, file_type):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer, schema, rows = None, None, 0
+    try:
+        for chunk in chunks:
+            if writer is None:
+                schema = _arrow_schema(pa, chunk)
+                if file_type == "parquet":
+                    writer = pq.ParquetWriter(path, schema, compression="snappy")
+                else:
+                    writer = pa.ipc.new_file(path, schema)
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False, safe=False)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+def export_query(sql: str, path: str, file_type: str = "csv.gz", params=(),
+                 chunksize: int = EXPORT_CHUNK_ROWS) -> int:
+    """
+    Stream a query's result from SQLite to a file, chunk by chunk.
+
+    At most chunksize rows are in memory at a time. The file is written as
+    "<path>.part" and renamed into place once complete, so a failed export
+    never leaves a truncated file under the final name. A query without
+    rows still writes a file, with just the header or schema.
+
+    Args:
+        sql (str): SELECT with ? placeholders.
+        path (str): Destination file.
+        file_type (str): One of FILE_TYPES.
+        params (tuple): Values bound to the placeholders.
+        chunksize (int): Rows per chunk.
+
+    Returns:
+        int: Number of rows written.
+    """
+    if file_type not in FILE_TYPES:
+        raise ValueError(f"Unknown export file type {file_type!r}")
+    if file_type in ARROW_TYPES and file_type not in file_types():
+        raise ImportError(f"Exporting {file_type} needs pyarrow: pip install pyarrow")
+
+    part_path = f"{path}.part"
+    chunks = iter_chunks(sql, params, chunksize)
+    try:
+        if file_type in ARROW_TYPES:
+            rows = _write_arrow(chunks, part_path, file_type)
+        else:
+            rows = _write_csv(chunks, part_path, compress=file_type == "csv.gz")
+    except Exception:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    os.replace(part_path, path)
+    return rows
+
+def export_path(name: str, fmt: str, file_type: str, years=None, team_filter=None) -> str:
+    parts = [name, fmt]
+    if years:
+        parts.append(f"{years[0]}-{years[1]}")
+    if team_filter:
+        parts.append("-".join(sorted(team_filter)).replace(" ", "_"))
+    return os.path.join(EXPORT_DIR, f"{'_'.join(parts)}.{FILE_TYPES[file_type]}")
+
+def export(name: str, fmt: str, file_type: str = "csv.gz", years=None, team_filter=None,
+           path: str = None, chunksize: int = EXPORT_CHUNK_ROWS):
+    """
+    Export one of EXPORTS for a format to EXPORT_DIR (or path).
+
+    Args:
+        name (str): Export name, a key of EXPORTS, e.g. "deliveries".
+        fmt (str): Format suffix, e.g. "t20".
+        file_type (str): One of FILE_TYPES.
+        years (tuple): Inclusive (first, last) year, or None for all years.
+        team_filter (list): Only matches of these teams; None for all.
+        path (str): Destination file; defaults to export_path().
+        chunksize (int): Rows per chunk.
+
+    Returns:
+        tuple: (path, rows written).
+    """
+    table, build_sql = EXPORTS[name]
+    table = table.format(fmt=fmt)
+    if not dq.table_exists(table):
+        raise ValueError(f"Table {table} does not exist; run database.py first.")
+    path = path or export_path(name, fmt, file_type, years, team_filter)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    sql, params = build_sql(fmt, years, team_filter)
+    rows = export_query(sql, path, file_type, params, chunksize)
+    return path, rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export tables from the Cricsheet database.")
+    parser.add_argument("name", choices=list(EXPORTS), help="what to export")
+    parser.add_argument("--format", dest="fmt", required=True,
+                        choices=["odi", "t20", "test", "ipl"], help="match format")
+    parser.add_argument("--to", dest="file_type", choices=list(FILE_TYPES), default="csv.gz",
+                        help="file type (default: csv.gz)")
+    parser.add_argument("--years", type=int, nargs=2, metavar=("FIRST", "LAST"),
+                        help="only matches in this inclusive year range")
+    parser.add_argument("--teams", nargs="+", help="only matches of these teams")
+    parser.add_argument("--out", help="destination file (default: under ../exports)")
+    parser.add_argument("--chunksize", type=int, default=EXPORT_CHUNK_ROWS,
+                        help=f"rows per chunk (default: {EXPORT_CHUNK_ROWS})")
+    args = parser.parse_args()
+
+    path, rows = export(args.name, args.fmt, args.file_type, args.years, args.teams,
+                        args.out, args.chunksize)
+    print(f"✅ Exported {rows} rows to: {path}")
@@ -0,0 +1,327 @@
+import os
+import sys
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, peak RSS is recorded as NULL
+    resource = None
+
+RUNS_TABLE = "etl_runs"
+LOG_DIR = os.path.join(os.path.dirname(__file__), "../logs")
+LOG_PATH = os.path.join(LOG_DIR, "etl.jsonl")
+PROFILE_DIR = os.path.join(os.path.dirname(__file__), "../profiles")
+PROFILE_MODES = ("cpu", "memory")
+PROFILE_TOP = 25  # allocation sites listed per stage in memory profiles
+
+# Counters a stage can accumulate with add(); rates are derived from them.
+COUNTERS = ["files", "bytes_read", "deliveries", "rows_written", "cache_hits"]
+
+RUNS_SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS {RUNS_TABLE} (
+        run_id TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        format TEXT,
+        started_at TEXT NOT NULL,
+        seconds REAL NOT NULL,
+        status TEXT NOT NULL,
+        files INTEGER,
+        bytes_read INTEGER,
+        deliveries INTEGER,
+        rows_written INTEGER,
+        cache_hits INTEGER,
+        files_per_sec REAL,
+        deliveries_per_sec REAL,
+        peak_rss_mb REAL,
+        traced_peak_mb REAL,
+        profile TEXT
+    )
+"""
+
+logger = logging.getLogger("cricsheet")
+
+# Opt-in profiling, e.g. CRICSHEET_PROFILE=cpu,memory; see configure().
+_profile = {mode for mode in os.environ.get("CRICSHEET_PROFILE", "").split(",") if mode in PROFILE_MODES}
+_profile_dir = PROFILE_DIR
+_cpu_lock = threading.Lock()  # one cProfile at a time per process
+_local = threading.local()    # per-thread stack of open stages
+_run = None                   # the run stages are recorded into, shared by threads
+_run_lock = threading.Lock()
+
+def peak_rss_mb():
+    """Peak resident set size of this process and its finished children, in MiB."""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is KiB on Linux but bytes on macOS.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, event and the record's fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "event": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, default=str)
+
+def configure_logging(path: str = LOG_PATH, level=logging.INFO):
+    """
+    Send the "cricsheet" logger's structured events to a JSON-lines file.
+
+    Args:
+        path (str): Log file, appended to; "-" writes to stderr instead.
+        level (int): Lowest level written.
+    """
+    if path == "-":
+        handler = logging.StreamHandler()
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(JsonFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(level)
+
+def log_event(event: str, level=logging.INFO, **fields):
+    """Log a structured event; fields become keys of its JSON line."""
+    logger.log(level, event, extra={"fields": fields})
+
+def configure(profile=None, profile_dir: str = None):
+    """
+    Turn per-stage profiling on or off.
+
+    Args:
+        profile (iterable): Modes from PROFILE_MODES: "cpu" writes a cProfile
+            .prof file per stage, "memory" records each stage's tracemalloc
+            peak and writes its top allocation sites. Empty turns both off.
+        profile_dir (str): Folder for the profile files.
+    """
+    global _profile, _profile_dir
+    _profile = set(profile or ())
+    unknown = _profile - set(PROFILE_MODES)
+    if unknown:
+        raise ValueError(f"Unknown profile mode(s): {', '.join(sorted(unknown))}")
+    if profile_dir:
+        _profile_dir = profile_dir
+
+class Stage:
+    """Timing, counters and profile results of one instrumented stage."""
+
+    def __init__(self, name: str, fmt: str = None):
+        self.name = name
+        self.fmt = fmt
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.seconds = 0.0
+        self.status = "ok"
+        self.peak_rss_mb = None
+        self.traced_peak_mb = None
+        self.profile = []
+
+    def add(self, **counts):
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+
+    def row(self, run_id) -> dict:
+        rate = lambda n: round(n / self.seconds, 1) if self.seconds and n else None
+        return {
+            "run_id": run_id,
+            "stage": self.name,
+            "format": self.fmt,
+            "started_at": self.started_at,
+            "seconds": round(self.seconds, 4),
+            "status": self.status,
+            **{key: self.counts.get(key) or None for key in COUNTERS},
+            "files_per_sec": rate(self.counts["files"]),
+            "deliveries_per_sec": rate(self.counts["deliveries"]),
+            "peak_rss_mb": self.peak_rss_mb,
+            "traced_peak_mb": self.traced_peak_mb,
+            "profile": ";".join(self.profile) or None,
+        }
+
+def _stack() -> list:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+def add(**counts):
+    """
+    Add to the counters of the calling thread's innermost open stage.
+
+    A no-op outside a stage, so library code can count unconditionally.
+    """
+    stack = _stack()
+    if stack:
+        stack[-1].add(**counts)
+
+def _profile_path(stage: Stage, suffix: str) -> str:
+    run_id = _run["run_id"] if _run else "adhoc"
+    name = "-".join(part for part in (run_id, stage.fmt, stage.name) if part)
+    os.makedirs(_profile_dir, exist_ok=True)
+    return os.path.join(_profile_dir, f"{name}{suffix}")
+
+def _start_profiling(stage: Stage, profile: bool) -> dict:
+    active = {}
+    if not profile:
+        return active
+    if "cpu" in _profile and _cpu_lock.acquire(blocking=False):
+        # Nested or concurrent stages are covered by the profiles already running.
+        active["cpu"] = cProfile.Profile()
+        active["cpu"].enable()
+    if "memory" in _profile and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        active["memory"] = True
+    return active
+
+def _stop_profiling(stage: Stage, active: dict):
+    if "cpu" in active:
+        active["cpu"].disable()
+        _cpu_lock.release()
+        path = _profile_path(stage, ".prof")
+        active["cpu"].dump_stats(path)
+        stage.profile.append(path)
+    if "memory" in active:
+        stage.traced_peak_mb = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+        stats = tracemalloc.take_snapshot().statistics("lineno")[:PROFILE_TOP]
+        path = _profile_path(stage, ".memory.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"{stage.name} {stage.fmt or ''}: peak {stage.traced_peak_mb} MiB traced\n")
+            f.writelines(f"{stat}\n" for stat in stats)
+        stage.profile.append(path)
+        tracemalloc.stop()
+
+@contextmanager
+def stage(name: str, fmt: str = None, profile: bool = True):
+    """
+    Time a block of work as one stage of the current run.
+
+    Code inside the block (and the transform, scraper and database helpers
+    it calls) adds to the stage's counters with add(). On exit the stage is
+    logged as a structured "stage" event and kept for the run's history
+    rows. peak_rss_mb is the process peak so far, including finished worker
+    processes, so it reads as "memory needed up to here".
+
+    With profiling configured (see configure()), the stage also writes a
+    cProfile file and/or records its tracemalloc peak. cProfile only sees
+    the calling thread of the main process, not pool workers.
+
+    Args:
+        name (str): Stage name, e.g. "parse".
+        fmt (str): Format the stage works on, if any.
+        profile (bool): Allow profiling; off for stages run in threads.
+
+    Yields:
+        Stage: The stage, e.g. to call add() on directly.
+    """
+    current = Stage(name, fmt)
+    stack = _stack()
+    stack.append(current)
+    active = _start_profiling(current, profile)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException:
+        current.status = "error"
+        raise
+    finally:
+        current.seconds = time.perf_counter() - start
+        stack.pop()
+        _stop_profiling(current, active)
+        current.peak_rss_mb = peak_rss_mb()
+        with _run_lock:
+            run_id = _run["run_id"] if _run else None
+            if _run:
+                _run["stages"].append(current)
+        log_event("stage", **current.row(run_id))
+
+def new_run_id() -> str:
+    return f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+@contextmanager
+def run(name: str = "etl", fmt: str = None, db_path: str = None):
+    """
+    Group the stages of one ETL run and record them in the run-history table.
+
+    Opening a run inside another one joins the outer run, so the CLI can
+    wrap a download and several formats in one run while run_etl() called
+    on its own still gets a run of its own. On exit one row per stage, plus
+    a row for the whole run named after it, is written to RUNS_TABLE in
+    db_path. A failure to write the history is logged, never raised.
+
+    Args:
+        name (str): Stage name of the whole-run row, e.g. "etl".
+        fmt (str): Format, when the run covers a single one.
+        db_path (str): Database receiving the history rows; None only logs.
+
+    Yields:
+        str: The run id.
+    """
+    global _run
+    with _run_lock:
+        if _run is not None:
+            nested = True
+        else:
+            nested = False
+            _run = {"run_id": new_run_id(), "stages": []}
+        run_id = _run["run_id"]
+    if nested:
+        yield run_id
+        return
+
+    log_event("run_start", run_id=run_id, stage=name, format=fmt,
+              profile=",".join(sorted(_profile)) or None)
+    total = Stage(name, fmt)
+    start = time.perf_counter()
+    try:
+        yield run_id
+    except BaseException:
+        total.status = "error"
+        raise
+    finally:
+        total.seconds = time.perf_counter() - start
+        total.peak_rss_mb = peak_rss_mb()
+        with _run_lock:
+            stages, _run = _run["stages"], None
+        for part in stages:
+            total.add(**part.counts)
+        rows = [part.row(run_id) for part in stages] + [total.row(run_id)]
+        log_event("run_end", **total.row(run_id))
+        if db_path and save_runs(db_path, rows):
+            print(f"✅ Recorded run {run_id} ({total.seconds:.1f}s, {len(stages)} stages) in: {RUNS_TABLE}")
+
+def save_runs(db_path: str, rows: list):
+    """Append stage rows (see Stage.row) to RUNS_TABLE; False if that failed (logged, not raised)."""
+    from connections import write_connection  # lazily: reads CRICSHEET_DB on import
+
+    try:
+        conn = write_connection(db_path)
+        try:
+            conn.execute(RUNS_SCHEMA)
+            columns = list(rows[0])
+            conn.executemany(
+                f"INSERT INTO {RUNS_TABLE} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})",
+                [tuple(row[column] for column in columns) for row in rows]
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        log_event("run_history_failed", logging.WARNING, error=str(e))
+        print(f"⚠️ Could not record the run in {RUNS_TABLE}: {e}")
+        return False
+    return True
@@ -1,53 +1,44 @@
 import os
-import io
-import sqlite3
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.express as px
 import streamlit as st
-from pptx import Presentation
-from pptx.util import Inches, Pt
+import databasequeries as dq
+import catalog
+import profiles
+import reports
+import exports
+import telemetry
 
 # ----------------------
 # App Config
 # ----------------------
 st.set_page_config(page_title="🏏 Cricsheet Analytics Suite", layout="wide")
 st.title("🏏 Cricsheet Analytics Suite — EDA • Player/Team Insights • Exports")
-DB_PATH = os.environ.get("CRICSHEET_DB", "scripts/cricket.db")
+rerun_timer = telemetry.Timer("rerun", "page").start()
+DB_PATH = dq.DB_PATH
+EXPORT_DOWNLOAD_LIMIT_MB = 200  # larger exports are only written to disk, not sent to the browser
 
 # ----------------------
 # Utilities
 # ----------------------
 @st.cache_data(show_spinner=False)
-def get_tables():
-    with sqlite3.connect(DB_PATH) as conn:
-        df = pd.read_sql("SELECT name FROM sqlite_master WHERE type='table'", conn)
-    return sorted(df['name'].tolist())
-
-@st.cache_data(show_spinner=False)
-def read_sql(q: str) -> pd.DataFrame:
-    with sqlite3.connect(DB_PATH) as conn:
-        return pd.read_sql(q, conn)
-
-@st.cache_data(show_spinner=False)
-def load_matches(fmt: str) -> pd.DataFrame:
-    tbl = f"{fmt}_matches"
-    if tbl not in get_tables():
-        return pd.DataFrame(columns=["match_id","format","teams","venue","date","toss_winner","match_winner"]) 
-    df = read_sql(f"SELECT * FROM {tbl}")
-    # normalize date/year
-    if 'date' in df.columns:
-        df['year'] = df['date'].astype(str).str[:4]
-    return df
-
-@st.cache_data(show_spinner=False)
-def load_batting(fmt: str) -> pd.DataFrame:
-    tbl = f"batting_stats_{fmt}"
-    if tbl not in get_tables():
-        return pd.DataFrame(columns=["batter","runs","ball","fours","sixes","strike_rate"]) 
-    return read_sql(f"SELECT * FROM {tbl}")
+def cached_query(db_version, name: str, *args, **kwargs):
+    telemetry.mark_miss()  # only runs on a cache miss
+    return getattr(dq, name)(*args, **kwargs)
+
+def query(name: str, *args, **kwargs):
+    """Cached call of a databasequeries function; filters are pushed into SQL.
+
+    Results are keyed on the catalog version, so a reload of the database
+    invalidates them without clearing the cache by hand. Each call's time,
+    rows and cache hit/miss go to the Diagnostics tab (see telemetry.py).
+    """
+    with telemetry.Timer(name, "query", cached=True) as timer:
+        result = cached_query(catalog.version(DB_PATH), name, *args, **kwargs)
+        timer.rows = telemetry.rows_of(result)
+    return result
 
 # def load_batting(fmt: str) -> pd.DataFrame:
 #     conn = sqlite3.connect("cricket.db")
@@ -67,21 +58,7 @@ def load_batting(fmt: str) -> pd.DataFrame:
 #     conn.close()
 #     return df
 
-@st.cache_data(show_spinner=False)
-def load_bowling(fmt: str) -> pd.DataFrame:
-    tbl = f"bowling_stats_{fmt}"
-    if tbl not in get_tables():
-        return pd.DataFrame(columns=["bowler","ball","runs_conceded","wicket","overs","economy"]) 
-    return read_sql(f"SELECT * FROM {tbl}")
-
-@st.cache_data(show_spinner=False)
-def load_team_results(fmt: str) -> pd.DataFrame:
-    tbl = f"team_results_{fmt}"
-    if tbl not in get_tables():
-        return pd.DataFrame(columns=["team","wins"]) 
-    return read_sql(f"SELECT * FROM {tbl}")
-
-FORMATS = [fmt for fmt in ["odi","t20","test","ipl"] if f"{fmt}_matches" in get_tables()]
+FORMATS = catalog.formats(["odi","t20","test","ipl"], DB_PATH)
 if not FORMATS:
     st.error("No match tables found in the database. Ensure cricket.db exists and tables are created.")
     st.stop()
@@ -89,86 +66,69 @@ if not FORMATS:
 # ----------------------
 # Sidebar Filters
 # ----------------------
-with st.sidebar:
+with st.sidebar, telemetry.Timer("sidebar", "block"):
     st.header("⚙️ Controls")
     fmt = st.selectbox("Format", FORMATS, index=0, format_func=lambda s: s.upper())
-    matches_df = load_matches(fmt)
+    has_batting = catalog.has_table(f"batting_stats_{fmt}", DB_PATH)
+    has_bowling = catalog.has_table(f"bowling_stats_{fmt}", DB_PATH)
+    has_team_results = catalog.has_table(f"team_results_{fmt}", DB_PATH)
 
     # Year filter from matches
-    year_vals = sorted(matches_df['year'].dropna().unique().tolist()) if not matches_df.empty else []
-    if year_vals:
-        yr_min, yr_max = int(year_vals[0]), int(year_vals[-1])
+    bounds = query("year_bounds", fmt)
+    if bounds:
+        yr_min, yr_max = bounds
         year_range = st.slider("Year Range", min_value=yr_min, max_value=yr_max, value=(yr_min, yr_max))
     else:
         year_range = None
 
-    # Team filter from teams list string
-    def expand_teams(s):
-        try:
-            # teams stored as string representation of list; eval safely
-            s = s.strip()
-            if s.startswith('[') and s.endswith(']'):
-                out = s[1:-1].split(',')
-                return [x.strip().strip("'").strip('"') for x in out]
-        except Exception:
-            pass
-        return []
-
-    teams_series = matches_df['teams'].dropna().apply(expand_teams)
-    all_teams = sorted({t for lst in teams_series for t in lst}) if not matches_df.empty else []
-    # team_filter = st.multiselect("Teams", options=all_teams, default=[])
+    all_teams = query("team_names", fmt) if catalog.has_table(f"match_teams_{fmt}", DB_PATH) else []
+    team_filter = tuple(st.multiselect("Teams", options=all_teams, default=[]))
 
     st.markdown("---")
     st.caption(f"Using database: **{DB_PATH}**")
+    st.caption(f"{catalog.row_count(f'{fmt}_matches', DB_PATH):,} matches · "
+               f"{catalog.row_count(f'deliveries_{fmt}', DB_PATH):,} deliveries loaded")
 
-# Apply filters to matches_df for EDA views
-if not matches_df.empty and year_range:
-    matches_df = matches_df[(matches_df['year'].astype(int) >= year_range[0]) & (matches_df['year'].astype(int) <= year_range[1])]
-# if team_filter:
-#     mask = matches_df['teams'].apply(lambda s: any(t in s for t in team_filter))
-#     matches_df = matches_df[mask]
-
-bat_df = load_batting(fmt)
-bowl_df = load_bowling(fmt)
-team_res_df = load_team_results(fmt)
+# Year and team filters are applied in SQL by each query below
+counts = query("match_counts", fmt, year_range, team_filter=team_filter)
 
 # ----------------------
 # Tabs
 # ----------------------
-t1, t2, t3, t4, t5, t6 = st.tabs([
+t1, t2, t3, t4, t5, t6, t7 = st.tabs([
     "📊 Overview",
     "🔍 EDA",
     "👤 Players",
     "🛡️ Teams",
     "📤 Exports",
-    "🧭 Help"
+    "🧭 Help",
+    "🩺 Diagnostics"
 ])
 
 # ----------------------
 # Overview
 # ----------------------
-with t1:
+with t1, telemetry.Timer("tab.overview", "tab"):
     st.subheader(f"Overview — {fmt.upper()}")
     c1, c2, c3, c4 = st.columns(4)
-    total_matches = len(matches_df)
-    venues = matches_df['venue'].nunique() if 'venue' in matches_df.columns else 0
+    total_matches = counts["matches"]
+    venues = counts["venues"]
     teams_n = len(all_teams)
-    winners_n = matches_df['match_winner'].nunique() if 'match_winner' in matches_df.columns else 0
+    winners_n = counts["winners"]
     c1.metric("Matches", f"{total_matches:,}")
     c2.metric("Venues", f"{venues:,}")
     c3.metric("Teams", f"{teams_n:,}")
     c4.metric("Unique Winners", f"{winners_n:,}")
 
     # Matches per year
-    if not matches_df.empty and 'year' in matches_df.columns:
-        per_year = matches_df.groupby('year').size().reset_index(name='matches')
+    if total_matches:
+        per_year = query("matches_per_year", fmt, year_range, team_filter=team_filter)
         fig = px.line(per_year, x='year', y='matches', markers=True, title=f"Matches per Year — {fmt.upper()}")
         st.plotly_chart(fig, use_container_width=True)
 
     # Top venues
-    if not matches_df.empty:
-        topv = matches_df['venue'].value_counts().head(10).reset_index()
-        topv.columns = ['venue','matches']
+    if total_matches:
+        topv = query("top_venues", fmt, year_range, limit=10, team_filter=team_filter)
         fig = px.bar(topv, x='matches', y='venue', orientation='h', title=f"Top 10 Venues — {fmt.upper()}")
         fig.update_layout(yaxis=dict(autorange='reversed'))
         st.plotly_chart(fig, use_container_width=True)
@@ -176,19 +136,16 @@ with t1:
 # ----------------------
 # EDA
 # ----------------------
-with t2:
+with t2, telemetry.Timer("tab.eda", "tab"):
     st.subheader("Exploratory Data Analysis")
-    if matches_df.empty:
+    if not total_matches:
         st.info("No matches to analyze with current filters.")
     else:
         c1, c2 = st.columns(2)
         # Toss vs Match winner
-        tmp = matches_df.copy()
-        tmp['outcome'] = np.where(tmp['toss_winner']==tmp['match_winner'], 'Toss = Match Winner', 'Toss ≠ Match Winner')
         # fig = px.bar(tmp['outcome'].value_counts().reset_index(), x='index', y='outcome',
         #              labels={'index':'Outcome','outcome':'Count'}, title='Toss vs Result')
-        df_counts = tmp['outcome'].value_counts().reset_index()
-        df_counts.columns = ['Outcome', 'Count']   # rename properly
+        df_counts = query("toss_outcomes", fmt, year_range, team_filter=team_filter)
         fig = px.bar(
             df_counts,
             x='Outcome',
@@ -200,174 +157,174 @@ with t2:
         c1.plotly_chart(fig, use_container_width=True)
 
         # Winners (top 10)
-        win = matches_df['match_winner'].value_counts().head(10).reset_index()
-        win.columns = ['team','wins']
+        win = query("top_winners", fmt, year_range, limit=10, team_filter=team_filter)
         fig2 = px.bar(win, x='wins', y='team', orientation='h', title='Top Winners (current filter)')
         fig2.update_layout(yaxis=dict(autorange='reversed'))
         c2.plotly_chart(fig2, use_container_width=True)
 
         # Heatmap Toss vs Match winner (seaborn)
-        if matches_df['toss_winner'].notna().any() and matches_df['match_winner'].notna().any():
-            ct = pd.crosstab(matches_df['toss_winner'], matches_df['match_winner'])
+        ct = query("toss_winner_crosstab", fmt, year_range, team_filter=team_filter)
+        if not ct.empty:
             fig_hm, ax = plt.subplots(figsize=(8,6))
             sns.heatmap(ct, ax=ax)
             ax.set_title("Heatmap: Toss Winner vs Match Winner")
             st.pyplot(fig_hm, use_container_width=True)
+            plt.close(fig_hm)
 
 # ----------------------
 # Players
 # ----------------------
-with t3:
+with t3, telemetry.Timer("tab.players", "tab"):
     st.subheader(f"Player Performance — {fmt.upper()}")
-    if bat_df.empty and bowl_df.empty:
+    if not has_batting and not has_bowling:
         st.info("No player summary tables found. Build them with your fact-table script.")
     else:
         c1, c2 = st.columns(2)
         # Batting leaders
-        if not bat_df.empty:
-            min_balls = c1.slider("Min Balls (Batting)", 0, int(bat_df['ball'].max()) if 'ball' in bat_df.columns and not bat_df.empty else 1000, 300)
-            bat_top = bat_df[bat_df['ball']>=min_balls].sort_values('runs', ascending=False).head(15)
+        if has_batting:
+            min_balls = c1.slider("Min Balls (Batting)", 0, query("max_balls", "batting_stats", fmt) or 1000, 300)
+            bat_top = query("leaderboard", "batting_stats", fmt, "runs", min_balls=min_balls, limit=15)
             fig = px.bar(bat_top, x='runs', y='batter', orientation='h', title='Top Run-Scorers')
             fig.update_layout(yaxis=dict(autorange='reversed'))
             c1.plotly_chart(fig, use_container_width=True)
 
             # Strike rate leaders
-            sr_top = bat_df[bat_df['ball']>=min_balls].sort_values('strike_rate', ascending=False).head(15)
+            sr_top = query("leaderboard", "batting_stats", fmt, "strike_rate", min_balls=min_balls, limit=15)
             figsr = px.bar(sr_top, x='strike_rate', y='batter', orientation='h', title='Top Strike Rates')
             figsr.update_layout(yaxis=dict(autorange='reversed'))
             c1.plotly_chart(figsr, use_container_width=True)
 
         # Bowling leaders
-        if not bowl_df.empty:
-            min_balls_b = c2.slider("Min Balls (Bowling)", 0, int(bowl_df['ball'].max()) if 'ball' in bowl_df.columns and not bowl_df.empty else 1000, 300)
-            bowl_top = bowl_df[bowl_df['ball']>=min_balls_b].sort_values('wicket', ascending=False).head(15)
+        if has_bowling:
+            min_balls_b = c2.slider("Min Balls (Bowling)", 0, query("max_balls", "bowling_stats", fmt) or 1000, 300)
+            bowl_top = query("leaderboard", "bowling_stats", fmt, "wicket", min_balls=min_balls_b, limit=15)
             figb = px.bar(bowl_top, x='wicket', y='bowler', orientation='h', title='Top Wicket-Takers')
             figb.update_layout(yaxis=dict(autorange='reversed'))
             c2.plotly_chart(figb, use_container_width=True)
 
             # Wickets vs Economy
-            scat = bowl_df[bowl_df['ball']>=min_balls_b]
+            # Every qualifying bowler, not just the top 15
+            scat = query("leaderboard", "bowling_stats", fmt, "wicket", min_balls=min_balls_b, limit=-1)
             if not scat.empty:
                 figsc = px.scatter(scat, x='wicket', y='economy', hover_name='bowler', title='Wickets vs Economy')
                 c2.plotly_chart(figsc, use_container_width=True)
 
+    # Player profile (per-innings tables, LRU-cached per player in profiles.py)
+    if catalog.has_table(f"batting_innings_{fmt}", DB_PATH):
+        st.markdown("### Player Profile")
+        player = st.selectbox("Player", [""] + query("player_names", fmt), index=0)
+        if player:
+            with telemetry.Timer("player_profile", "query", cached=True):
+                profile = profiles.player_profile(fmt, player)
+            for role, x, rolling in (("batting", "runs", "rolling_average"), ("bowling", "runs_conceded", "rolling_average")):
+                prof = profile[role]
+                if prof is None:
+                    continue
+                st.markdown(f"**{role.title()}**")
+                st.dataframe(pd.DataFrame([prof["career"]]), use_container_width=True)
+                inn = prof["innings"].reset_index().rename(columns={"index": "innings_no"})
+                figp = px.bar(inn, x="innings_no", y=x, hover_data=["date", "venue", "opposition"],
+                              title=f"{role.title()} innings by innings")
+                figp.add_scatter(x=inn["innings_no"], y=inn[rolling], mode="lines",
+                                 name=f"{rolling.replace('_', ' ')} ({profiles.ROLLING_INNINGS} inns)")
+                st.plotly_chart(figp, use_container_width=True)
+                p1, p2, p3 = st.columns(3)
+                p1.caption("By venue"); p1.dataframe(prof["venues"], use_container_width=True)
+                p2.caption("By opposition"); p2.dataframe(prof["opposition"], use_container_width=True)
+                p3.caption("By phase"); p3.dataframe(prof["phases"], use_container_width=True)
+
+    # Batter vs bowler (sparse matchups_{fmt} table)
+    if catalog.has_table(f"matchups_{fmt}", DB_PATH):
+        st.markdown("### Batter vs Bowler")
+        m1, m2 = st.columns(2)
+        mu_batter = m1.selectbox("Batter", [""] + query("player_names", fmt), index=0, key="mu_batter")
+        mu_bowler = m2.selectbox("Bowler", [""] + query("player_names", fmt), index=0, key="mu_bowler")
+        if mu_batter and mu_bowler:
+            st.dataframe(query("matchup", fmt, mu_batter, mu_bowler), use_container_width=True)
+        elif mu_batter:
+            st.dataframe(query("batter_matchups", fmt, mu_batter), use_container_width=True)
+        elif mu_bowler:
+            st.dataframe(query("bowler_matchups", fmt, mu_bowler), use_container_width=True)
+        else:
+            st.caption("Most dismissals in a matchup")
+            st.dataframe(query("top_matchups", fmt, "dismissals", min_balls=6, limit=15), use_container_width=True)
+
 # ----------------------
 # Teams
 # ----------------------
-with t4:
+with t4, telemetry.Timer("tab.teams", "tab"):
     st.subheader(f"Teams — {fmt.upper()}")
-    if team_res_df.empty and matches_df.empty:
+    if not has_team_results and not total_matches:
         st.info("No team tables available.")
     else:
         c1, c2 = st.columns(2)
-        if not team_res_df.empty:
+        if has_team_results:
             # Top teams by wins
-            topwins = team_res_df.sort_values('wins', ascending=False).head(15)
+            topwins = query("top_teams", fmt, limit=15)
             figt = px.bar(topwins, x='wins', y='team', orientation='h', title='Team Wins (All-Time)')
             figt.update_layout(yaxis=dict(autorange='reversed'))
             c1.plotly_chart(figt, use_container_width=True)
         
         # Wins by year for selected teams
-        if not matches_df.empty:
+        if total_matches:
             sel_teams = c2.multiselect("Select teams for yearly trend", options=all_teams, default=all_teams[:2] if len(all_teams)>=2 else all_teams)
             if sel_teams:
-                dfy = matches_df[matches_df['match_winner'].isin(sel_teams)].groupby(['year','match_winner']).size().reset_index(name='wins')
+                dfy = query("wins_by_year", fmt, tuple(sel_teams), year_range, team_filter=team_filter)
                 figy = px.line(dfy, x='year', y='wins', color='match_winner', markers=True, title='Wins by Year (Selected Teams)')
                 c2.plotly_chart(figy, use_container_width=True)
 
+        # Over-by-over and phase rates (over_stats_* / phase_stats_* tables built by database.py)
+        if catalog.has_table(f"over_stats_team_{fmt}", DB_PATH) and total_matches and sel_teams:
+            st.markdown("### Scoring by Over & Phase (Selected Teams)")
+            c3, c4 = st.columns(2)
+            dfo = query("over_stats", fmt, "team", tuple(sel_teams))
+            dfo["over"] = dfo["over"] + 1  # Cricsheet numbers overs from 0
+            figo = px.line(dfo, x='over', y='run_rate', color='team', markers=True, title='Run Rate by Over')
+            c3.plotly_chart(figo, use_container_width=True)
+            dfp = query("phase_stats", fmt, "team", tuple(sel_teams))
+            if dfp.empty:
+                c4.info("No powerplay/middle/death phases for this format.")
+            else:
+                figp = px.bar(dfp, x='phase', y='run_rate', color='team', barmode='group',
+                              hover_data=['wicket_rate', 'dot_pct'], title='Run Rate by Phase')
+                c4.plotly_chart(figp, use_container_width=True)
+
 # ----------------------
 # Exports (CSV + PPTX)
 # ----------------------
-with t5:
+with t5, telemetry.Timer("tab.exports", "tab"):
     st.subheader("Exports & Power BI")
-    st.markdown("**CSV Exports for Power BI/Tableau**")
+    st.markdown("**Exports for Power BI/Tableau**")
+    # Files are written on demand, chunk by chunk straight from SQLite (see exports.py).
+    available = [name for name, (table, _) in exports.EXPORTS.items()
+                 if catalog.has_table(table.format(fmt=fmt), DB_PATH)]
     c1, c2, c3 = st.columns(3)
-
-    # Matches export
-    if not matches_df.empty:
-        c1.download_button(
-            label="Download Matches CSV",
-            data=matches_df.to_csv(index=False).encode('utf-8'),
-            file_name=f"{fmt}_matches_filtered.csv",
-            mime="text/csv"
-        )
-    if not bat_df.empty:
-        c2.download_button(
-            label="Download Batting CSV",
-            data=bat_df.to_csv(index=False).encode('utf-8'),
-            file_name=f"batting_stats_{fmt}.csv",
-            mime="text/csv"
-        )
-    if not bowl_df.empty:
-        c3.download_button(
-            label="Download Bowling CSV",
-            data=bowl_df.to_csv(index=False).encode('utf-8'),
-            file_name=f"bowling_stats_{fmt}.csv",
-            mime="text/csv"
-        )
+    export_name = c1.selectbox("Data", available, format_func=lambda s: s.replace("_", " ").title())
+    export_type = c2.selectbox("File type", exports.file_types())
+    if export_name and c3.button("Prepare export"):
+        with st.spinner(f"Exporting {export_name}..."), telemetry.Timer(f"export.{export_name}", "export") as timer:
+            export_file, export_rows = exports.export(export_name, fmt, export_type, year_range, team_filter)
+            timer.rows = export_rows
+        st.caption(f"{export_rows:,} rows written to `{os.path.abspath(export_file)}`")
+        if os.path.getsize(export_file) <= EXPORT_DOWNLOAD_LIMIT_MB * 1024 * 1024:
+            with open(export_file, "rb") as f:
+                st.download_button("Download export", data=f, file_name=os.path.basename(export_file))
+        else:
+            st.info(f"Over {EXPORT_DOWNLOAD_LIMIT_MB} MB; open the file above directly in Power BI/Tableau.")
 
     st.markdown("---")
     st.markdown("**Generate PPTX from key charts**")
 
-    def fig_to_png_bytes(fig):
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png', bbox_inches='tight')
-        buf.seek(0)
-        return buf
-
-    # Prepare matplotlib figures to embed in PPT
-    figs = []
-    # 1) Matches per year (mpl)
-    if not matches_df.empty:
-        per_year = matches_df.groupby('year').size().reset_index(name='matches')
-        fig_mpl, ax = plt.subplots(figsize=(7,4))
-        ax.plot(per_year['year'], per_year['matches'], marker='o')
-        ax.set_title(f"Matches per Year — {fmt.upper()}")
-        ax.tick_params(axis='x', rotation=45)
-        figs.append((f"Matches per Year — {fmt.upper()}", fig_mpl))
-
-    # 2) Top venues (mpl)
-    if not matches_df.empty:
-        topv = matches_df['venue'].value_counts().head(10).reset_index()
-        topv.columns = ['venue','matches']
-        fig_mpl2, ax2 = plt.subplots(figsize=(7,4))
-        sns.barplot(data=topv, x='matches', y='venue', ax=ax2)
-        ax2.set_title("Top Venues")
-        figs.append(("Top Venues", fig_mpl2))
-
-    # 3) Toss vs result (mpl)
-    if not matches_df.empty:
-        tmp = matches_df.copy()
-        tmp['outcome'] = np.where(tmp['toss_winner']==tmp['match_winner'], 'Toss = Match Winner', 'Toss ≠ Match Winner')
-        ct = tmp['outcome'].value_counts().reset_index()
-        fig_mpl3, ax3 = plt.subplots(figsize=(6,4))
-        ax3.bar(ct['outcome'], ct['count'])
-        ax3.set_xlabel("Outcome")
-        ax3.set_ylabel("Count")
-        ax3.set_title("Toss vs Result")
-        figs.append(("Toss vs Result", fig_mpl3))
-
-    if st.button("Build PPTX"):
-        prs = Presentation()
-        title_slide_layout = prs.slide_layouts[0]
-        slide = prs.slides.add_slide(title_slide_layout)
-        slide.shapes.title.text = "Cricsheet EDA Overview"
-        slide.placeholders[1].text = f"Format: {fmt.upper()} | Years: {year_range if year_range else 'All'} | Teams: {', '.join(team_filter) if team_filter else 'All'}"
-
-        for title, f in figs:
-            img_stream = fig_to_png_bytes(f)
-            slide = prs.slides.add_slide(prs.slide_layouts[5])
-            left = Inches(1)
-            top = Inches(1.2)
-            slide.shapes.title.text = title
-            slide.shapes.add_picture(img_stream, left, top, width=Inches(8))
-        out = io.BytesIO()
-        prs.save(out)
-        out.seek(0)
-        st.download_button("Download Presentation (PPTX)", data=out, file_name=f"cricsheet_eda_{fmt}.pptx", mime="application/vnd.openxmlformats-officedocument.presentationml.presentation")
+    # Charts are rendered only when a deck is requested, in parallel, and
+    # cached per format / year range / team filter (see reports.py).
+    if total_matches and st.button("Build PPTX"):
+        with st.spinner("Rendering charts..."), telemetry.Timer("deck_bytes", "query", cached=True):
+            deck = reports.deck_bytes(fmt, year_range, team_filter)
+        st.download_button("Download Presentation (PPTX)", data=deck,
+                           file_name=reports.deck_file_name(fmt), mime=reports.PPTX_MIME)
 
     st.markdown("---")
-    st.markdown("**Power BI** — Import CSVs above or connect directly to the SQLite DB via ODBC. Suggested tables: `*_matches`, `batting_stats_*`, `bowling_stats_*`, `team_results_*`. Create slicers for Year/Team/Format and build visuals (top scorers, wicket-takers, wins by team, toss vs result).")
+    st.markdown("**Power BI** — Import the exports above (CSV, Parquet or Arrow; `python exports.py deliveries --format t20 --to parquet` for large extracts) or connect directly to the SQLite DB via ODBC. Suggested tables: `*_matches`, `batting_stats_*`, `bowling_stats_*`, `team_results_*`. Create slicers for Year/Team/Format and build visuals (top scorers, wicket-takers, wins by team, toss vs result).")
 
 # ----------------------
 # Help
@@ -378,15 +335,57 @@ with t6:
         """
         **Data prerequisites**  
         • Database file: `cricket.db` in project root (change with env var `CRICSHEET_DB`).  
-        • Tables expected: `{fmt}_matches`, `batting_stats_{fmt}`, `bowling_stats_{fmt}`, `team_results_{fmt}` for selected format.
+        • Tables expected: `{fmt}_matches`, `batting_stats_{fmt}`, `bowling_stats_{fmt}`, `team_results_{fmt}`, the `rollup_*_{fmt}` chart tables, the `batting_innings_{fmt}`/`bowling_innings_{fmt}` profile tables, the `over_stats_*_{fmt}`/`phase_stats_*_{fmt}` analytics tables and the `matchups_{fmt}` head-to-head table for selected format (all built by `database.py`).
 
         **Usage**  
         1) Choose **Format** in the sidebar, then restrict **Year Range** and **Teams** as needed.  
         2) Explore: Overview → EDA → Players → Teams.  
         3) Export: Download CSVs or click **Build PPTX** to generate a presentation of core charts.  
+        4) Diagnostics: p50/p95 latency, rows and cache hit rate of every loader and tab, plus the ETL run history (`etl_runs`).  
 
         **Tips**  
         • If tables are missing, run your ETL scripts to create fact tables (deliveries, batting, bowling, team results).  
         • For Power BI, either import the CSVs or set up a SQLite ODBC DSN and connect to `cricket.db` directly.  
         """
     )
+
+# ----------------------
+# Diagnostics
+# ----------------------
+with t7:
+    st.subheader("Diagnostics")
+    st.caption("Latency of the loaders (query), their SQL on cache misses (sql), tab blocks and whole reruns, "
+               "over the latest samples of every session since the server started. "
+               "This rerun's own timings appear on the next one.")
+    stats = telemetry.summary()
+    if stats.empty:
+        st.info("No timings recorded yet; interact with the other tabs and rerun.")
+    else:
+        loaders = stats[stats["kind"] == "query"]
+        hits, misses = int(loaders["hits"].sum()), int(loaders["misses"].sum())
+        reruns = stats[stats["name"] == "rerun"]
+        d1, d2, d3 = st.columns(3)
+        d1.metric("Query cache hit rate", f"{hits * 100 / (hits + misses):.1f}%" if hits + misses else "—")
+        d2.metric("Rerun p50", f"{reruns['p50_ms'].iloc[0]:,.0f} ms" if not reruns.empty else "—")
+        d3.metric("Rerun p95", f"{reruns['p95_ms'].iloc[0]:,.0f} ms" if not reruns.empty else "—")
+
+        kinds = st.multiselect("Kinds", sorted(stats["kind"].unique()), default=sorted(stats["kind"].unique()))
+        shown = stats[stats["kind"].isin(kinds)]
+        figd = px.bar(shown.head(20), x="p95_ms", y="name", color="kind", orientation="h",
+                      hover_data=["p50_ms", "calls", "hit_pct", "rows"], title="Slowest p95 latency (ms)")
+        figd.update_layout(yaxis=dict(autorange="reversed"))
+        st.plotly_chart(figd, use_container_width=True)
+        st.dataframe(shown, use_container_width=True)
+    if st.button("Reset timings"):
+        telemetry.reset()
+
+    # Run history written by database.py / scraper.py (see instrument.py)
+    if catalog.has_table(dq.RUNS_TABLE, DB_PATH):
+        st.markdown("### ETL Runs")
+        runs = query("etl_runs")
+        st.dataframe(runs, use_container_width=True)
+        if not runs.empty:
+            run_id = st.selectbox("Run", runs["run_id"])
+            st.dataframe(query("etl_run_stages", run_id), use_container_width=True)
+
+rerun_timer.stop()
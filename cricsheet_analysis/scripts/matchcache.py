@@ -0,0 +1,126 @@
+import os
+import json
+import contextlib
+import hashlib
+import numpy as np
+
+CACHE_DIR = os.environ.get(
+    "CRICSHEET_CACHE_DIR", os.path.join(os.path.dirname(__file__), "../cache")
+)
+CACHE_MAX_BYTES = int(os.environ.get("CRICSHEET_CACHE_MB", "1024")) * 1024 * 1024
+
+# Bump when the layout of an extracted match changes so stale entries miss.
+CACHE_VERSION = b"5"
+
+def cache_key(name: str, data: bytes) -> str:
+    """
+    Cache key for a match file: its file name plus a hash of its contents.
+
+    Args:
+        name (str): File name of the match JSON, e.g. "1234567.json".
+        data (bytes): Raw file contents.
+
+    Returns:
+        str: Hex digest identifying the cache entry.
+    """
+    digest = hashlib.blake2b(CACHE_VERSION, digest_size=16)
+    digest.update(name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(data)
+    return digest.hexdigest()
+
+def _entry_path(key: str) -> str:
+    # Two-character fan-out keeps directories small for large archives.
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.npz")
+
+def get(key: str):
+    """
+    Load an extracted match from the cache.
+
+    Returns:
+        dict | None: The extracted match (see transform.extract_match), or None on a miss.
+    """
+    path = _entry_path(key)
+    try:
+        with np.load(path, allow_pickle=False) as entry:
+            meta = json.loads(str(entry["meta"]))
+            balls = entry["balls"]
+            match = {
+                "key": meta["key"],
+                "row": meta["row"],
+                "teams": meta["teams"],
+                "people": meta["people"],
+                "labels": entry["labels"].tolist(),
+                "balls": {
+                    name: balls[i].astype(dtype)
+                    for i, (name, dtype) in enumerate(meta["columns"])
+                },
+            }
+    except (OSError, ValueError, KeyError):
+        return None
+
+    # Touch the entry so eviction drops the least recently used files first.
+    # A prune() in another process may have removed it since it was read.
+    with contextlib.suppress(FileNotFoundError):
+        os.utime(path)
+    return match
+
+def put(key: str, match: dict):
+    """
+    Store an extracted match as a compressed .npz.
+
+    The ball columns are packed into one int32 matrix so an entry has only
+    three members to read back: the JSON metadata, the labels and the balls.
+    """
+    path = _entry_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    columns = [(name, values.dtype.str) for name, values in match["balls"].items()]
+    meta = json.dumps({
+        "key": match["key"],
+        "row": match["row"],
+        "teams": match["teams"],
+        "people": match["people"],
+        "columns": columns,
+    })
+    balls = np.stack([values.astype(np.int32) for values in match["balls"].values()])
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(
+            f,
+            meta=np.array(meta),
+            labels=np.array(match["labels"], dtype=np.str_),
+            balls=balls,
+        )
+    os.replace(tmp_path, path)
+
+def prune(max_bytes: int = CACHE_MAX_BYTES):
+    """
+    Evict least recently used entries until the cache fits in max_bytes.
+
+    Returns:
+        int: Number of entries removed.
+    """
+    if not os.path.isdir(CACHE_DIR):
+        return 0
+
+    entries = []
+    total = 0
+    for sub in os.scandir(CACHE_DIR):
+        if not sub.is_dir():
+            continue
+        for entry in os.scandir(sub.path):
+            st = entry.stat()
+            entries.append((st.st_mtime, st.st_size, entry.path))
+            total += st.st_size
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
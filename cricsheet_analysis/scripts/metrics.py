@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+# Derived metrics as name -> (numerator, denominator, scale). A numerator or
+# denominator may be a column name or a tuple of columns that are summed.
+# Rows with a zero denominator get NaN (stored as NULL) instead of inf.
+BATTING_METRICS = {
+    "strike_rate": ("runs", "ball", 100),
+    "dot_pct": ("dot", "ball", 100),
+    "boundary_pct": (("four", "six"), "ball", 100),
+}
+
+BOWLING_METRICS = {
+    "economy": ("runs_conceded", "ball", 6),
+    "strike_rate": ("ball", "wicket", 1),
+    "avg": ("runs_conceded", "wicket", 1),
+    "dot_pct": ("dot", "ball", 100),
+}
+
+# Rates of the over and phase analytics tables, per over of legal balls
+# (run_rate, wicket_rate) or per 100 balls (dot_pct).
+OVER_METRICS = {
+    "run_rate": ("runs", "ball", 6),
+    "wicket_rate": ("wicket", "ball", 6),
+    "dot_pct": ("dot", "ball", 100),
+}
+
+# Head-to-head rates of a batter against a bowler (matchups_{fmt}).
+MATCHUP_METRICS = {
+    "strike_rate": ("runs", "ball", 100),
+    "average": ("runs", "dismissals", 1),
+    "balls_per_dismissal": ("ball", "dismissals", 1),
+    "dot_pct": ("dot", "ball", 100),
+}
+
+# Innings phases as (name, first over, last over), with Cricsheet's 0-based
+# over numbers. Tests have no fielding-restriction phases.
+PHASES = {
+    "odi": [("powerplay", 0, 9), ("middle", 10, 39), ("death", 40, 49)],
+    "t20": [("powerplay", 0, 5), ("middle", 6, 14), ("death", 15, 19)],
+    "ipl": [("powerplay", 0, 5), ("middle", 6, 14), ("death", 15, 19)],
+    "test": [],
+}
+
+def phase_names(fmt: str) -> list:
+    """Phase names of a format in playing order."""
+    return [name for name, _, _ in PHASES.get(fmt, [])]
+
+def ratio(numerator, denominator, scale=1, decimals=2):
+    """
+    Vectorised numerator / denominator * scale with divide-by-zero masked out.
+
+    Args:
+        numerator (array-like): Numerator values.
+        denominator (array-like): Denominator values.
+        scale (float): Multiplier applied to the ratio, e.g. 100 for a percentage.
+        decimals (int): Decimal places to round to.
+
+    Returns:
+        pd.Series | np.ndarray: Rounded ratios, NaN wherever the denominator is 0.
+        A Series keeps the numerator's index.
+    """
+    num = np.asarray(numerator, dtype=float)
+    den = np.asarray(denominator, dtype=float)
+    out = np.full(num.shape, np.nan)
+    np.divide(num * scale, den, out=out, where=den != 0)
+    out = np.round(out, decimals)
+    if isinstance(numerator, pd.Series):
+        return pd.Series(out, index=numerator.index)
+    return out
+
+def overs(balls):
+    """Convert legal ball counts to cricket overs notation, e.g. 15 -> 2.3."""
+    return balls // 6 + (balls % 6) / 10
+
+def _column(df, spec):
+    if isinstance(spec, tuple):
+        return df[list(spec)].sum(axis=1)
+    return df[spec]
+
+def add_metrics(df: pd.DataFrame, specs: dict) -> pd.DataFrame:
+    """
+    Add derived ratio columns to a frame of summed counts.
+
+    Args:
+        df (pd.DataFrame): Frame holding the count columns the specs refer to.
+        specs (dict): name -> (numerator, denominator, scale), e.g. BATTING_METRICS.
+
+    Returns:
+        pd.DataFrame: The same frame, with one column added per spec.
+    """
+    for name, (num, den, scale) in specs.items():
+        df[name] = ratio(_column(df, num), _column(df, den), scale)
+    return df
+
+def add_batting_metrics(summary: pd.DataFrame) -> pd.DataFrame:
+    return add_metrics(summary, BATTING_METRICS)
+
+def add_bowling_metrics(summary: pd.DataFrame) -> pd.DataFrame:
+    summary["overs"] = overs(summary["ball"])
+    return add_metrics(summary, BOWLING_METRICS)
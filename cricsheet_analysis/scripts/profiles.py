@@ -0,0 +1,174 @@
+from functools import lru_cache
+import pandas as pd
+from connections import DB_PATH
+from databasequeries import read_query, innings_table
+from metrics import BATTING_METRICS, BOWLING_METRICS, add_metrics, phase_names
+import catalog
+import telemetry
+
+ROLLING_INNINGS = 10      # innings in the rolling averages
+PROFILE_CACHE_SIZE = 256  # (format, player) profiles kept in memory
+
+BATTING_PROFILE_METRICS = {"average": ("runs", "out", 1), **BATTING_METRICS}
+BATTING_COUNTS = ["runs", "ball", "four", "six", "dot", "out"]
+BOWLING_COUNTS = ["runs_conceded", "ball", "wicket", "dot"]
+
+def player_id(name: str):
+    """Key of a player in the players table, or None if the name is unknown."""
+    ids = read_query("SELECT player_id FROM players WHERE name = ?", (name,))["player_id"]
+    return int(ids.iloc[0]) if len(ids) else None
+
+def _innings_rows(key: str, fmt: str, player_col: str, team_col: str, pid: int) -> pd.DataFrame:
+    # The (player, match_id) index of the innings table keeps this O(player).
+    return read_query(f"""
+        SELECT i.*, m.date, m.venue, t.name AS team, o.name AS opposition
+        FROM {innings_table(key, fmt)} i
+        JOIN {fmt}_matches m ON m.match_id = i.match_id
+        LEFT JOIN teams t ON t.team_id = i.{team_col}
+        LEFT JOIN match_teams_{fmt} mt ON mt.match_id = i.match_id AND mt.team_id != i.{team_col}
+        LEFT JOIN teams o ON o.team_id = mt.team_id
+        WHERE i.{player_col} = ?
+    """, (pid,))
+
+def _splits(rows: pd.DataFrame, by: str, counts: list, specs: dict) -> pd.DataFrame:
+    if rows.empty:
+        return pd.DataFrame(columns=[by, "innings"] + counts + list(specs))
+    split = rows.groupby(by, sort=False)[counts].sum()
+    # A player's innings spans several phase rows; count each innings once.
+    innings = rows.drop_duplicates([by, "match_id", "innings"]).groupby(by, sort=False).size()
+    split.insert(0, "innings", innings)
+    return add_metrics(split.reset_index(), specs)
+
+def _phase_splits(rows: pd.DataFrame, fmt: str, counts: list, specs: dict) -> pd.DataFrame:
+    split = _splits(rows.dropna(subset=["phase"]), "phase", counts, specs)
+    order = {name: i for i, name in enumerate(phase_names(fmt))}
+    return split.sort_values("phase", key=lambda s: s.map(order)).reset_index(drop=True)
+
+def _by_innings(rows: pd.DataFrame, counts: list, specs: dict, rolling: dict, window: int) -> pd.DataFrame:
+    keys = ["match_id", "innings", "date", "venue", "team", "opposition"]
+    innings = (rows.groupby(keys, dropna=False, sort=False)[counts].sum()
+               .reset_index()
+               .sort_values(["date", "match_id", "innings"], na_position="first")
+               .reset_index(drop=True))
+    add_metrics(innings, specs)
+    # Ratios of rolling sums, e.g. runs / outs over the last `window` innings.
+    sums = innings[counts].rolling(window, min_periods=1).sum()
+    for name, spec in rolling.items():
+        innings[name] = add_metrics(sums.copy(), {name: spec})[name]
+    return innings
+
+def _career(innings: pd.DataFrame, counts: list, specs: dict) -> dict:
+    totals = innings[counts].sum()
+    ratios = add_metrics(totals.to_frame().T, specs)
+    career = {"innings": len(innings), **{column: int(totals[column]) for column in counts}}
+    career.update({name: float(ratios[name].iloc[0]) for name in specs})
+    return career
+
+_cached_version = None  # catalog.version() the cached profiles were read at
+
+def _version():
+    """
+    catalog.version() of the database, emptying the profile caches when it
+    changed: entries keyed on an older version can never be hit again and
+    would only hold memory until the LRU evicted them.
+    """
+    global _cached_version
+    version = catalog.version(DB_PATH)
+    if version != _cached_version:
+        _batting_profile.cache_clear()
+        _bowling_profile.cache_clear()
+        _cached_version = version
+    return version
+
+@lru_cache(maxsize=PROFILE_CACHE_SIZE)
+def _batting_profile(version, fmt: str, name: str, window: int):
+    telemetry.mark_miss()
+    pid = player_id(name)
+    rows = _innings_rows("batting", fmt, "batter_id", "team_id", pid) if pid is not None else None
+    if rows is None or rows.empty:
+        return None
+
+    innings = _by_innings(rows, BATTING_COUNTS, BATTING_PROFILE_METRICS, {
+        "rolling_average": BATTING_PROFILE_METRICS["average"],
+        "rolling_strike_rate": BATTING_PROFILE_METRICS["strike_rate"],
+    }, window)
+    career = _career(innings, BATTING_COUNTS, BATTING_PROFILE_METRICS)
+    career.update(
+        highest=int(innings["runs"].max()),
+        fifties=int(innings["runs"].between(50, 99).sum()),
+        hundreds=int((innings["runs"] >= 100).sum()),
+    )
+    return {
+        "career": career,
+        "innings": innings,
+        "venues": _splits(rows, "venue", BATTING_COUNTS, BATTING_PROFILE_METRICS),
+        "opposition": _splits(rows, "opposition", BATTING_COUNTS, BATTING_PROFILE_METRICS),
+        "phases": _phase_splits(rows, fmt, BATTING_COUNTS, BATTING_PROFILE_METRICS),
+    }
+
+@lru_cache(maxsize=PROFILE_CACHE_SIZE)
+def _bowling_profile(version, fmt: str, name: str, window: int):
+    telemetry.mark_miss()
+    pid = player_id(name)
+    rows = _innings_rows("bowling", fmt, "bowler_id", "against_team_id", pid) if pid is not None else None
+    if rows is None or rows.empty:
+        return None
+
+    # For a bowler the team joined in is the batting side, i.e. the opposition.
+    rows = rows.rename(columns={"team": "opposition", "opposition": "team"})
+    innings = _by_innings(rows, BOWLING_COUNTS, BOWLING_METRICS, {
+        "rolling_average": BOWLING_METRICS["avg"],
+        "rolling_economy": BOWLING_METRICS["economy"],
+    }, window)
+    career = _career(innings, BOWLING_COUNTS, BOWLING_METRICS)
+    best = innings.sort_values(["wicket", "runs_conceded"], ascending=[False, True]).iloc[0]
+    career.update(
+        best=f"{int(best['wicket'])}/{int(best['runs_conceded'])}",
+        five_wickets=int((innings["wicket"] >= 5).sum()),
+    )
+    return {
+        "career": career,
+        "innings": innings,
+        "venues": _splits(rows, "venue", BOWLING_COUNTS, BOWLING_METRICS),
+        "opposition": _splits(rows, "opposition", BOWLING_COUNTS, BOWLING_METRICS),
+        "phases": _phase_splits(rows, fmt, BOWLING_COUNTS, BOWLING_METRICS),
+    }
+
+def batting_profile(fmt: str, name: str, window: int = ROLLING_INNINGS):
+    """
+    Batting career of one player in a format.
+
+    Reads the player's rows of batting_innings_{fmt} through its player
+    index. Results are LRU-cached per (format, player, window) and keyed on
+    the database version, so a reload of the data is picked up and the
+    profiles of the old data are dropped. The frames
+    are shared between callers and must not be modified.
+
+    Args:
+        fmt (str): Format suffix, e.g. "odi".
+        name (str): Player name as in the players table.
+        window (int): Innings covered by the rolling averages.
+
+    Returns:
+        dict | None: "career" (totals and ratios), "innings" (innings by
+        innings, oldest first, with rolling_average and rolling_strike_rate),
+        and "venues", "opposition" and "phases" splits; None if the player
+        never batted in the format.
+    """
+    return _batting_profile(_version(), fmt, name, window)
+
+def bowling_profile(fmt: str, name: str, window: int = ROLLING_INNINGS):
+    """
+    Bowling career of one player in a format, read from bowling_innings_{fmt}.
+
+    Same caching and layout as batting_profile(); the innings frame carries
+    rolling_average and rolling_economy.
+    """
+    return _bowling_profile(_version(), fmt, name, window)
+
+def player_profile(fmt: str, name: str, window: int = ROLLING_INNINGS) -> dict:
+    """Batting and bowling profiles of a player: {"batting": ..., "bowling": ...}."""
+    return {
+        "batting": batting_profile(fmt, name, window),
+        "bowling": bowling_profile(fmt, name, window),
+    }
@@ -1,13 +1,8 @@
-import sqlite3
 import pandas as pd
-
-DB_PATH = "cricket.db"
+from connections import DB_PATH, read_connection
 
 def run_query(query: str):
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df
+    return pd.read_sql_query(query, read_connection(DB_PATH))
 
 if __name__ == "__main__":
     queries = {
@@ -0,0 +1,172 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from matplotlib.figure import Figure
+import databasequeries as dq
+from connections import DB_PATH
+import catalog
+import telemetry
+
+REPORT_WORKERS = 4       # charts rendered at the same time
+CHART_CACHE_SIZE = 128   # rendered PNGs kept in memory
+DECK_CACHE_SIZE = 16     # assembled decks kept in memory
+PPTX_MIME = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+# Charts are drawn on bare matplotlib Figures (Agg canvas, no pyplot), so
+# they can render in worker threads and are freed with their last reference
+# instead of piling up in pyplot's figure manager.
+def _matches_per_year(fmt, years, team_filter):
+    per_year = dq.matches_per_year(fmt, years, team_filter=team_filter)
+    fig = Figure(figsize=(7, 4))
+    ax = fig.subplots()
+    ax.plot(per_year["year"], per_year["matches"], marker="o")
+    ax.set_title(f"Matches per Year — {fmt.upper()}")
+    ax.tick_params(axis="x", rotation=45)
+    return fig
+
+def _top_venues(fmt, years, team_filter):
+    topv = dq.top_venues(fmt, years, limit=10, team_filter=team_filter)
+    fig = Figure(figsize=(7, 4))
+    ax = fig.subplots()
+    ax.barh(topv["venue"], topv["matches"])
+    ax.invert_yaxis()
+    ax.set_xlabel("matches")
+    ax.set_title("Top Venues")
+    return fig
+
+def _toss_outcomes(fmt, years, team_filter):
+    ct = dq.toss_outcomes(fmt, years, team_filter=team_filter)
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+    ax.bar(ct["Outcome"], ct["Count"])
+    ax.set_xlabel("Outcome")
+    ax.set_ylabel("Count")
+    ax.set_title("Toss vs Result")
+    return fig
+
+# name -> (slide title, draw function(fmt, years, team_filter) -> Figure), in deck order.
+CHARTS = {
+    "matches_per_year": ("Matches per Year — {fmt}", _matches_per_year),
+    "top_venues": ("Top Venues", _top_venues),
+    "toss_outcomes": ("Toss vs Result", _toss_outcomes),
+}
+
+_cached_version = None  # catalog.version() the cached charts and decks were rendered at
+
+def _version():
+    """
+    catalog.version() of the database, emptying the chart and deck caches
+    when it changed: renders of an older version can never be hit again
+    and would only hold memory until the LRU evicted them.
+    """
+    global _cached_version
+    version = catalog.version(DB_PATH)
+    if version != _cached_version:
+        _chart_png.cache_clear()
+        _deck_bytes.cache_clear()
+        _cached_version = version
+    return version
+
+def _key(years, team_filter):
+    # Hashable, order-independent cache key parts.
+    return (tuple(years) if years else None,
+            tuple(sorted(team_filter)) if team_filter else None)
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def _chart_png(version, name: str, fmt: str, years, team_filter) -> bytes:
+    telemetry.mark_miss()
+    fig = CHARTS[name][1](fmt, years, team_filter)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    fig.clear()
+    return buf.getvalue()
+
+def chart_png(name: str, fmt: str, years=None, team_filter=None) -> bytes:
+    """
+    PNG of one report chart, rendered on first request and cached.
+
+    The cache is keyed on (format, year range, team filter, chart) and the
+    database version, so reloading the data re-renders and drops the
+    renders of the old data.
+
+    Args:
+        name (str): Chart name, a key of CHARTS.
+        fmt (str): Format suffix, e.g. "odi".
+        years (tuple): Inclusive (first, last) year, or None for all years.
+        team_filter (list): Only matches of these teams; None for all.
+
+    Returns:
+        bytes: PNG image.
+    """
+    return _chart_png(_version(), name, fmt, *_key(years, team_filter))
+
+def _timed_chart_png(name: str, fmt: str, years, team_filter) -> bytes:
+    # Timed on the worker thread itself: telemetry timers are per thread, so
+    # this is the timer _chart_png's mark_miss() sees.
+    with telemetry.Timer(f"chart.{name}", "chart", cached=True):
+        return chart_png(name, fmt, years, team_filter)
+
+def render_charts(fmt: str, years=None, team_filter=None, charts=None,
+                  workers: int = REPORT_WORKERS) -> dict:
+    """
+    Render report charts in parallel on a thread pool.
+
+    Cached charts return immediately; the rest are drawn concurrently, each
+    worker reading through its own read-only connection. Every chart is
+    recorded in telemetry as "chart.<name>", a cache hit or miss.
+
+    Args:
+        charts (list): Chart names; None for every chart in CHARTS.
+        workers (int): Charts rendered at the same time.
+
+    Returns:
+        dict: chart name -> PNG bytes, in the order requested.
+    """
+    charts = list(charts or CHARTS)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {name: pool.submit(_timed_chart_png, name, fmt, years, team_filter) for name in charts}
+        return {name: future.result() for name, future in futures.items()}
+
+def write_deck(out, fmt: str, years=None, team_filter=None, charts=None,
+               workers: int = REPORT_WORKERS):
+    """
+    Assemble the EDA overview deck and write it to a file or binary stream.
+
+    Args:
+        out (str | file-like): Destination path or writable binary stream.
+        fmt (str): Format suffix, e.g. "odi".
+        years (tuple): Inclusive (first, last) year, or None for all years.
+        team_filter (list): Only matches of these teams; None for all.
+        charts (list): Chart names; None for every chart in CHARTS.
+        workers (int): Charts rendered at the same time.
+    """
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    images = render_charts(fmt, years, team_filter, charts, workers)
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[0])
+    slide.shapes.title.text = "Cricsheet EDA Overview"
+    slide.placeholders[1].text = (
+        f"Format: {fmt.upper()} | Years: {years if years else 'All'} | "
+        f"Teams: {', '.join(team_filter) if team_filter else 'All'}"
+    )
+    for name, png in images.items():
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        slide.shapes.title.text = CHARTS[name][0].format(fmt=fmt.upper())
+        slide.shapes.add_picture(io.BytesIO(png), Inches(1), Inches(1.2), width=Inches(8))
+    prs.save(out)
+
+@lru_cache(maxsize=DECK_CACHE_SIZE)
+def _deck_bytes(version, fmt: str, years, team_filter) -> bytes:
+    telemetry.mark_miss()
+    out = io.BytesIO()
+    write_deck(out, fmt, years, list(team_filter) if team_filter else None)
+    return out.getvalue()
+
+def deck_bytes(fmt: str, years=None, team_filter=None) -> bytes:
+    """The full deck as bytes, cached like chart_png() so repeated exports are instant."""
+    return _deck_bytes(_version(), fmt, *_key(years, team_filter))
+
+def deck_file_name(fmt: str) -> str:
+    return f"cricsheet_eda_{fmt}.pptx"
@@ -1,6 +1,11 @@
 import os
+import argparse
+import json
 import requests
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+import instrument
 
 DOWNLOAD_DIR = os.path.join(os.path.dirname(__file__), "../data")
 os.makedirs(DOWNLOAD_DIR, exist_ok=True)
@@ -12,24 +17,174 @@ ZIP_LINKS = {
     "ipl": "https://cricsheet.org/downloads/ipl_json.zip"
 }
 
-def download_and_extract():
-    for match_type, url in ZIP_LINKS.items():
-        zip_path = os.path.join(DOWNLOAD_DIR, f"{match_type}.zip")
-        extract_path = os.path.join(DOWNLOAD_DIR, match_type)
+CHUNK_SIZE = 1 << 20  # bytes written per streamed chunk
 
-        if not os.path.exists(extract_path):
-            print(f"Downloading {match_type} data...")
-            r = requests.get(url, stream=True)
-            with open(zip_path, "wb") as f:
-                f.write(r.content)
+def download_file(url, dest_path, session=None, chunk_size=CHUNK_SIZE, headers=None):
+    """
+    Stream a file to disk in chunks, resuming a previous partial download.
 
-            print(f"Extracting {match_type} data...")
+    Data is written to "<dest_path>.part" and renamed into place once the
+    transfer completes. If a .part file exists, a Range request continues
+    from its current size, guarded by If-Range with the ETag of the partial
+    download so a file that changed on the server is fetched from scratch
+    instead of being spliced. A server that ignores Range (200 instead of
+    206) restarts the download from the beginning.
+
+    Args:
+        url (str): URL to download.
+        dest_path (str): Final path of the downloaded file.
+        session (requests.Session): Session to reuse, e.g. for connection pooling.
+        chunk_size (int): Bytes read from the response per write.
+        headers (dict): Extra request headers, e.g. conditional validators.
+
+    Returns:
+        requests.structures.CaseInsensitiveDict | None: Response headers, or
+        None if the server answered 304 Not Modified.
+    """
+    http = session or requests
+    part_path = f"{dest_path}.part"
+    etag_path = f"{part_path}.etag"
+    headers = dict(headers or {})
+
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+        if os.path.exists(etag_path):
+            with open(etag_path) as f:
+                headers["If-Range"] = f.read()
+        # Conditional validators describe the last complete file, not the partial one.
+        headers.pop("If-None-Match", None)
+        headers.pop("If-Modified-Since", None)
+
+    with http.get(url, headers=headers, stream=True, timeout=60) as r:
+        if r.status_code == 304:
+            return None
+        if r.status_code == 416:
+            # Requested range starts at the end: the .part file is already complete.
+            os.replace(part_path, dest_path)
+            return r.headers
+        r.raise_for_status()
+
+        if r.headers.get("ETag"):
+            with open(etag_path, "w") as f:
+                f.write(r.headers["ETag"])
+
+        mode = "ab" if offset and r.status_code == 206 else "wb"
+        with open(part_path, mode) as f:
+            for chunk in r.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+                instrument.add(bytes_read=len(chunk))
+
+    os.replace(part_path, dest_path)
+    if os.path.exists(etag_path):
+        os.remove(etag_path)
+    return r.headers
+
+def _validators_path(match_type):
+    return os.path.join(DOWNLOAD_DIR, f"{match_type}.meta.json")
+
+def load_validators(match_type) -> dict:
+    """Return the ETag / Last-Modified recorded for a format's last download."""
+    try:
+        with open(_validators_path(match_type)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_validators(match_type, response_headers):
+    validators = {
+        key: response_headers[header]
+        for key, header in (("etag", "ETag"), ("last_modified", "Last-Modified"))
+        if response_headers.get(header)
+    }
+    with open(_validators_path(match_type), "w") as f:
+        json.dump(validators, f)
+
+def fetch_archive(match_type, url, session=None, extract=True) -> bool:
+    """
+    Download one format's archive unless the server reports it unchanged.
+
+    When local data exists, the request carries If-None-Match /
+    If-Modified-Since from the previous download, so an unchanged archive
+    costs a single 304 round trip.
+
+    Args:
+        match_type (str): Format name, e.g. "odi".
+        url (str): Archive URL.
+        session (requests.Session): Shared session for connection pooling.
+        extract (bool): Unpack into DOWNLOAD_DIR/<format> instead of keeping the zip.
+
+    Returns:
+        bool: True if new data was downloaded.
+    """
+    zip_path = os.path.join(DOWNLOAD_DIR, f"{match_type}.zip")
+    extract_path = os.path.join(DOWNLOAD_DIR, match_type)
+    have_data = os.path.exists(extract_path) if extract else os.path.exists(zip_path)
+
+    headers = {}
+    validators = load_validators(match_type) if have_data else {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    print(f"Downloading {match_type} data...")
+    # Downloads run in threads, where cProfile would only see one of them.
+    with instrument.stage("download", match_type, profile=False):
+        response_headers = download_file(url, zip_path, session=session, headers=headers)
+    if response_headers is None:
+        print(f"{match_type} data unchanged.")
+        return False
+
+    if extract:
+        print(f"Extracting {match_type} data...")
+        with instrument.stage("extract", match_type, profile=False):
             with zipfile.ZipFile(zip_path, "r") as zip_ref:
                 zip_ref.extractall(extract_path)
 
-            os.remove(zip_path)  # cleanup
-        else:
-            print(f"{match_type} data already downloaded.")
+        os.remove(zip_path)  # cleanup
+
+    save_validators(match_type, response_headers)
+    return True
+
+def download_and_extract(links=ZIP_LINKS, extract=True, workers=4) -> list:
+    """
+    Fetch every Cricsheet archive concurrently over one pooled session.
+
+    Args:
+        links (dict): Format -> archive URL. Point it at a local server to test.
+        extract (bool): Unpack each archive into DOWNLOAD_DIR/<format>. With
+            False the zip is kept as DOWNLOAD_DIR/<format>.zip, which
+            transform reads directly without extracting thousands of files.
+        workers (int): Number of archives downloaded at the same time.
+
+    Returns:
+        list: Formats whose archive changed, for database.run_etl to pick up.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=len(links), pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    with session, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            match_type: pool.submit(fetch_archive, match_type, url, session, extract)
+            for match_type, url in links.items()
+        }
+        return [match_type for match_type, future in futures.items() if future.result()]
 
 if __name__ == "__main__":
-    download_and_extract()
+    parser = argparse.ArgumentParser(description="Download Cricsheet JSON archives.")
+    parser.add_argument("--no-extract", action="store_true",
+                        help="keep each archive as <format>.zip and read it directly")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="archives downloaded concurrently (default: 4)")
+    parser.add_argument("--log", default=instrument.LOG_PATH,
+                        help="JSON-lines log of stage timings, '-' for stderr (default: ../logs/etl.jsonl)")
+    args = parser.parse_args()
+
+    from connections import DB_PATH
+    instrument.configure_logging(args.log)
+    with instrument.run("download", db_path=DB_PATH):
+        changed = download_and_extract(extract=not args.no_extract, workers=args.workers)
+    print(f"Changed formats: {', '.join(changed) or 'none'}")
@@ -0,0 +1,248 @@
+import os
+import argparse
+import json
+import random
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+# Share of generated matches per format, roughly Cricsheet's own mix.
+FORMAT_MIX = {"odi": 0.29, "t20": 0.47, "test": 0.11, "ipl": 0.13}
+
+# format -> (info.match_type, innings per match, (min, max) overs per innings)
+FORMAT_SPECS = {
+    "odi": ("ODI", 2, (30, 50)),
+    "t20": ("T20", 2, (12, 20)),
+    "test": ("Test", 4, (50, 130)),
+    "ipl": ("T20", 2, (12, 20)),
+}
+# File names are numeric match ids, kept apart per format.
+ID_BASE = {"odi": 1_000_000, "t20": 2_000_000, "test": 3_000_000, "ipl": 4_000_000}
+
+TEAMS = [
+    "India", "Australia", "England", "Pakistan", "New Zealand", "South Africa",
+    "Sri Lanka", "West Indies", "Bangladesh", "Afghanistan", "Ireland", "Zimbabwe",
+]
+IPL_TEAMS = [
+    "Mumbai Indians", "Chennai Super Kings", "Royal Challengers Bangalore",
+    "Kolkata Knight Riders", "Delhi Capitals", "Rajasthan Royals",
+    "Sunrisers Hyderabad", "Punjab Kings", "Gujarat Titans", "Lucknow Super Giants",
+]
+VENUES = [
+    "Melbourne Cricket Ground", "Lord's", "Eden Gardens", "Sydney Cricket Ground",
+    "Wankhede Stadium", "Dubai International Cricket Stadium", "Kensington Oval",
+    "Newlands", "Gaddafi Stadium", "Basin Reserve", "Shere Bangla National Stadium",
+]
+SQUAD_SIZE = 15
+RUNS = [0, 1, 2, 3, 4, 6]
+RUN_WEIGHTS = [38, 34, 8, 1, 12, 7]
+WICKET_KINDS = ["caught", "bowled", "lbw", "run out", "stumped", "caught and bowled"]
+WICKET_WEIGHTS = [55, 18, 13, 8, 3, 3]
+WICKET_PROB = 0.035
+WIDE_PROB = 0.025
+NOBALL_PROB = 0.006
+
+def _squad(team: str) -> list:
+    # Stable names per team, so players recur across matches.
+    return [f"{team} Player {k + 1}" for k in range(SQUAD_SIZE)]
+
+def _person_key(name: str) -> str:
+    return f"{random.Random(name).getrandbits(32):08x}"
+
+def _innings(rng, batting: list, bowling: list, overs: int, target=None) -> tuple:
+    """One innings of deliveries; returns (overs list, total runs, deliveries)."""
+    order = batting[:]
+    striker, non_striker, next_in = 0, 1, 2
+    bowlers = bowling[-5:]
+    total, wickets, n_balls = 0, 0, 0
+    out_overs = []
+    for over_no in range(overs):
+        bowler = bowlers[over_no % len(bowlers)]
+        deliveries, legal = [], 0
+        while legal < 6:
+            delivery = {"batter": order[striker], "bowler": bowler, "non_striker": order[non_striker]}
+            r = rng.random()
+            if r < WIDE_PROB:
+                delivery["extras"] = {"wides": 1}
+                delivery["runs"] = {"batter": 0, "extras": 1, "total": 1}
+                runs = 0
+            else:
+                runs = rng.choices(RUNS, RUN_WEIGHTS)[0]
+                extras = 0
+                if r < WIDE_PROB + NOBALL_PROB:
+                    delivery["extras"] = {"noballs": 1}
+                    extras = 1
+                else:
+                    legal += 1
+                delivery["runs"] = {"batter": runs, "extras": extras, "total": runs + extras}
+            total += delivery["runs"]["total"]
+            n_balls += 1
+
+            if "extras" not in delivery and rng.random() < WICKET_PROB:
+                kind = rng.choices(WICKET_KINDS, WICKET_WEIGHTS)[0]
+                out = non_striker if kind == "run out" and rng.random() < 0.4 else striker
+                delivery["wickets"] = [{"player_out": order[out], "kind": kind}]
+                wickets += 1
+                if wickets == 10 or next_in >= len(order):
+                    deliveries.append(delivery)
+                    out_overs.append({"over": over_no, "deliveries": deliveries})
+                    return out_overs, total, n_balls
+                if out == striker:
+                    striker = next_in
+                else:
+                    non_striker = next_in
+                next_in += 1
+            elif runs % 2 == 1:
+                striker, non_striker = non_striker, striker
+            deliveries.append(delivery)
+
+            if target is not None and total > target:
+                out_overs.append({"over": over_no, "deliveries": deliveries})
+                return out_overs, total, n_balls
+        out_overs.append({"over": over_no, "deliveries": deliveries})
+        striker, non_striker = non_striker, striker
+    return out_overs, total, n_balls
+
+def generate_match(fmt: str, index: int, seed: int = 0) -> tuple:
+    """
+    Build one synthetic match in the Cricsheet JSON schema.
+
+    The match only depends on (fmt, index, seed), so any subset of an
+    archive can be regenerated identically, in any order or process.
+
+    Returns:
+        tuple: (match dict, number of deliveries).
+    """
+    rng = random.Random(f"{seed}-{fmt}-{index}")
+    match_type, n_innings, (min_overs, max_overs) = FORMAT_SPECS[fmt]
+    team_a, team_b = rng.sample(IPL_TEAMS if fmt == "ipl" else TEAMS, 2)
+    squads = {team: rng.sample(_squad(team), 11) for team in (team_a, team_b)}
+    toss_winner = rng.choice([team_a, team_b])
+    first = toss_winner if rng.random() < 0.5 else (team_b if toss_winner == team_a else team_a)
+    second = team_b if first == team_a else team_a
+
+    innings, totals, n_deliveries = [], {team_a: 0, team_b: 0}, 0
+    for i in range(n_innings):
+        batting = first if i % 2 == 0 else second
+        bowling = second if batting == first else first
+        target = None
+        if i == n_innings - 1:
+            target = totals[bowling] - totals[batting]
+        overs = max_overs if fmt != "test" else rng.randint(min_overs, max_overs)
+        if fmt != "test" and rng.random() < 0.2:
+            overs = rng.randint(min_overs, max_overs)  # rain-shortened
+        played, runs, balls = _innings(rng, squads[batting], squads[bowling], overs, target)
+        innings.append({"team": batting, "overs": played})
+        totals[batting] += runs
+        n_deliveries += balls
+
+    year = rng.randint(2004, 2024)
+    info = {
+        "balls_per_over": 6,
+        "dates": [f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"],
+        "event": {"name": "IPL"} if fmt == "ipl" else {"name": f"Synthetic {match_type} Series"},
+        "gender": "male",
+        "match_type": match_type,
+        "players": squads,
+        "registry": {"people": {name: _person_key(name) for squad in squads.values() for name in squad}},
+        "teams": [team_a, team_b],
+        "toss": {"winner": toss_winner, "decision": "bat" if toss_winner == first else "field"},
+        "venue": rng.choice(VENUES),
+    }
+    if totals[team_a] == totals[team_b] or (fmt == "test" and rng.random() < 0.3):
+        info["outcome"] = {"result": "draw" if fmt == "test" else "tie"}
+    else:
+        info["outcome"] = {"winner": max(totals, key=totals.get)}
+
+    match = {
+        "meta": {"data_version": "1.1.0", "created": "2024-01-01", "revision": 1},
+        "info": info,
+        "innings": innings,
+    }
+    return match, n_deliveries
+
+def split_matches(total: int, mix: dict = FORMAT_MIX) -> dict:
+    """Spread a total match count over the formats by mix, at least 1 each."""
+    counts = {fmt: max(1, int(total * share)) for fmt, share in mix.items()}
+    counts[max(mix, key=mix.get)] += max(0, total - sum(counts.values()))
+    return counts
+
+def _write_range(out_dir: str, fmt: str, start: int, stop: int, seed: int) -> int:
+    folder = os.path.join(out_dir, fmt)
+    os.makedirs(folder, exist_ok=True)
+    n_deliveries = 0
+    for i in range(start, stop):
+        match, n = generate_match(fmt, i, seed)
+        with open(os.path.join(folder, f"{ID_BASE[fmt] + i}.json"), "w") as f:
+            json.dump(match, f)
+        n_deliveries += n
+    return n_deliveries
+
+def _write_zip(out_dir: str, fmt: str, n_matches: int, seed: int) -> int:
+    n_deliveries = 0
+    with zipfile.ZipFile(os.path.join(out_dir, f"{fmt}.zip"), "w", zipfile.ZIP_DEFLATED) as zf:
+        for i in range(n_matches):
+            match, n = generate_match(fmt, i, seed)
+            zf.writestr(f"{ID_BASE[fmt] + i}.json", json.dumps(match))
+            n_deliveries += n
+    return n_deliveries
+
+def generate_archive(out_dir: str, matches: int = 1000, seed: int = 0,
+                     as_zip: bool = False, workers: int = 1) -> dict:
+    """
+    Write a synthetic Cricsheet data folder that transform.py can read.
+
+    Matches go to <out_dir>/<format>/<id>.json, or with as_zip to
+    <out_dir>/<format>.zip. A synthetic.json summary with the match and
+    delivery counts per format is written next to them.
+
+    Args:
+        out_dir (str): Folder to use as transform.BASE_DATA_DIR.
+        matches (int): Total matches, spread over formats by FORMAT_MIX.
+        seed (int): Seed; the same seed always produces the same archive.
+        as_zip (bool): Write one zip per format instead of loose files.
+        workers (int): Processes generating loose files in parallel.
+
+    Returns:
+        dict: The synthetic.json summary.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    counts = split_matches(matches)
+    deliveries = {}
+    if as_zip:
+        for fmt, n in counts.items():
+            deliveries[fmt] = _write_zip(out_dir, fmt, n, seed)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            for fmt, n in counts.items():
+                step = max(1, -(-n // workers))
+                futures[fmt] = [pool.submit(_write_range, out_dir, fmt, start, min(start + step, n), seed)
+                                for start in range(0, n, step)]
+            deliveries = {fmt: sum(f.result() for f in parts) for fmt, parts in futures.items()}
+
+    summary = {"seed": seed, "zip": as_zip, "matches": counts, "deliveries": deliveries}
+    with open(os.path.join(out_dir, "synthetic.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+def load_summary(data_dir: str):
+    """The synthetic.json summary of a generated folder, or None."""
+    try:
+        with open(os.path.join(data_dir, "synthetic.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic Cricsheet match JSON.")
+    parser.add_argument("--matches", type=int, default=1000,
+                        help="total matches across all formats (default: 1000)")
+    parser.add_argument("--out", required=True, help="output folder, used as the data folder")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    parser.add_argument("--zip", action="store_true", help="write <format>.zip archives")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes writing loose files (default: 1)")
+    args = parser.parse_args()
+    summary = generate_archive(args.out, args.matches, args.seed, args.zip, args.workers)
+    print(f"✅ Generated {sum(summary['matches'].values())} matches, "
+          f"{sum(summary['deliveries'].values())} deliveries in: {args.out}")
@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+import pandas as pd
+
+TELEMETRY_SAMPLES = 1000  # latest samples kept per (name, kind)
+
+# (name, kind) -> deque of (seconds, rows, cache). Module state, so it is
+# shared by every dashboard session of the Streamlit server process.
+_samples = {}
+_lock = threading.Lock()
+_local = threading.local()  # per-thread stack of open timers
+
+def rows_of(value):
+    """Row count of a query result (DataFrame, Series or list); None for anything else."""
+    if isinstance(value, (pd.DataFrame, pd.Series, list, tuple)):
+        return len(value)
+    return None
+
+def record(name: str, kind: str, seconds: float, rows=None, cache=None):
+    """
+    Add one latency sample.
+
+    Args:
+        name (str): What was timed, e.g. "top_venues" or "tab.overview".
+        kind (str): Layer of the sample, e.g. "query", "sql" or "tab".
+        seconds (float): Wall time.
+        rows (int): Rows returned, if any.
+        cache (str): "hit" or "miss" for cached calls, else None.
+    """
+    with _lock:
+        samples = _samples.get((name, kind))
+        if samples is None:
+            samples = _samples[(name, kind)] = deque(maxlen=TELEMETRY_SAMPLES)
+        samples.append((seconds, rows, cache))
+
+def _stack() -> list:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+class Timer:
+    """
+    Time a block as a context manager, or between start() and stop().
+
+    Set rows on the timer to record the rows returned. A cached timer
+    counts as a cache hit unless mark_miss() is called inside it, i.e.
+    unless the cached function's body ran.
+    """
+
+    def __init__(self, name: str, kind: str = "block", cached: bool = False):
+        self.name = name
+        self.kind = kind
+        self.rows = None
+        self.cache = "hit" if cached else None
+        self.start_time = None
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def stop(self):
+        record(self.name, self.kind, time.perf_counter() - self.start_time, self.rows, self.cache)
+
+    def __enter__(self):
+        _stack().append(self)
+        return self.start()
+
+    def __exit__(self, *exc):
+        _stack().remove(self)
+        self.stop()
+        return False
+
+def current():
+    """Innermost open timer of the calling thread, or None."""
+    stack = _stack()
+    return stack[-1] if stack else None
+
+def mark_miss():
+    """Call from the body of a cached function: the innermost cached timer becomes a miss."""
+    for open_timer in reversed(_stack()):
+        if open_timer.cache is not None:
+            open_timer.cache = "miss"
+            return
+
+def summary() -> pd.DataFrame:
+    """
+    Latency percentiles per timed name and kind, slowest p95 first.
+
+    Returns:
+        pd.DataFrame: name, kind, calls, hits, misses, hit_pct, p50_ms,
+        p95_ms, max_ms, total_s and median rows.
+    """
+    with _lock:
+        snapshot = {key: list(samples) for key, samples in _samples.items()}
+    rows = []
+    for (name, kind), samples in snapshot.items():
+        ms = np.array([s[0] for s in samples]) * 1000
+        counts = [s[1] for s in samples if s[1] is not None]
+        hits = sum(1 for s in samples if s[2] == "hit")
+        misses = sum(1 for s in samples if s[2] == "miss")
+        rows.append({
+            "name": name,
+            "kind": kind,
+            "calls": len(samples),
+            "hits": hits,
+            "misses": misses,
+            "hit_pct": round(hits * 100 / (hits + misses), 1) if hits + misses else None,
+            "p50_ms": round(float(np.percentile(ms, 50)), 2),
+            "p95_ms": round(float(np.percentile(ms, 95)), 2),
+            "max_ms": round(float(ms.max()), 2),
+            "total_s": round(float(ms.sum()) / 1000, 3),
+            "rows": int(np.median(counts)) if counts else None,
+        })
+    columns = ["name", "kind", "calls", "hits", "misses", "hit_pct",
+               "p50_ms", "p95_ms", "max_ms", "total_s", "rows"]
+    return pd.DataFrame(rows, columns=columns).sort_values("p95_ms", ascending=False, ignore_index=True)
+
+def reset():
+    with _lock:
+        _samples.clear()
@@ -1,48 +1,306 @@
 import os
+import numpy as np
 import pandas as pd
 import json
+import zlib
+import zipfile
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import matchcache
+import instrument
+from columns import ColumnBuffer
+from metrics import add_batting_metrics, add_bowling_metrics
 
 BASE_DATA_DIR = os.path.join(os.path.dirname(__file__), "../data")
 
-def load_json_files(format_folder):
+# Number of buffered ball records a parser holds before folding them into
+# its running per-player totals.
+CHUNK_SIZE = 100_000
+
+# Match files inside a downloaded archive are addressed as
+# "<zip path>::<member name>", so they can be listed, sharded, cached and
+# recorded in the manifest exactly like files in a folder.
+ZIP_MEMBER_SEP = "::"
+
+def list_json_files(format_folder):
+    """
+    List the match JSON sources of a format, in directory (or archive) order.
+
+    An extracted folder BASE_DATA_DIR/<format> is used when present. Otherwise
+    the members of BASE_DATA_DIR/<format>.zip are listed, so an archive kept
+    by scraper.download_and_extract(extract=False) is read without unpacking.
+
+    Args:
+        format_folder (str): Format folder under BASE_DATA_DIR, e.g. "odi".
+
+    Returns:
+        list: Paths of the format's .json files or zip members.
+    """
     folder_path = os.path.join(BASE_DATA_DIR, format_folder)
-    all_matches = []
-    if not os.path.exists(folder_path):
-        print(f"No folder found for {format_folder}")
-        return all_matches
-
-    for file in os.listdir(folder_path):
-        if file.endswith(".json"):
-            with open(os.path.join(folder_path, file), "r", encoding="utf-8") as f:
-                data = json.load(f)
-                all_matches.append(data)
-    return all_matches
+    zip_path = f"{folder_path}.zip"
+    if os.path.exists(folder_path):
+        return [
+            os.path.join(folder_path, file)
+            for file in os.listdir(folder_path)
+            if file.endswith(".json")
+        ]
+    if os.path.exists(zip_path):
+        with zipfile.ZipFile(zip_path) as zf:
+            return [
+                f"{zip_path}{ZIP_MEMBER_SEP}{info.filename}"
+                for info in zf.infolist()
+                if info.filename.endswith(".json")
+            ]
+
+    print(f"No folder found for {format_folder}")
+    return []
+
+# Open archives, reused across member reads within one process. Keyed on
+# the process id as well: a forked pool worker inherits the parent's
+# handles, and sharing their file offset with the parent and the other
+# workers corrupts reads, so each process opens its own.
+_open_zips = {}
+
+def _zip_member(path):
+    zip_path, member = path.split(ZIP_MEMBER_SEP, 1)
+    key = (os.getpid(), zip_path)
+    zf = _open_zips.get(key)
+    if zf is None:
+        zf = _open_zips[key] = zipfile.ZipFile(zip_path)
+    return zf, member
+
+def source_name(path) -> str:
+    """File name of a match source, e.g. "1234567.json", for folder files and zip members alike."""
+    return os.path.basename(path.split(ZIP_MEMBER_SEP)[-1])
+
+def read_source(path) -> bytes:
+    """Return the raw bytes of a match file or zip member from list_json_files()."""
+    if ZIP_MEMBER_SEP in path:
+        zf, member = _zip_member(path)
+        return zf.read(member)
+    with open(path, "rb") as f:
+        return f.read()
+
+def source_stat(path):
+    """
+    Size and modification time of a match source.
+
+    Returns:
+        tuple: (size in bytes, mtime in nanoseconds). For zip members these
+        come from the archive's directory entry.
+    """
+    if ZIP_MEMBER_SEP in path:
+        zf, member = _zip_member(path)
+        info = zf.getinfo(member)
+        mtime = datetime(*info.date_time).timestamp()
+        return info.file_size, int(mtime * 1_000_000_000)
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+def iter_json_files(format_folder):
+    """
+    Yield decoded match JSON files of a format one at a time.
+
+    Args:
+        format_folder (str): Format folder under BASE_DATA_DIR, e.g. "odi".
+
+    Yields:
+        dict: One decoded Cricsheet match.
+    """
+    for path in list_json_files(format_folder):
+        yield json.loads(read_source(path))
+
+def match_key(path) -> int:
+    """
+    Stable integer key for a match, derived from its Cricsheet file name.
+
+    Cricsheet names each file after its numeric match ID, e.g. "1234567.json".
+    Any other name maps to a negative CRC32 of the stem so it can never
+    collide with a real ID.
+
+    Args:
+        path (str): Path or file name of the match JSON.
+
+    Returns:
+        int: Match key.
+    """
+    stem = os.path.splitext(source_name(path))[0]
+    if stem.isdigit():
+        return int(stem)
+    return -(zlib.crc32(stem.encode("utf-8")) + 1)
+
+# Ball-level columns of an extracted match and their storage dtypes. Columns
+# listed in LABEL_COLUMNS hold codes into the match's labels list, -1 = missing.
+BALL_COLUMNS = {
+    "innings": np.int16,
+    "over": np.int16,
+    "ball": np.int16,
+    "team": np.int32,
+    "batter": np.int32,
+    "bowler": np.int32,
+    "runs_batter": np.int16,
+    "extras": np.int16,
+    "runs_total": np.int16,
+    "is_wide": np.int8,
+    "wicket": np.int8,
+    "wicket_kind": np.int32,
+    "player_out": np.int32,
+}
+LABEL_COLUMNS = ("team", "batter", "bowler", "wicket_kind", "player_out")
+
+def extract_match(path, m) -> dict:
+    """
+    Pull the fields every builder needs out of one decoded match.
+
+    Args:
+        path (str): Path of the match JSON, used for the match key.
+        m (dict): Decoded Cricsheet match.
+
+    Returns:
+        dict: "key" (match_key), "row" (the {fmt}_matches row), "teams",
+        "people" (the registry's name -> Cricsheet person id map), "labels"
+        (names referenced by the label columns) and "balls", one NumPy array
+        per BALL_COLUMNS entry.
+    """
+    labels = []
+    label_codes = {}
+
+    def code(label):
+        if label is None:
+            return -1
+        if label not in label_codes:
+            label_codes[label] = len(labels)
+            labels.append(label)
+        return label_codes[label]
+
+    balls = {name: [] for name in BALL_COLUMNS}
+    for innings_no, inning in enumerate(m.get("innings", []), start=1):
+        team = code(inning.get("team"))
+        for over in inning.get("overs", []):
+            over_no = over.get("over", -1)
+            for ball_no, ball in enumerate(over.get("deliveries", []), start=1):
+                runs = ball.get("runs", {})
+                extras = runs.get("extras", 0)
+                wickets = ball.get("wickets", [])
+
+                balls["innings"].append(innings_no)
+                balls["over"].append(over_no)
+                balls["ball"].append(ball_no)
+                balls["team"].append(team)
+                balls["batter"].append(code(ball.get("batter")))
+                balls["bowler"].append(code(ball.get("bowler")))
+                balls["runs_batter"].append(runs.get("batter", 0))
+                balls["extras"].append(extras)
+                balls["runs_total"].append(runs.get("total", 0))
+                balls["is_wide"].append(1 if extras > 0 and "wides" in ball.get("extras", {}) else 0)
+                balls["wicket"].append(1 if "wickets" in ball else 0)
+                balls["wicket_kind"].append(code(wickets[0].get("kind")) if wickets else -1)
+                balls["player_out"].append(code(wickets[0].get("player_out")) if wickets else -1)
+
+    key = match_key(path)
+    return {
+        "key": key,
+        "row": _match_row(m, key),
+        "teams": m.get("info", {}).get("teams", []),
+        "people": m.get("info", {}).get("registry", {}).get("people", {}),
+        "labels": labels,
+        "balls": {name: np.array(values, dtype=BALL_COLUMNS[name]) for name, values in balls.items()},
+    }
+
+def _read_stats():
+    # Counters of one parse, reported to the open instrument stage.
+    return {"files": 0, "bytes_read": 0, "deliveries": 0, "cache_hits": 0}
+
+def _iter_extracts(paths, use_cache=True, stats=None):
+    for path in paths:
+        data = read_source(path)
+        key = matchcache.cache_key(source_name(path), data) if use_cache else None
+        match = matchcache.get(key) if use_cache else None
+        if match is None:
+            match = extract_match(path, json.loads(data))
+            if use_cache:
+                matchcache.put(key, match)
+        elif stats is not None:
+            stats["cache_hits"] += 1
+        if stats is not None:
+            stats["files"] += 1
+            stats["bytes_read"] += len(data)
+            stats["deliveries"] += len(match["balls"]["innings"])
+        yield match
+
+def iter_matches(fmt, use_cache=True):
+    """
+    Yield the extracted matches of a format, one at a time.
+
+    Matches found in the parsed-match cache (see matchcache.py) are loaded
+    from there; only cache misses are decoded from JSON.
+
+    Args:
+        fmt (str): Format folder under BASE_DATA_DIR, e.g. "odi".
+        use_cache (bool): Read and fill the parsed-match cache.
+
+    Yields:
+        dict: One match as returned by extract_match().
+    """
+    yield from _iter_extracts(list_json_files(fmt), use_cache=use_cache)
+
+def load_json_files(format_folder, stream=False):
+    """
+    Load the match JSON files of a format.
+
+    Args:
+        format_folder (str): Format folder under BASE_DATA_DIR, e.g. "odi".
+        stream (bool): Return a lazy iterator instead of a list, so only one
+            decoded match is held in memory at a time.
+
+    Returns:
+        list | iterator: Decoded Cricsheet matches.
+    """
+    matches = iter_json_files(format_folder)
+    if stream:
+        return matches
+    return list(matches)
+
+def _flush(records, partial, keys, sums):
+    """Fold a ColumnBuffer into the running totals and empty the buffer."""
+    if not len(records):
+        return partial
+    chunk = records.to_frame().groupby(keys, observed=True, sort=False)[sums].sum()
+    records.clear()
+    # Swap the categorical keys for plain labels so totals from different
+    # buffers (or worker processes) line up and sort by name.
+    chunk.index = pd.MultiIndex.from_arrays(
+        [chunk.index.get_level_values(i).astype(object) for i in range(chunk.index.nlevels)],
+        names=keys,
+    )
+    if partial is None:
+        return chunk.sort_index()
+    return pd.concat([partial, chunk]).groupby(level=keys).sum()
+
+def _match_row(m, match_id):
+    meta = m.get("info", {})
+    return {
+        "match_id": match_id,
+        "format": meta.get("match_type"),
+        "teams": str(meta.get("teams")),
+        "venue": meta.get("venue"),
+        "date": meta.get("dates", [None])[0],
+        "toss_winner": meta.get("toss", {}).get("winner"),
+        "match_winner": meta.get("outcome", {}).get("winner")
+    }
 
 def parse_matches(match_format):
-    matches = load_json_files(match_format)
-    match_list = []
-
-    for m in matches:
-        meta = m.get("info", {})
-        match_list.append({
-            "match_id": m.get("meta", {}).get("data_version"),
-            "format": meta.get("match_type"),
-            "teams": str(meta.get("teams")),
-            "venue": meta.get("venue"),
-            "date": meta.get("dates", [None])[0],
-            "toss_winner": meta.get("toss", {}).get("winner"),
-            "match_winner": meta.get("outcome", {}).get("winner")
-        })
-
+    matches = iter_matches(match_format)
+    match_list = [x["row"] for x in matches]
 
     return pd.DataFrame(match_list)
 
 def parse_batting1(match_format):
-    matches = load_json_files(match_format)
     batting_rows = []
 
-    for m in matches:
-        match_id = m.get("meta", {}).get("data_version")
+    for path in list_json_files(match_format):
+        m = json.loads(read_source(path))
+        match_id = match_key(path)
         innings = m.get("innings", [])
 
         for inn in innings:
@@ -63,109 +321,86 @@ def parse_batting1(match_format):
 
     return pd.DataFrame(batting_rows)
 
-def parse_batting(fmt: str):
-    matches = load_json_files(fmt)
-    batting_records = []
-
-    for m in matches:
-        innings = m.get("innings", [])
-        for inning in innings:
-            team = inning.get("team")
-            overs = inning.get("overs", [])
-            for over in overs:
-                for ball in over.get("deliveries", []):
-                    batter = ball.get("batter")
-                    runs = ball.get("runs", {}).get("batter", 0)
-
-                    batting_records.append({
-                        "match_id": m.get("meta", {}).get("match_id"),
-                        "team": team,
-                        "batter": batter,
-                        "runs": runs,
-                        "ball": 1,
-                        "four": 1 if runs == 4 else 0,
-                        "six": 1 if runs == 6 else 0
-                    })
-
-    df = pd.DataFrame(batting_records)
-    if df.empty:
-        return df
-
-    summary = (
-        df.groupby(["batter", "team"])
-        .agg({
-            "runs": "sum",
-            "ball": "count",
-            "four": "sum",
-            "six": "sum"
-        })
-        .reset_index()
+BATTING_KEYS = ["batter", "team"]
+BATTING_SUMS = ["runs", "ball", "four", "six", "dot"]
+
+def _batting_buffer():
+    return ColumnBuffer(strings=BATTING_KEYS, ints=BATTING_SUMS)
+
+def _add_batting(records, x):
+    b = x["balls"]
+    runs = b["runs_batter"]
+    records.extend(
+        x["labels"],
+        batter=b["batter"],
+        team=b["team"],
+        runs=runs,
+        ball=np.ones_like(runs),
+        four=runs == 4,
+        six=runs == 6,
+        dot=runs == 0,
     )
-    summary["strike_rate"] = round(summary["runs"] / summary["ball"] * 100, 2)
-    return summary
 
-import pandas as pd
+def _batting_summary(partial):
+    if partial is None:
+        return pd.DataFrame()
 
-def parse_bowling(fmt: str):
-    matches = load_json_files(fmt)
-    bowling_records = []
+    return add_batting_metrics(partial.reset_index())
 
-    for m in matches:
-        innings = m.get("innings", [])
-        for inning in innings:
-            team = inning.get("team")   # bowling against this team
-            overs = inning.get("overs", [])
-            for over in overs:
-                for ball in over.get("deliveries", []):
-                    bowler = ball.get("bowler")
-                    runs = ball.get("runs", {}).get("total", 0)
-                    extras = ball.get("runs", {}).get("extras", 0)
-                    legal_delivery = 0 if extras > 0 and "wides" in ball.get("extras", {}) else 1
-                    wicket = 1 if "wickets" in ball else 0
-
-                    bowling_records.append({
-                        "match_id": m.get("meta", {}).get("match_id"),
-                        "bowler": bowler,
-                        "against_team": team,
-                        "runs_conceded": runs,
-                        "ball": legal_delivery,   # only legal balls count
-                        "wicket": wicket
-                    })
-
-    df = pd.DataFrame(bowling_records)
-    if df.empty:
-        return df
-
-    # aggregate
-    summary = (
-        df.groupby(["bowler", "against_team"])
-        .agg({
-            "runs_conceded": "sum",
-            "ball": "sum",
-            "wicket": "sum"
-        })
-        .reset_index()
-    )
+def parse_batting(fmt: str):
+    batting_records = _batting_buffer()
+    partial = None
+    for x in iter_matches(fmt):
+        _add_batting(batting_records, x)
+        if len(batting_records) >= CHUNK_SIZE:
+            partial = _flush(batting_records, partial, BATTING_KEYS, BATTING_SUMS)
+    partial = _flush(batting_records, partial, BATTING_KEYS, BATTING_SUMS)
+    return _batting_summary(partial)
 
-    # derived stats
-    summary["overs"] = summary["ball"] // 6 + (summary["ball"] % 6) / 10
-    summary["economy"] = round(summary["runs_conceded"] / (summary["ball"] / 6), 2)
-    summary["strike_rate"] = summary.apply(
-        lambda x: round(x["ball"] / x["wicket"], 2) if x["wicket"] > 0 else None, axis=1
-    )
-    summary["avg"] = summary.apply(
-        lambda x: round(x["runs_conceded"] / x["wicket"], 2) if x["wicket"] > 0 else None, axis=1
+import pandas as pd
+
+BOWLING_KEYS = ["bowler", "against_team"]
+BOWLING_SUMS = ["runs_conceded", "ball", "wicket", "dot"]
+
+def _bowling_buffer():
+    return ColumnBuffer(strings=BOWLING_KEYS, ints=BOWLING_SUMS)
+
+def _add_bowling(records, x):
+    b = x["balls"]
+    runs = b["runs_total"]
+    records.extend(
+        x["labels"],
+        bowler=b["bowler"],
+        against_team=b["team"],   # bowling against the batting team
+        runs_conceded=runs,
+        ball=1 - b["is_wide"],    # only legal balls count
+        wicket=b["wicket"],
+        dot=runs == 0,
     )
 
-    return summary
+def _bowling_summary(partial):
+    if partial is None:
+        return pd.DataFrame()
+
+    return add_bowling_metrics(partial.reset_index())
+
+def parse_bowling(fmt: str):
+    bowling_records = _bowling_buffer()
+    partial = None
+    for x in iter_matches(fmt):
+        _add_bowling(bowling_records, x)
+        if len(bowling_records) >= CHUNK_SIZE:
+            partial = _flush(bowling_records, partial, BOWLING_KEYS, BOWLING_SUMS)
+    partial = _flush(bowling_records, partial, BOWLING_KEYS, BOWLING_SUMS)
+    return _bowling_summary(partial)
 
 
 def parse_bowling2(match_format):
-    matches = load_json_files(match_format)
     bowling_rows = []
 
-    for m in matches:
-        match_id = m.get("meta", {}).get("data_version")
+    for path in list_json_files(match_format):
+        m = json.loads(read_source(path))
+        match_id = match_key(path)
         innings = m.get("innings", [])
 
         for inn in innings:
@@ -196,27 +431,23 @@ def parse_bowling2(match_format):
 
 # DB_PATH = "cricket.db"
 
-def build_team_results(fmt: str) -> pd.DataFrame:
-    matches = load_json_files(fmt)   # loads all JSON files for this format
-    team_stats = {}
-
-    for m in matches:
-        info = m.get("info", {})
-        teams = info.get("teams", [])
-        winner = info.get("outcome", {}).get("winner")
+def _add_team_result(team_stats, x):
+    teams = x["teams"]
+    winner = x["row"]["match_winner"]
 
-        for team in teams:
-            if team not in team_stats:
-                team_stats[team] = {"matches": 0, "wins": 0, "losses": 0}
+    for team in teams:
+        if team not in team_stats:
+            team_stats[team] = {"matches": 0, "wins": 0, "losses": 0}
 
-            team_stats[team]["matches"] += 1
-            if team == winner:
-                team_stats[team]["wins"] += 1
-            else:
-                team_stats[team]["losses"] += 1
+        team_stats[team]["matches"] += 1
+        if team == winner:
+            team_stats[team]["wins"] += 1
+        else:
+            team_stats[team]["losses"] += 1
 
+def _team_results_frame(team_stats):
     # convert dict → DataFrame
-    df = pd.DataFrame([
+    return pd.DataFrame([
         {"team": team,
          "matches": stats["matches"],
          "wins": stats["wins"],
@@ -226,7 +457,252 @@ def build_team_results(fmt: str) -> pd.DataFrame:
         for team, stats in team_stats.items()
     ])
 
-    return df
+def build_team_results(fmt: str) -> pd.DataFrame:
+    matches = iter_matches(fmt)   # streams extracted matches for this format
+    team_stats = {}
+
+    for x in matches:
+        _add_team_result(team_stats, x)
+
+    return _team_results_frame(team_stats)
+
+def _delivery_records(x):
+    b = x["balls"]
+    labels = x["labels"] + [None]   # code -1 picks the trailing None
+    n = len(b["innings"])
+    return list(zip(
+        [x["key"]] * n,
+        b["innings"].tolist(),
+        b["over"].tolist(),
+        b["ball"].tolist(),
+        [labels[c] for c in b["team"].tolist()],
+        [labels[c] for c in b["batter"].tolist()],
+        [labels[c] for c in b["bowler"].tolist()],
+        b["runs_batter"].tolist(),
+        b["extras"].tolist(),
+        b["is_wide"].tolist(),
+        [labels[c] for c in b["wicket_kind"].tolist()],
+        [labels[c] for c in b["player_out"].tolist()],
+    ))
+
+# Field order of the tuples handed to parse_all's on_deliveries callback.
+MATCH_TEAM_FIELDS = ["match_id", "team", "side"]
+
+def _match_team_records(x):
+    # side is the team's position in info.teams (1 or 2)
+    return [(x["key"], team, side) for side, team in enumerate(x["teams"], start=1)]
+
+DELIVERY_FIELDS = [
+    "match_id", "innings", "over", "ball", "team", "batter", "bowler",
+    "runs_batter", "extras", "is_wide", "wicket_kind", "player_out",
+]
+
+def _ingest(matches, on_deliveries=None, keep_deliveries=False):
+    """
+    Run every builder over a stream of extracted matches and return their raw partials.
+
+    Ball-level tuples (see DELIVERY_FIELDS) are passed to on_deliveries in
+    chunks of CHUNK_SIZE, or kept in the partial with keep_deliveries so
+    pool workers can send them back to the parent process.
+    """
+    match_rows = []
+    match_teams = []
+    people = {}
+    batting_records, batting = _batting_buffer(), None
+    bowling_records, bowling = _bowling_buffer(), None
+    delivery_records = []
+    want_deliveries = on_deliveries is not None or keep_deliveries
+    team_stats = {}
+
+    for x in matches:
+        match_rows.append(x["row"])
+        match_teams.extend(_match_team_records(x))
+        people.update(x["people"])
+        _add_batting(batting_records, x)
+        _add_bowling(bowling_records, x)
+        _add_team_result(team_stats, x)
+        if want_deliveries:
+            delivery_records.extend(_delivery_records(x))
+
+        if len(batting_records) >= CHUNK_SIZE:
+            batting = _flush(batting_records, batting, BATTING_KEYS, BATTING_SUMS)
+        if len(bowling_records) >= CHUNK_SIZE:
+            bowling = _flush(bowling_records, bowling, BOWLING_KEYS, BOWLING_SUMS)
+        if on_deliveries is not None and len(delivery_records) >= CHUNK_SIZE:
+            on_deliveries(delivery_records)
+            delivery_records = []
+
+    if on_deliveries is not None and delivery_records:
+        on_deliveries(delivery_records)
+        delivery_records = []
+
+    return {
+        "match_rows": match_rows,
+        "match_teams": match_teams,
+        "people": people,
+        "batting": _flush(batting_records, batting, BATTING_KEYS, BATTING_SUMS),
+        "bowling": _flush(bowling_records, bowling, BOWLING_KEYS, BOWLING_SUMS),
+        "deliveries": delivery_records,
+        "team_stats": team_stats,
+    }
+
+def _ingest_files(paths, keep_deliveries=False, use_cache=True):
+    # Top-level so it can be pickled into pool workers.
+    stats = _read_stats()
+    partial = _ingest(_iter_extracts(paths, use_cache, stats), keep_deliveries=keep_deliveries)
+    partial["stats"] = stats
+    return partial
+
+def _merge_totals(frames, keys):
+    frames = [f for f in frames if f is not None]
+    if not frames:
+        return None
+    return pd.concat(frames).groupby(level=keys).sum()
+
+def _merge_partials(partials):
+    """Combine shard partials in shard order, as if one process had read every file."""
+    team_stats = {}
+    for part in partials:
+        for team, stats in part["team_stats"].items():
+            merged = team_stats.setdefault(team, {"matches": 0, "wins": 0, "losses": 0})
+            for key, value in stats.items():
+                merged[key] += value
+
+    return {
+        "match_rows": [row for part in partials for row in part["match_rows"]],
+        "match_teams": [row for part in partials for row in part["match_teams"]],
+        "people": {name: key for part in partials for name, key in part["people"].items()},
+        "batting": _merge_totals([p["batting"] for p in partials], BATTING_KEYS),
+        "bowling": _merge_totals([p["bowling"] for p in partials], BOWLING_KEYS),
+        "team_stats": team_stats,
+    }
+
+def _shard(paths, n_shards):
+    # Contiguous shards keep the merged match rows in directory order.
+    size = -(-len(paths) // n_shards)
+    return [paths[i:i + size] for i in range(0, len(paths), size)]
+
+def parse_all(fmt: str, workers: int = 1, paths=None, on_deliveries=None, use_cache=True) -> dict:
+    """
+    Decode every match file of a format once and build all of its tables.
+
+    Each match is handed to the match, batting, bowling and team-result
+    builders in turn, so the JSON archive is only read a single time. Matches
+    are streamed and ball records are folded into running totals every
+    CHUNK_SIZE records, keeping memory bounded by the number of players
+    rather than the number of deliveries.
+
+    With more than one worker the file list is split into shards that are
+    parsed in a process pool; the per-shard totals are merged before the
+    derived metrics are computed, so the result is identical to a serial run.
+
+    Matches already in the parsed-match cache are read from there instead of
+    being decoded from JSON; the cache is pruned to its size limit afterwards.
+    Files, bytes read, deliveries and cache hits are added to the open
+    instrument stage, if any.
+
+    Args:
+        fmt (str): Format folder name, e.g. "odi".
+        workers (int): Number of worker processes. 1 parses in-process.
+        paths (list): Only parse these files instead of the whole format folder.
+        on_deliveries (callable): Called with lists of ball-level tuples (see
+            DELIVERY_FIELDS) as they are parsed, e.g. to bulk-load a fact table.
+        use_cache (bool): Read and fill the parsed-match cache.
+
+    Returns:
+        dict: DataFrames keyed by "matches", "match_teams" (see
+        MATCH_TEAM_FIELDS), "people" (name, person_key from the match
+        registries), "batting", "bowling" and "team_results".
+    """
+    if paths is None:
+        paths = list_json_files(fmt)
+
+    stats = _read_stats()
+    if workers > 1:
+        # A few shards per worker smooths out uneven file sizes.
+        shards = _shard(paths, workers * 4) if paths else []
+        keep = [on_deliveries is not None] * len(shards)
+        cache = [use_cache] * len(shards)
+        partials = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(_ingest_files, shards, keep, cache):
+                if part["deliveries"]:
+                    on_deliveries(part["deliveries"])
+                    part["deliveries"] = []
+                for key, value in part.pop("stats").items():
+                    stats[key] += value
+                partials.append(part)
+        state = _merge_partials(partials)
+    else:
+        state = _ingest(_iter_extracts(paths, use_cache, stats), on_deliveries=on_deliveries)
+    instrument.add(**stats)
+
+    if use_cache:
+        matchcache.prune()
+
+    return {
+        "matches": pd.DataFrame(state["match_rows"]),
+        "match_teams": pd.DataFrame(state["match_teams"], columns=MATCH_TEAM_FIELDS),
+        "people": pd.DataFrame(list(state["people"].items()), columns=["name", "person_key"]),
+        "batting": _batting_summary(state["batting"]),
+        "bowling": _bowling_summary(state["bowling"]),
+        "team_results": _team_results_frame(state["team_stats"]),
+    }
+
+def _totals(df, keys, sums):
+    return None if df.empty else df.set_index(keys)[sums]
+
+def _net_totals(base, extra, removed, keys, sums):
+    frames = [_totals(base, keys, sums), _totals(extra, keys, sums)]
+    if removed is not None:
+        frames.append(None if removed.empty else -_totals(removed, keys, sums))
+    totals = _merge_totals(frames, keys)
+    if totals is None or removed is None:
+        return totals
+    # Players whose every delivery was removed net out to all-zero rows.
+    totals = totals[(totals != 0).any(axis=1)]
+    return totals if len(totals) else None
+
+def merge_summaries(base: dict, extra: dict, removed: dict = None) -> dict:
+    """
+    Add the batting, bowling and team-result tables of two parse runs together.
+
+    Only the additive counts are summed; strike rates, economy, averages and
+    win percentages are recomputed from the merged totals.
+
+    Args:
+        base (dict): Existing summary tables, keyed like parse_all's result.
+        extra (dict): Summary tables built from additional match files.
+        removed (dict): Count tables of matches to take back out of base, e.g.
+            the previous version of changed files. Only key and count
+            columns are needed.
+
+    Returns:
+        dict: Merged DataFrames keyed by "batting", "bowling" and "team_results".
+    """
+    team_stats = {}
+    signed = [(base["team_results"], 1), (extra["team_results"], 1)]
+    if removed is not None:
+        signed.append((removed["team_results"], -1))
+    for df, sign in signed:
+        for row in df.itertuples(index=False):
+            stats = team_stats.setdefault(row.team, {"matches": 0, "wins": 0, "losses": 0})
+            stats["matches"] += sign * row.matches
+            stats["wins"] += sign * row.wins
+            stats["losses"] += sign * row.losses
+    team_stats = {team: stats for team, stats in team_stats.items() if stats["matches"]}
+
+    removed = removed or {}
+    batting = _net_totals(base["batting"], extra["batting"], removed.get("batting"),
+                          BATTING_KEYS, BATTING_SUMS)
+    bowling = _net_totals(base["bowling"], extra["bowling"], removed.get("bowling"),
+                          BOWLING_KEYS, BOWLING_SUMS)
+
+    return {
+        "batting": _batting_summary(batting),
+        "bowling": _bowling_summary(bowling),
+        "team_results": _team_results_frame(team_stats),
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The scripts import each other as top-level modules (e.g. "from transform import ...").
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
@@ -0,0 +1,164 @@
+import json
+import os
+import shutil
+import sqlite3
+import pandas as pd
+import pytest
+import database
+import matchcache
+import synthetic
+import transform
+from databasequeries import phase_case
+
+# Dimension table behind each integer key column; codes are assigned in
+# load order, so tables are compared with the names joined back in.
+DIMENSIONS = {
+    "team": ("teams", "team_id"),
+    "wicket_kind": ("wicket_kinds", "wicket_kind_id"),
+    "": ("players", "player_id"),
+}
+NOT_COMPARED = {database.MANIFEST_TABLE, "etl_runs", "players", "teams", "wicket_kinds"}
+ONLY_VENUE = "Removed Oval"  # venue of one removed match only
+REBUILDS = ("build_over_stats", "build_matchups", "build_rollups")
+
+def load(data_dir, db_path, full=False):
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(transform, "BASE_DATA_DIR", str(data_dir))
+        mp.setattr(database, "DB_PATH", str(db_path))
+        for fmt in database.FORMATS:
+            database.run_etl(fmt, full=full)
+
+def decode(conn, df):
+    for column in df.columns:
+        if not column.endswith("_id") or column == "match_id":
+            continue
+        table, id_col = next(dim for prefix, dim in DIMENSIONS.items() if prefix in column)
+        names = dict(conn.execute(f"SELECT {id_col}, name FROM {table}"))
+        df[column] = df[column].map(names)
+    return df
+
+def read_tables(db_path) -> dict:
+    """Every table and view as a frame with names for codes, sorted on all columns."""
+    conn = sqlite3.connect(db_path)
+    names = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type IN ('table', 'view') ORDER BY name"
+    )]
+    tables = {}
+    for name in names:
+        if name in NOT_COMPARED:
+            continue
+        df = decode(conn, pd.read_sql(f"SELECT * FROM {name}", conn))
+        tables[name] = df.sort_values(list(df.columns), ignore_index=True)
+    conn.close()
+    return tables
+
+def edit_match(path):
+    """Change a match file: flip the result, drop later innings, turn the first ball into a six."""
+    with open(path) as f:
+        match = json.load(f)
+    match["info"]["outcome"] = {"winner": match["info"]["teams"][1]}
+    match["innings"] = match["innings"][:1]
+    match["innings"][0]["overs"][0]["deliveries"][0]["runs"] = {"batter": 6, "extras": 0, "total": 6}
+    with open(path, "w") as f:
+        json.dump(match, f)
+
+@pytest.fixture(scope="module")
+def loaded(tmp_path_factory):
+    """
+    The same archive loaded twice: incrementally over an initial load with
+    two files changed, two removed and three added, and in one full run.
+    Also returns the count table rebuilds called during the incremental run.
+    """
+    root = tmp_path_factory.mktemp("etl")
+    source, data = root / "source", root / "data"
+    synthetic.generate_archive(str(source), matches=80, seed=7)  # >= 8 per format
+    added = {}
+    for fmt in database.FORMATS:
+        files = sorted(os.listdir(source / fmt))
+        added[fmt] = files[-3:]
+        (data / fmt).mkdir(parents=True)
+        for name in files[:-3]:
+            shutil.copy(source / fmt / name, data / fmt / name)
+        with open(data / fmt / files[2]) as f:
+            match = json.load(f)
+        match["info"]["venue"] = ONLY_VENUE
+        with open(data / fmt / files[2], "w") as f:
+            json.dump(match, f)
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(matchcache, "CACHE_DIR", str(root / "cache"))
+        load(data, root / "incremental.db")
+        for fmt in database.FORMATS:
+            files = sorted(os.listdir(data / fmt))
+            for name in files[:2]:
+                edit_match(data / fmt / name)
+            for name in files[2:4]:
+                os.remove(data / fmt / name)
+            for name in added[fmt]:
+                shutil.copy(source / fmt / name, data / fmt / name)
+        rebuilt = []
+        for name in REBUILDS:
+            build = getattr(database, name)
+            mp.setattr(database, name, lambda *args, _name=name, _build=build: (
+                rebuilt.append(_name), _build(*args)))
+        before = read_tables(root / "incremental.db")
+        load(data, root / "incremental.db")
+        mp.undo()
+        mp.setattr(matchcache, "CACHE_DIR", str(root / "cache"))
+        load(data, root / "full.db", full=True)
+    return {
+        "before": before,
+        "incremental": read_tables(root / "incremental.db"),
+        "full": read_tables(root / "full.db"),
+        "rebuilt": rebuilt,
+    }
+
+def test_incremental_load_equals_full_rebuild(loaded):
+    incremental, full = loaded["incremental"], loaded["full"]
+    assert set(incremental) == set(full)
+    for fmt in database.FORMATS:
+        for name in (f"{fmt}_matches", f"deliveries_{fmt}", f"batting_stats_{fmt}",
+                     f"bowling_stats_{fmt}", f"team_results_{fmt}", f"batting_innings_{fmt}",
+                     f"bowling_innings_{fmt}", f"rollup_year_{fmt}", f"over_stats_batter_{fmt}",
+                     f"phase_stats_bowler_{fmt}", f"matchups_{fmt}"):
+            assert name in full
+    for name in full:
+        pd.testing.assert_frame_equal(incremental[name], full[name], check_dtype=False, obj=name)
+
+def test_sql_counts_match_transform_summaries(loaded):
+    # The summary tables come from transform's pandas builders; the innings,
+    # over and matchup tables from databasequeries' SQL count definitions.
+    tables = loaded["full"]
+    for fmt in database.FORMATS:
+        batting = tables[f"batting_stats_{fmt}"].groupby("batter")[["runs", "ball", "four", "six", "dot"]].sum()
+        innings = tables[f"batting_innings_{fmt}"].groupby("batter_id")[["runs", "ball", "four", "six", "dot"]].sum()
+        pd.testing.assert_frame_equal(innings, batting, check_dtype=False, check_names=False)
+        matchups = tables[f"matchups_{fmt}"].groupby("batter_id")[["runs", "ball", "four", "six", "dot"]].sum()
+        pd.testing.assert_frame_equal(matchups, batting, check_dtype=False, check_names=False)
+
+        bowling = tables[f"bowling_stats_{fmt}"].groupby("bowler")[["runs_conceded", "ball", "wicket", "dot"]].sum()
+        bowling_innings = tables[f"bowling_innings_{fmt}"].groupby("bowler_id")[list(bowling.columns)].sum()
+        pd.testing.assert_frame_equal(bowling_innings, bowling, check_dtype=False, check_names=False)
+        overs = (tables[f"over_stats_bowler_{fmt}"].rename(columns={"runs": "runs_conceded"})
+                 .groupby("bowler_id")[list(bowling.columns)].sum())
+        pd.testing.assert_frame_equal(overs, bowling, check_dtype=False, check_names=False)
+
+def test_incremental_load_updates_count_tables_in_place(loaded):
+    assert loaded["rebuilt"] == []
+    for fmt in database.FORMATS:
+        for grain, table in (("over", "over_stats_venue"), ("phase", "phase_stats_venue"),
+                             ("year", "rollup_venue_year")):
+            name = f"{table}_{fmt}"
+            if grain == "phase" and not database.PHASES.get(fmt):
+                continue
+            # The removed match was the venue's only one: its rows are
+            # deleted, not left behind with zero counts.
+            assert ONLY_VENUE in set(loaded["before"][name]["venue"])
+            assert ONLY_VENUE not in set(loaded["incremental"][name]["venue"])
+
+@pytest.mark.parametrize("fmt", database.FORMATS)
+def test_phase_of_matches_sql_phase_case(fmt):
+    conn = sqlite3.connect(":memory:")
+    for over in range(60):
+        sql = conn.execute(f"SELECT {phase_case(fmt, '?')}", (over,) * phase_case(fmt, "?").count("?"))
+        assert database.phase_of(fmt, over) == sql.fetchone()[0]
@@ -0,0 +1,37 @@
+import gzip
+import sqlite3
+import pandas as pd
+import pytest
+import exports
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "cricket.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE odi_matches (match_id INTEGER PRIMARY KEY, date TEXT, venue TEXT)")
+    conn.execute("INSERT INTO odi_matches VALUES (1, '2020-01-01', 'Lord''s')")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(exports, "DB_PATH", path)
+    return path
+
+@pytest.mark.parametrize("file_type", exports.file_types())
+def test_export_without_rows_writes_header_only_file(db_path, tmp_path, file_type):
+    path = str(tmp_path / f"empty.{file_type}")
+    rows = exports.export_query("SELECT * FROM odi_matches WHERE match_id < 0", path, file_type)
+    assert rows == 0
+    if file_type in exports.ARROW_TYPES:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pq.read_table(path) if file_type == "parquet" else pa.ipc.open_file(path).read_all()
+        assert table.num_rows == 0
+        assert table.column_names == ["match_id", "date", "venue"]
+    else:
+        opener = gzip.open if file_type == "csv.gz" else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            assert f.read().strip() == "match_id,date,venue"
+
+def test_export_streams_chunks(db_path, tmp_path):
+    path = str(tmp_path / "matches.csv")
+    assert exports.export_query("SELECT * FROM odi_matches", path, "csv", chunksize=1) == 1
+    assert pd.read_csv(path)["venue"].tolist() == ["Lord's"]
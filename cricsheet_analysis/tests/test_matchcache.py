@@ -0,0 +1,78 @@
+import importlib
+import json
+import os
+import numpy as np
+import pytest
+import matchcache
+import synthetic
+import transform
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """matchcache reloaded with its directory and size limit taken from the environment."""
+    monkeypatch.setenv("CRICSHEET_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("CRICSHEET_CACHE_MB", "1")
+    yield importlib.reload(matchcache)
+    monkeypatch.undo()
+    importlib.reload(matchcache)
+
+def match_bytes(index: int = 0) -> bytes:
+    return json.dumps(synthetic.generate_match("t20", index)[0]).encode("utf-8")
+
+def test_put_get_round_trip(cache):
+    data = match_bytes()
+    match = transform.extract_match("2000000.json", json.loads(data))
+    key = cache.cache_key("2000000.json", data)
+    assert cache.get(key) is None
+    cache.put(key, match)
+    cached = cache.get(key)
+    assert {k: cached[k] for k in ("key", "row", "teams", "people", "labels")} == \
+        {k: match[k] for k in ("key", "row", "teams", "people", "labels")}
+    assert list(cached["balls"]) == list(match["balls"])
+    for name, values in match["balls"].items():
+        assert cached["balls"][name].dtype == values.dtype
+        np.testing.assert_array_equal(cached["balls"][name], values)
+
+def test_changed_file_misses(cache):
+    data = match_bytes()
+    cache.put(cache.cache_key("2000000.json", data),
+              transform.extract_match("2000000.json", json.loads(data)))
+    changed = data.replace(b'"gender": "male"', b'"gender": "female"')
+    assert changed != data
+    assert cache.get(cache.cache_key("2000000.json", changed)) is None
+    # The same contents under another file name are another match.
+    assert cache.get(cache.cache_key("2000001.json", data)) is None
+
+def test_get_survives_entry_pruned_after_read(cache, monkeypatch):
+    data = match_bytes()
+    key = cache.cache_key("2000000.json", data)
+    cache.put(key, transform.extract_match("2000000.json", json.loads(data)))
+
+    def pruned(path, *args, **kwargs):
+        os.remove(path)
+        raise FileNotFoundError(path)
+    monkeypatch.setattr(cache.os, "utime", pruned)
+    assert cache.get(key) is not None
+
+def test_prune_evicts_least_recently_used(cache):
+    assert cache.CACHE_MAX_BYTES == 1024 * 1024
+    data = match_bytes()
+    key = cache.cache_key("2000000.json", data)
+    cache.put(key, transform.extract_match("2000000.json", json.loads(data)))
+    recent = cache._entry_path(key)
+    fillers = []
+    for i in range(3):
+        path = os.path.join(cache.CACHE_DIR, "zz", f"filler{i}.npz")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"\0" * 400 * 1024)
+        os.utime(path, (1000 + i, 1000 + i))
+        fillers.append(path)
+    os.utime(recent, (1, 1))
+    # Reading the oldest entry makes it the most recently used.
+    assert cache.get(key) is not None
+
+    assert cache.prune() == 1
+    assert not os.path.exists(fillers[0])
+    assert all(os.path.exists(path) for path in fillers[1:] + [recent])
+    assert cache.prune() == 0
@@ -0,0 +1,78 @@
+import sqlite3
+import numpy as np
+import pandas as pd
+import pytest
+import databasequeries as dq
+from metrics import BATTING_METRICS, BOWLING_METRICS, add_batting_metrics, add_bowling_metrics, add_metrics, ratio
+from profiles import BATTING_PROFILE_METRICS
+
+# batter_id, bowler_id, team_id, runs_batter, extras, is_wide, wicket_kind_id
+DELIVERIES = [
+    (5, 1, 10, 0, 1, 1, 0),  # bowler 1 only ever bowls wides: no legal ball
+    (5, 1, 10, 0, 1, 1, 0),
+    (5, 2, 10, 4, 0, 0, 0),
+    (5, 2, 10, 6, 0, 0, 0),
+    (5, 2, 10, 0, 0, 0, 0),
+    (5, 2, 10, 1, 1, 0, 0),
+    (6, 2, 10, 0, 0, 0, 3),
+    (6, 3, 10, 0, 0, 0, 0),  # bowler 3 never takes a wicket
+    (6, 3, 10, 2, 0, 0, 0),
+]
+
+def test_ratio_masks_zero_denominators():
+    out = ratio(pd.Series([3, 5, 0]), pd.Series([2, 0, 0]), scale=100)
+    assert out.iloc[0] == 150.0
+    assert np.isnan(out.iloc[1]) and np.isnan(out.iloc[2])
+    assert np.isnan(ratio(np.array([1]), np.array([0]))).all()
+
+def test_zero_dismissal_batter_average_is_nan():
+    innings = pd.DataFrame({"runs": [12, 30], "ball": [10, 0], "four": [1, 0], "six": [0, 0],
+                            "dot": [4, 0], "out": [0, 1]})
+    out = add_metrics(innings, BATTING_PROFILE_METRICS)
+    assert np.isnan(out.loc[0, "average"])
+    assert out.loc[1, "average"] == 30.0
+    assert out.loc[0, "strike_rate"] == 120.0 and np.isnan(out.loc[1, "strike_rate"])
+    assert not np.isinf(out[list(BATTING_PROFILE_METRICS)].to_numpy(dtype=float)).any()
+
+@pytest.fixture
+def summaries(tmp_path, monkeypatch):
+    """batting_summary_odi and bowling_summary_odi built by the SQL builders from DELIVERIES."""
+    path = str(tmp_path / "cricket.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE deliveries_odi (batter_id INTEGER, bowler_id INTEGER, team_id INTEGER,
+            runs_batter INTEGER, extras INTEGER, is_wide INTEGER, wicket_kind_id INTEGER)
+    """)
+    conn.executemany("INSERT INTO deliveries_odi VALUES (?, ?, ?, ?, ?, ?, ?)", DELIVERIES)
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(dq, "DB_PATH", path)
+    dq.build_batting_summary("odi")
+    dq.build_bowling_summary("odi")
+    conn = sqlite3.connect(path)
+    batting = pd.read_sql("SELECT * FROM batting_summary_odi ORDER BY batter_id", conn)
+    bowling = pd.read_sql("SELECT * FROM bowling_summary_odi ORDER BY bowler_id", conn)
+    conn.close()
+    return batting, bowling
+
+def test_bowling_metrics_zero_balls_and_wickets(summaries):
+    _, sql = summaries
+    bowling = add_bowling_metrics(sql[["bowler_id", "runs_conceded", "ball", "wicket", "dot"]].copy())
+    assert list(bowling.columns) == ["bowler_id", "runs_conceded", "ball", "wicket", "dot", "overs",
+                                     *BOWLING_METRICS]
+    no_ball = bowling.set_index("bowler_id").loc[1]
+    assert no_ball["ball"] == 0
+    assert np.isnan(no_ball["economy"]) and np.isnan(no_ball["dot_pct"])
+    no_wicket = bowling.set_index("bowler_id").loc[3]
+    assert np.isnan(no_wicket["strike_rate"]) and np.isnan(no_wicket["avg"])
+    assert no_wicket["economy"] == 6.0 and no_wicket["dot_pct"] == 50.0
+    # The SQL builder stores NULL (read back as NaN) in the same places.
+    pd.testing.assert_frame_equal(bowling, sql[bowling.columns], check_dtype=False)
+
+def test_batting_metrics_match_sql_builder(summaries):
+    sql, _ = summaries
+    batting = add_batting_metrics(sql[["batter_id", "team_id", "runs", "ball", "four", "six", "dot"]].copy())
+    assert {"dot", "dot_pct", "boundary_pct"} <= set(batting.columns)
+    first = batting.set_index("batter_id").loc[5]
+    assert (first["ball"], first["dot"], first["dot_pct"], first["boundary_pct"]) == (6, 3, 50.0, 33.33)
+    pd.testing.assert_frame_equal(batting, sql[batting.columns], check_dtype=False)
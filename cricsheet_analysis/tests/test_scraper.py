@@ -0,0 +1,96 @@
+import os
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+import pytest
+import scraper
+import synthetic
+import transform
+
+ETAG = '"fixture-1"'
+
+class ArchiveHandler(SimpleHTTPRequestHandler):
+    """Serves the fixture folder with ETag, If-None-Match and single-range support, like cricsheet.org."""
+
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        with open(path, "rb") as f:
+            data = f.read()
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range", ETAG) == ETAG:
+            start = int(range_header.split("=")[1].split("-")[0])
+        if start >= len(data) and start:
+            self.send_response(416)
+            self.end_headers()
+            return
+        self.send_response(206 if start else 200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(data) - start))
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        self.end_headers()
+        self.wfile.write(data[start:])
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture(scope="module")
+def archive(tmp_path_factory):
+    """A synthetic t20.zip and a local HTTP server serving it."""
+    served = tmp_path_factory.mktemp("served")
+    synthetic.generate_archive(str(served), matches=200, seed=1, as_zip=True)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(ArchiveHandler, directory=str(served)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield served / "t20.zip", f"http://127.0.0.1:{server.server_port}/t20.zip"
+    server.shutdown()
+
+@pytest.fixture
+def download_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(scraper, "DOWNLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(transform, "BASE_DATA_DIR", str(tmp_path))
+    return tmp_path
+
+def test_fetch_archive_keeps_zip_and_skips_unchanged(archive, download_dir):
+    zip_path, url = archive
+    assert scraper.fetch_archive("t20", url, extract=False)
+    assert (download_dir / "t20.zip").read_bytes() == zip_path.read_bytes()
+    # The recorded ETag turns the next fetch into a 304.
+    assert not scraper.fetch_archive("t20", url, extract=False)
+
+def test_download_resumes_partial_file(archive, download_dir):
+    zip_path, url = archive
+    data = zip_path.read_bytes()
+    dest = download_dir / "t20.zip"
+    (download_dir / "t20.zip.part").write_bytes(data[:1000])
+    (download_dir / "t20.zip.part.etag").write_text(ETAG)
+    scraper.download_file(url, str(dest), chunk_size=512)
+    assert dest.read_bytes() == data
+    assert not (download_dir / "t20.zip.part").exists()
+
+def test_fetch_archive_extracts(archive, download_dir):
+    _, url = archive
+    assert scraper.fetch_archive("t20", url, extract=True)
+    assert len(list((download_dir / "t20").glob("*.json"))) == synthetic.split_matches(200)["t20"]
+
+def test_parse_from_zip_with_workers(archive, download_dir):
+    _, url = archive
+    scraper.fetch_archive("t20", url, extract=False)
+    paths = transform.list_json_files("t20")
+    assert paths and all(transform.ZIP_MEMBER_SEP in path for path in paths)
+    # Read the archive in the parent first, as database.scan_changes does
+    # before parse_all forks its pool.
+    for path in paths:
+        transform.read_source(path)
+    serial = transform.parse_all("t20", use_cache=False)
+    pooled = transform.parse_all("t20", workers=4, use_cache=False)
+    for key in ("matches", "batting", "bowling", "team_results"):
+        pd.testing.assert_frame_equal(serial[key], pooled[key])
@@ -0,0 +1,51 @@
+import importlib
+import pandas as pd
+import pytest
+import matchcache
+import synthetic
+import transform
+
+FRAMES = ("matches", "match_teams", "people", "batting", "bowling", "team_results")
+
+@pytest.fixture(scope="module")
+def data_dir(tmp_path_factory):
+    """Loose synthetic match files for every format."""
+    path = tmp_path_factory.mktemp("data")
+    synthetic.generate_archive(str(path), matches=60, seed=3)
+    return path
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch, data_dir):
+    # Set through the environment as well, so pool workers started by any
+    # method see the same cache folder.
+    monkeypatch.setattr(transform, "BASE_DATA_DIR", str(data_dir))
+    monkeypatch.setenv("CRICSHEET_CACHE_DIR", str(tmp_path / "cache"))
+    importlib.reload(matchcache)
+    yield tmp_path / "cache"
+    monkeypatch.undo()
+    importlib.reload(matchcache)
+
+def parse(fmt, workers, use_cache):
+    deliveries = []
+    parsed = transform.parse_all(fmt, workers=workers, use_cache=use_cache,
+                                 on_deliveries=deliveries.extend)
+    return parsed, sorted(deliveries)
+
+@pytest.mark.parametrize("use_cache", [False, True])
+@pytest.mark.parametrize("fmt", ["odi", "t20"])
+def test_parse_all_with_workers_equals_serial(cache_dir, fmt, use_cache):
+    serial, serial_deliveries = parse(fmt, 1, use_cache)
+    # With the cache on, the serial run filled it: the pool reads every match back.
+    pooled, pooled_deliveries = parse(fmt, 2, use_cache)
+    assert any(cache_dir.rglob("*.npz")) == use_cache
+    for key in FRAMES:
+        pd.testing.assert_frame_equal(serial[key], pooled[key], obj=key)
+    assert serial_deliveries == pooled_deliveries
+    assert len(serial_deliveries) == synthetic.load_summary(str(transform.BASE_DATA_DIR))["deliveries"][fmt]
+
+def test_parse_all_with_workers_fills_cache(cache_dir):
+    pooled, _ = parse("t20", 2, use_cache=True)
+    assert len(list(cache_dir.rglob("*.npz"))) == len(transform.list_json_files("t20"))
+    serial, _ = parse("t20", 1, use_cache=True)
+    for key in FRAMES:
+        pd.testing.assert_frame_equal(serial[key], pooled[key], obj=key)